@@ -46,6 +46,11 @@ from bpy.utils import register_class, unregister_class
 from enum import Enum
 from bpy.types import Panel, Menu, Operator
 import bpy.utils.previews
+from bpy.app.handlers import persistent
+import numpy as np
+from . import geometry
+from .geometry import points_to_segments, evaluate_bezier_segments, evaluate_bezier_segments_at, join_segment_samples, bernstein_matrix, HANDLE_TYPES, keep_handle_types
+from collections import OrderedDict
 
 # CURVE OPS #####################################################################
 
@@ -53,24 +58,13 @@ class BT_BezierCurve:
 	def __init__(self, arg):
 		if isinstance(arg, bpy.types.Object) and arg.type == 'CURVE':
 			curve = arg
-			self.points = []
-			src_points = curve.data.splines[0].bezier_points
-			
-			for point in src_points:
-				self.points.append([
-					to_world(self, curve.matrix_world, point.handle_left),
-					to_world(self, curve.matrix_world, point.co),
-					to_world(self, curve.matrix_world, point.handle_right)
-					])
+			src_points = transform_points_array(curve.matrix_world, get_bezier_points_array(curve.data.splines[0]))
+			self.points = [[Vector(vector) for vector in point] for point in src_points.tolist()]
 
-			points = curve.data.splines[0].bezier_points
+			points = self.points
 			if len(points) == 2:
-				self.p0_co            = to_world(self, curve.matrix_world, points[0].co)
-				self.p0_handle_left   = to_world(self, curve.matrix_world, points[0].handle_left)
-				self.p0_handle_right  = to_world(self, curve.matrix_world, points[0].handle_right)
-				self.p1_co            = to_world(self, curve.matrix_world, points[1].co)
-				self.p1_handle_left   = to_world(self, curve.matrix_world, points[1].handle_left)
-				self.p1_handle_right  = to_world(self, curve.matrix_world, points[1].handle_right)
+				self.p0_handle_left, self.p0_co, self.p0_handle_right = (vector.copy() for vector in points[0])
+				self.p1_handle_left, self.p1_co, self.p1_handle_right = (vector.copy() for vector in points[1])
 
 			# self.resolution = curve.data.splines[0].resolution_u
 			# self.matrix_world = curve.matrix_world
@@ -120,16 +114,18 @@ class BT_BezierCurve:
 			# self.matrix_world = Matrix()
 			self.is_valid = True
 
-	def build(self, context, resolution, name, *, is_set_pivot=True):
+	def build(self, context, resolution, name, *, is_set_pivot=True, pivot=None):
 		bezier = add_bezier(self, context, resolution, name)
 		spline = bezier.data.splines[0]
-		points = spline.bezier_points
-		bezier.data.splines[0].bezier_points.add(len(self.points)-1)
+		points = np.array(self.points, dtype=np.float64).reshape(-1, 3, 3)
 
-		for index, point in enumerate(points):
-			point.handle_left = self.points[index][0]
-			point.co = self.points[index][1]
-			point.handle_right = self.points[index][2]
+		# pivot is set to the first point (or the given one) by offsetting the data before writing it
+		if is_set_pivot and len(points):
+			pivot = points[0, 1].copy() if pivot is None else np.array(pivot, dtype=np.float64)
+			points -= pivot
+			bezier.matrix_world.translation = pivot
+
+		set_bezier_points_array(spline, points)
 		
 		spline.resolution_u = resolution
 		bezier.color = context.scene.bt_color		
@@ -138,8 +134,6 @@ class BT_BezierCurve:
 		bezier.data.bevel_resolution = context.scene.bt_pipe_resolution
 		bezier.data.extrude = context.scene.bt_band_width	
 
-		if is_set_pivot:
-			set_pivot(bezier, bezier.matrix_world@points[0].co)
 		# set_handle_type(self, bezier, 'ALIGNED')
 		# bezier.matrix_world = self.matrix_world  
 		return bezier
@@ -154,26 +148,13 @@ class BT_Cursor:
 		if len(screen_list) == 0:
 			return Vector((0.0, 0.0))
 
-		dist = dict()
-		for point in screen_list:
-			dist[get_distance(point, cursor)] = point
-
-		if (len(dist)):
-			return dist.get(min(dist))
-
-		return Vector()
+		return get_screen_index(self, screen_list).find_nearest(cursor)
 
 	def get_nearest_target_point_world(self, cursor, screen_world_map):
 		if len(screen_world_map) == 0:
-			return Vector() 
-		dist = dict()
-		for point in screen_world_map.keys():
-			dist[get_distance(point, cursor)] = point
-
-		if (len(dist)):
-			return dist.get(min(dist))
+			return Vector()
 
-		return Vector()
+		return get_screen_index(self, screen_world_map).find_nearest(cursor)
 
 	def is_cusror_in_radius_range_from_nearest_point(self, cursor, point, radius):
 		cursor_to_point_dist = get_distance(cursor, point)
@@ -188,6 +169,7 @@ class BT_Draw(Operator, BT_Cursor):
 		self.line_2d_handler = None # handler for drawing a screen bezier line
 		self.curve_2d_handler =  None # handler for drawing a screen bezier curve
 		self.snap_points = set() # all points that can be used for snapping
+		self.screen_world_map = None # screen-space index of snap_points, rebuilt when the view changes
 		self.snap_target = None 
 		self.RADIUS = 25 # maximum distance between cursor and snap target
 		self.radius = []
@@ -224,13 +206,14 @@ class BT_Draw(Operator, BT_Cursor):
 			if not len(verts) > 0:
 				return None
 			
-			kd_tree = kdtree.KDTree(len(verts))
-			for index, vert in enumerate(verts):
-				kd_tree.insert(vert.co.copy().freeze(), index)
-			kd_tree.balance()
-			
-			nearest_vertex = matrix @ kd_tree.find(location)[0]
-			return nearest_vertex
+			vertex_kd_tree = get_vertex_kd_tree(obj, obj_eval)
+
+			if vertex_kd_tree.is_ready:
+				return matrix @ vertex_kd_tree.kd_tree.find(location)[0]
+
+			# the tree of a big mesh is still being built, snap to the hit face's vertices meanwhile
+			face_verts = [verts[index].co for index in obj_eval.data.polygons[face].vertices]
+			return matrix @ min(face_verts, key=lambda co: (co - location).length)
 
 		return None 
 
@@ -261,6 +244,7 @@ class BT_Draw(Operator, BT_Cursor):
 
 		context.window.cursor_set('NONE')
 		self.snap_points = snap_get_points(self, context)
+		invalidate_screen_world_map(self)
 		self.resolution = context.scene.bt_resolution
 		km=self.keymap_strings
 		context.workspace.status_text_set(km['LMB'] + km['CTRL_LMB'] + km['CTRL_SHIFT_LMB'] + km['SHIFT_LMB'] + km['ENTER'])
@@ -322,10 +306,10 @@ class BT_DrawBezierLine(BT_Draw):
 						if len(self.points) > 0:
 							self.line_2d_handler = draw_2d_polyline(self, context, (self.points[0][0], target), ((0,1),))
 						update_viewport(self, context)
-						self.snap_points.add(vert_co.freeze())
+						add_snap_point(self, vert_co)
 
 			elif len(self.snap_points) > 0: # snap to curves and empties
-				screen_world_map = get_screen_world_map(self, context, self.snap_points)	
+				screen_world_map = get_cached_screen_world_map(self, context, self.snap_points)	
 				target = snap_get_target(self, context, cursor, screen_world_map)								
 				if BT_Cursor.is_cusror_in_radius_range_from_nearest_point(self, cursor, target , self.RADIUS):
 					nearest_world = screen_world_map.get(target)
@@ -338,16 +322,16 @@ class BT_DrawBezierLine(BT_Draw):
 
 					update_viewport(self, context)
 					self.points.append((target, nearest_world))
-					self.snap_points.add(nearest_world.freeze())
+					add_snap_point(self, nearest_world)
 
 		elif event.shift:
 			point = project(self, context, cursor, on_mesh=True)
 			self.points.append(point)
-			self.snap_points.add(point[1].freeze())
+			add_snap_point(self, point[1])
 		else:
 			point = project(self, context, cursor, on_mesh=False)
 			self.points.append(point)
-			self.snap_points.add(point[1].freeze())
+			add_snap_point(self, point[1])
 
 	def modal(self, context, event):
 		if len(self.points) == 0 and (event.alt and event.type in ('LEFTMOUSE', 'RIGHTMOUSE', 'MIDDLEMOUSE', 'MOUSEMOVE')):
@@ -500,7 +484,7 @@ class BT_DrawBezierCurve(BT_Draw):
 						point = vert_co
 		
 			elif len(self.snap_points) > 0: # snap to curves and empties
-				screen_world_map = get_screen_world_map(self, context, self.snap_points)
+				screen_world_map = get_cached_screen_world_map(self, context, self.snap_points)
 				if len(screen_world_map) > 0:   
 					target = snap_get_target(self, context, cursor, screen_world_map).copy().freeze()
 					if BT_Cursor.is_cusror_in_radius_range_from_nearest_point(self, cursor, target , self.RADIUS):
@@ -515,7 +499,7 @@ class BT_DrawBezierCurve(BT_Draw):
 			point = project(self, context, cursor, on_mesh=False)[1]
 
 		if point is not None:
-			self.snap_points.add(point.freeze())
+			add_snap_point(self, point)
 			point = to_local(self, self.curve.matrix_world, point)
 			points = self.get_points(self.curve)
 			if points:
@@ -589,7 +573,7 @@ class BT_DrawBezierCurve(BT_Draw):
 				context.workspace.status_text_set(None)
 				context.window_manager.bt_modal_on = 'NONE'	
 				context.window.cursor_modal_set('DEFAULT')
-				update_object_edit_object(context)		
+				set_curve_mode(context, 'OBJECT')
 				if not len(self.get_points(curve)) > 1:
 					bpy.data.curves.remove(curve.data)
 					curve = None
@@ -607,7 +591,7 @@ class BT_DrawBezierCurve(BT_Draw):
 			context.workspace.status_text_set(None)
 			context.window_manager.bt_modal_on = 'NONE'	
 			context.window.cursor_modal_set('DEFAULT')
-			update_object_edit_object(context)
+			set_curve_mode(context, 'OBJECT')
 			update_viewport(self, context)	
 			return {'CANCELLED'}
 
@@ -658,7 +642,7 @@ class BT_DrawPolyBezier(BT_Draw):
 
 		if len(points) == 1:
 			self.remove_curve_2d_handler()
-			self.curve_2d_handler = draw_2d_polyline(self, context, [points[0], cursor], ((0,1),))
+			self.curve_2d_handler = draw_2d_polyline(self, context, [points[0], cursor], ((0,1),), name='curve_2d')
 
 		elif len(points) > 1:
 			i = 0
@@ -669,7 +653,7 @@ class BT_DrawPolyBezier(BT_Draw):
 			self.remove_curve_2d_handler()
 			points.append(cursor)
 		
-			self.curve_2d_handler = draw_2d_polyline(self, context, points, index_buffer)
+			self.curve_2d_handler = draw_2d_polyline(self, context, points, index_buffer, name='curve_2d')
 	
 	def add_point(self, context, event):
 		cursor = get_cursor(self, event)
@@ -687,10 +671,10 @@ class BT_DrawPolyBezier(BT_Draw):
 						self.target_handler = draw_target(self, context, target)
 						self.draw_screen_polyline(context, target)
 						update_viewport(self, context)
-						self.snap_points.add(vert_co.freeze())
+						add_snap_point(self, vert_co)
 		
 			elif len(self.snap_points) > 0: # snap to curves and empties    
-				screen_world_map = get_screen_world_map(self, context, self.snap_points)                
+				screen_world_map = get_cached_screen_world_map(self, context, self.snap_points)                
 				if len(screen_world_map) > 0:  
 					target = snap_get_target(self, context, cursor, screen_world_map).copy().freeze()
 					if BT_Cursor.is_cusror_in_radius_range_from_nearest_point(self, cursor, target , self.RADIUS):
@@ -700,17 +684,17 @@ class BT_DrawPolyBezier(BT_Draw):
 						self.target_handler = draw_target(self, context, target)
 						self.draw_screen_polyline(context, target)
 						update_viewport(self, context)
-						self.snap_points.add(nearest_world.freeze())
+						add_snap_point(self, nearest_world)
 		
 		elif event.shift:
 			point = project(self, context, cursor, on_mesh=True)
 			self.points.append(point)
-			self.snap_points.add(point[1].freeze())		
+			add_snap_point(self, point[1])		
 
 		else:
 			point = project(self, context, cursor, on_mesh=False)
 			self.points.append(point)
-			self.snap_points.add(point[1].freeze())
+			add_snap_point(self, point[1])
 
 	def modal(self, context, event):
 		if len(self.points) == 0 and (event.alt and event.type in ('LEFTMOUSE', 'RIGHTMOUSE', 'MIDDLEMOUSE', 'MOUSEMOVE')):
@@ -842,7 +826,7 @@ class BT_DrawPolylineCircle(BT_Draw):
 					i += 1 % len(points)
 
 			self.remove_curve_2d_handler()
-			self.curve_2d_handler = draw_2d_polyline(self, context, points, index_buffer[:-1])
+			self.curve_2d_handler = draw_2d_polyline(self, context, points, index_buffer[:-1], name='curve_2d')
 			update_viewport(self, context)
 
 	def add_point(self, context, event):      
@@ -864,7 +848,7 @@ class BT_DrawPolylineCircle(BT_Draw):
 						update_viewport(self, context)
 		
 			elif len(self.snap_points) > 0: # snap to curves and empties
-				screen_world_map = get_screen_world_map(self, context, self.snap_points)				
+				screen_world_map = get_cached_screen_world_map(self, context, self.snap_points)				
 				target = snap_get_target(self, context, cursor, screen_world_map).freeze()
 				if BT_Cursor.is_cusror_in_radius_range_from_nearest_point(self, cursor, target , self.RADIUS):
 					nearest_world = screen_world_map.get(target)
@@ -903,6 +887,7 @@ class BT_DrawPolylineCircle(BT_Draw):
 				update_viewport(self, context)              
 				new_snap_points = self.build_polyline_circle(context)
 				self.snap_points = self.snap_points.union(new_snap_points)
+				invalidate_screen_world_map(self)
 				self.points.clear()
 				self.radius.clear()
 				update_viewport(self, context)
@@ -1005,7 +990,7 @@ class BT_DrawPolylineRectangle(BT_Draw):
 			index_buffer = [(0, 1), (1, 2), (2, 3), (3, 0)]
 
 			self.remove_curve_2d_handler()
-			self.curve_2d_handler = draw_2d_polyline(self, context, points, index_buffer)
+			self.curve_2d_handler = draw_2d_polyline(self, context, points, index_buffer, name='curve_2d')
 			update_viewport(self, context)
 
 	def add_point(self, context, event):
@@ -1027,7 +1012,7 @@ class BT_DrawPolylineRectangle(BT_Draw):
 						update_viewport(self, context)				
 
 			elif len(self.snap_points) > 0: # snap to curves and empties
-				screen_world_map = get_screen_world_map(self, context, self.snap_points)	
+				screen_world_map = get_cached_screen_world_map(self, context, self.snap_points)	
 				target = snap_get_target(self, context, cursor, screen_world_map).freeze()
 
 				if BT_Cursor.is_cusror_in_radius_range_from_nearest_point(self, cursor, target , self.RADIUS):
@@ -1066,6 +1051,7 @@ class BT_DrawPolylineRectangle(BT_Draw):
 				update_viewport(self, context)              
 				new_snap_points = self.build_polyline_rectangle(context)
 				self.snap_points = self.snap_points.union(new_snap_points)
+				invalidate_screen_world_map(self)
 				self.points.clear()
 				self.diagonal.clear()
 				context.workspace.status_text_set(None)
@@ -1145,28 +1131,39 @@ class BT_Snap(Operator):
 		return {'RUNNING_MODAL'}
 
 	def get_points(self, curve):		
-		return [point for point in curve.data.splines[0].bezier_points if point.select_control_point] if is_bezier(curve) else [point for point in curve.data.splines[0].points if point.select]	
+		# selected points of all splines
+		return [point for spline in curve.data.splines for point in get_spline_points(spline) if is_spline_point_selected(point)]
 
 	def build_snap_map(self, context):
-		viewport = get_view_3d(self, context)
-		width=viewport.width
-		height=viewport.height	
-		
-		curves = self.get_visible_curves(context)
-		curve = context.object
+		region = context.region
+		perspective_matrix = context.region_data.perspective_matrix
+		self.snap_map = BT_ScreenWorldMap(perspective_matrix=perspective_matrix.copy(), region_size=get_region_size(context))
 		
-		for curve in curves:
-			if curve is context.object:
+		for curve in self.get_visible_curves(context):
+			# curves outside of the view are skipped by their bounding box
+			if curve is context.object or not is_in_view_frustum(perspective_matrix, curve):
 				continue
-			
-			interpolated_points = mathutils_interpolate_n_bezier_points(curve, curve.data.splines[0].resolution_u+1) if is_bezier(curve) else [curve.matrix_world@Vector(point.co.xyz) for point in curve.data.splines[0].points]
 
-			for point in interpolated_points:
-				screen_point = vector_3d_to_screen(self, context, point)
-				if screen_point is None or (screen_point.x > width or screen_point.x < 0) or (screen_point.y > height or  screen_point.y < 0):
-					continue			
-				self.snap_map[screen_point.freeze()] = point
+			# segments of all bezier splines are sampled in one batch, spline ends and poly points are added as they are
+			splines = [spline for spline in curve.data.splines if spline.type != 'NURBS']
+			bezier_points = [get_bezier_points_array_closed(spline) for spline in splines if spline.type == 'BEZIER']
+			points = [point_array[[0, -1], 1] for point_array in bezier_points if len(point_array)]
+			points += [get_poly_points_array(spline) for spline in splines if spline.type == 'POLY']
+			segments = [geometry.points_to_segments(point_array) for point_array in bezier_points if len(point_array) > 1]
+			points = transform_points_array(curve.matrix_world, np.concatenate(points)) if len(points) else np.empty((0, 3))
+			if len(segments):
+				max_count = max(spline.resolution_u for spline in splines if spline.type == 'BEZIER')+1
+				points = np.concatenate((points, get_snap_lod_points(self, context, transform_points_array(curve.matrix_world, np.concatenate(segments)), max_count)))
+			if not len(points):
+				continue
+
+			screen_points, in_front = points_to_screen_array(self, context, points)
+			on_screen = in_front & (screen_points >= 0).all(axis=1) & (screen_points[:, 0] <= region.width) & (screen_points[:, 1] <= region.height)
+
+			for screen_point, point in zip(screen_points[on_screen].tolist(), points[on_screen].tolist()):
+				self.snap_map[Vector(screen_point).freeze()] = Vector(point)
 		
+		self.snap_map.build_index()
 		self.snap_targets_handler = draw_snap_targets(self, context, [tuple(point) for point in self.snap_map.values()])
 
 	def calculate_gizmo_center(self, matrix, points): 
@@ -1179,7 +1176,7 @@ class BT_Snap(Operator):
 	def get_visible_curves(self, context):
 		curves = []
 		for obj in context.view_layer.objects:
-			if obj.visible_get() and obj.type=='CURVE' and not obj.data.splines[0].type == 'NURBS':
+			if obj.visible_get() and obj.type=='CURVE' and any(spline.type != 'NURBS' for spline in obj.data.splines):
 				curves.append(obj)
 
 		return curves
@@ -1201,13 +1198,17 @@ class BT_Snap(Operator):
 						if len(point.co) == 3:	# is bezier point
 							point.handle_right = translation@point.handle_right
 							point.handle_left = translation@point.handle_left
+					recalculate_handles(curve)
 
 		context.workspace.status_text_set('[LMB]: Snap [LEFT/RIGHT ARROW]: Select next point [ESC]: Quit')
 	
 	def select_next_point(self, context, direction):
 		point = None
 		curve = context.object
-		points = [point for point in curve.data.splines[0].bezier_points] if is_bezier(curve) else [point for point in curve.data.splines[0].points]	
+		# points of all splines are walked as one sequence
+		points = [point for spline in curve.data.splines for point in get_spline_points(spline)]
+		if not len(points):
+			return
 		if not len(self.get_points(context.object)):
 			point = points[0]
 		else:
@@ -1215,15 +1216,15 @@ class BT_Snap(Operator):
 			
 			if direction == 'left':
 				if index-1 >= 0:					
-					point = curve.data.splines[0].bezier_points[index-1] if is_bezier(curve) else curve.data.splines[0].points[index-1]
+					point = points[index-1]
 			
 			elif direction == 'right':
 				if index+1 < len(points):					
-					point = curve.data.splines[0].bezier_points[index+1] if is_bezier(curve) else curve.data.splines[0].points[index+1]			
+					point = points[index+1]
 		
 		if point is not None:
 			bpy.ops.curve.select_all(action='DESELECT')
-			if is_bezier(curve):
+			if isinstance(point, bpy.types.BezierSplinePoint):
 				point.select_control_point = True
 			else:
 				point.select = True
@@ -1245,8 +1246,12 @@ class BT_Snap(Operator):
 		
 		elif event.type == 'MOUSEMOVE':
 			if self.needs_update:
-				self.snap_map.clear()
-				self.build_snap_map(context)
+				# navigation events don't always change the view, the index is kept if it is still valid
+				if self.snap_map.is_valid(context, self.snap_map.source_key):
+					self.snap_targets_handler = draw_snap_targets(self, context, [tuple(point) for point in self.snap_map.values()])
+				else:
+					self.snap_map.clear()
+					self.build_snap_map(context)
 				self.needs_update = False
 
 		elif event.type == 'LEFT_ARROW' and event.value == 'PRESS':
@@ -1260,7 +1265,7 @@ class BT_Snap(Operator):
 			context.window_manager.bt_modal_on = 'NONE'
 			context.workspace.status_text_set(None)
 			self.remove_snap_targets_handler()
-			update_object_edit(context)
+			sync_curve_data(context)
 			return {'FINISHED'}
 
 		return{'RUNNING_MODAL'}
@@ -1317,7 +1322,6 @@ class BT_Split(Operator, BT_Cursor):
 
 	RADIUS = 25
 	screen_world_map = dict()
-	screen_world_map_needs_update = False
 	points = None
 	target_handler = None
 
@@ -1351,10 +1355,10 @@ class BT_Split(Operator, BT_Cursor):
 			return {'CANCELLED'}
 
 		self.points = mathutils_interpolate_n_bezier_points(curve, resolution+1)
+		invalidate_screen_world_map(self)
 		context.window.cursor_set('KNIFE')
 		
-		if len(self.screen_world_map) == 0: 
-			self.screen_world_map = get_screen_world_map(self, context, self.points)
+		get_cached_screen_world_map(self, context, self.points)
 
 		context.workspace.status_text_set('[LMB]: Split and finish  [ESC]: Quit')
 		context.window_manager.bt_modal_on = 'BT_SPLIT'
@@ -1367,14 +1371,7 @@ class BT_Split(Operator, BT_Cursor):
 		self.target_handler = None
 
 	def find_nearest_screen_point(self, cursor, screen_world_map):
-		dist = dict()
-		for point in screen_world_map.keys():
-			dist[get_distance(point, Vector(cursor))] = point
-
-		if not len(dist) > 0:
-			return None	
-
-		return dist.get(min(dist)).freeze()
+		return find_nearest_screen_point(self, cursor, screen_world_map)
 
 	def get_bezier_split_point(self, context, event):
 		points = self.points		
@@ -1385,11 +1382,7 @@ class BT_Split(Operator, BT_Cursor):
 			return None
 
 		if get_distance(Vector((cursor)), nearest_screen_point) <= self.RADIUS:
-			curve = context.object
-			
-			screen_world_map = get_screen_world_map(self, context, self.points)			
-			nearest_world = self.screen_world_map.get(nearest_screen_point).freeze()			
-			resolution = curve.data.splines[0].resolution_u
+			nearest_world = self.screen_world_map.get(nearest_screen_point).freeze()
 
 			# control point indices (p0 and p3) are divisible by resolution
 			for index, point in enumerate(points):
@@ -1548,7 +1541,6 @@ class BT_Split(Operator, BT_Cursor):
 		if (event.alt and event.type in {'LEFTMOUSE', 'RIGHTMOUSE', 'MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE'}) or (event.type in {'MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE'}): 
 			self.remove_target_handler()
 			update_viewport(self, context)
-			self.screen_world_map_needs_update = True			
 			return {'PASS_THROUGH'}
 
 		elif event.type == 'LEFTMOUSE' and event.value == 'PRESS':
@@ -1575,13 +1567,10 @@ class BT_Split(Operator, BT_Cursor):
 			self.remove_target_handler()		
 			cursor = get_cursor(self, event)
 			
-			if self.screen_world_map_needs_update:
-				self.screen_world_map = get_screen_world_map(self, context, self.points)
-				self.screen_world_map_needs_update = False
-
-			nearest_screen_point = find_nearest_screen_point(self, get_cursor(self, event), self.screen_world_map)
+			screen_world_map = get_cached_screen_world_map(self, context, self.points)
+			nearest_screen_point = find_nearest_screen_point(self, cursor, screen_world_map)
 			
-			if get_distance(cursor, nearest_screen_point) <= self.RADIUS:
+			if nearest_screen_point is not None and get_distance(cursor, nearest_screen_point) <= self.RADIUS:
 				self.target_handler = draw_target(self, context, nearest_screen_point)
 
 			update_viewport(self, context)
@@ -1591,7 +1580,7 @@ class BT_Split(Operator, BT_Cursor):
 			update_viewport(self, context)		
 			context.window.cursor_set('DEFAULT')
 			context.window_manager.bt_modal_on = 'NONE'
-			update_object_edit(context)
+			set_curve_mode(context, 'EDIT')
 			return {'CANCELLED'}
 
 		return {'RUNNING_MODAL'}
@@ -1661,7 +1650,7 @@ class BT_Join(Operator):
 class BT_Smooth(Operator):
 	bl_idname = 'curve.bt_smooth'
 	bl_label = 'Smooth'
-	bl_description = 'Makes the curve smoother at the selected control point'
+	bl_description = 'Makes the curve smoother at the selected control points'
 	bl_options = {'REGISTER', 'UNDO'}
 	# invert_left: bpy.props.BoolProperty(name='Invert Left', description='Invert handle on the left', options={'SKIP_SAVE'})
 	# invert_right: bpy.props.BoolProperty(name='Invert Right', description='Invert handle on the right', options={'SKIP_SAVE'})
@@ -1693,57 +1682,38 @@ class BT_Smooth(Operator):
 
 	def execute(self, context):
 		curve = context.object
-		bezier_points = curve.data.splines[0].bezier_points
-		selected_points = [point for point in bezier_points if point.select_control_point]
+		spline = curve.data.splines[0]
+		bezier_points = spline.bezier_points
 		
 		if len(bezier_points) < 3:
 			self.report({'ERROR'}, "The Bézier curve must have at least 3 control points")
 			return {'CANCELLED'}
 		
-		if len(selected_points) != 1:
-			self.report({'ERROR'}, "Select only 1 control point on the Bézier curve. It cannot be a handle")
-			return {'CANCELLED'}
-
-		point = selected_points[0]
-
-		if point == bezier_points[0] or point == bezier_points[-1]:
-			self.report({'ERROR'}, "Select a control point that is not the first or the last on the Bézier curve")
+		# every selected inner point is smoothed in one pass
+		indices = [index for index in get_selected_bezier_points_indices(bezier_points) if 0 < index < len(bezier_points)-1]
+		if not indices:
+			self.report({'ERROR'}, "Select control points that are not the first or the last on the Bézier curve. They cannot be handles")
 			return {'CANCELLED'}
 
-		index = get_bezier_point_index(bezier_points, point)		
-		if index is None:
-			self.report({'ERROR'}, "Point is not found")
+		# each point is replaced by the midpoints of its segments
+		try:
+			points, params = geometry.smooth_points(get_bezier_points_array(spline), indices)
+		except ValueError as error:
+			self.report({'ERROR'}, self.bl_label + ': ' + str(error))
 			return {'CANCELLED'}
 
-		point_left = bezier_points[index-1]
-		point_right = bezier_points[index+1]
-
-		# now let's select left and right points		
-		point_left.select_control_point = True
-		point_right.select_control_point = True
-		
-		# add support points
-		bpy.ops.curve.subdivide()
-		
-		# update points list
-		bezier_points = curve.data.splines[0].bezier_points
-
-		# point should now be at index+1
-		point = bezier_points[index+1]
-		
-		# remove point
-		for p in bezier_points:
-			if p != point:
-				p.select_control_point=False
+		spline = replace_bezier_points(curve, spline, points, params)
 
-		bpy.ops.curve.bt_remove_point()#invert_right=self.invert_right, invert_left=self.invert_left
+		# the new midpoints stay selected
+		for index in np.flatnonzero(params % 1.0).tolist():
+			spline.bezier_points[index].select_control_point = True
 
 		return {'FINISHED'}
 
 class BT_Merge(Operator):
 	bl_idname = 'curve.bt_merge'
 	bl_label = 'Merge two points'
-	bl_description = 'Merge two neighbouring Bézier control points at the center'
+	bl_description = 'Merge pairs of neighbouring Bézier control points at their centers'
 	bl_options = {'REGISTER', 'UNDO'}
 
 	@classmethod
@@ -1773,8 +1743,9 @@ class BT_Merge(Operator):
 
 	def execute(self, context):
 		curve = context.object
+		spline = curve.data.splines[0]
 
-		bezier_points = curve.data.splines[0].bezier_points
+		bezier_points = spline.bezier_points
 		if len(bezier_points) < 3:			
 			self.report({'ERROR'}, "The Bézier curve must have at least 3 control points")
 			return {'CANCELLED'}
@@ -1784,41 +1755,28 @@ class BT_Merge(Operator):
 			self.report({'ERROR'}, "No control points selected")
 			return {'CANCELLED'}
 
-		if len(indices) != 2:
-			self.report({'ERROR'}, "Select 2 neighbouring control points on the Bézier curve. They cannot be handles")
-			return {'CANCELLED'}
-
-		if bezier_points[indices[0]+1] != bezier_points[indices[1]]:
-			self.report({'ERROR'}, "Select 2 neighbouring control points")
-			return {'CANCELLED'}
-
-		# this will be a merge point
-		bpy.ops.curve.subdivide()
-
-		# update points list
-		bezier_points = curve.data.splines[0].bezier_points	
-			
-		for point in bezier_points:
-			point.select_control_point = False
+		# selected neighbours are merged pairwise from the start, every pair in one pass
+		selected = set(indices)
+		pairs = []
+		for index in indices:
+			if index-1 in selected and (not pairs or pairs[-1] < index-2):
+				pairs.append(index-1)
 
-		point_left = bezier_points[indices[0]+2]
-		point_left.select_control_point=True
-
-		if bpy.ops.curve.bt_remove_point.poll():
-			bpy.ops.curve.bt_remove_point()
-		else:
+		if not pairs:
 			self.report({'ERROR'}, "Select 2 neighbouring control points on the Bézier curve. They cannot be handles")
 			return {'CANCELLED'}
 
-		bezier_points = curve.data.splines[0].bezier_points
+		try:
+			points, params = geometry.merge_points(get_bezier_points_array(spline), pairs)
+		except ValueError as error:
+			self.report({'ERROR'}, self.bl_label + ': ' + str(error))
+			return {'CANCELLED'}
 
-		point_right = bezier_points[indices[1]-1]
-		point_right.select_control_point=True
-		bpy.ops.curve.bt_remove_point()
+		spline = replace_bezier_points(curve, spline, points, params)
 
-		bezier_points = curve.data.splines[0].bezier_points
-		merge_point = bezier_points[indices[0]]
-		merge_point.select_control_point=True
+		# merge points stay selected
+		for index in np.flatnonzero(params % 1.0).tolist():
+			spline.bezier_points[index].select_control_point = True
 
 		return {'FINISHED'}
 
@@ -1848,11 +1806,6 @@ class BT_SetBezierHandleType(Operator):
 			self.report({'ERROR'}, self.bl_label + ': Selected object should be a Bézier curve')
 			return {'CANCELLED'}
 
-		if context.mode == 'OBJECT':
-			update_object_edit_object(context)
-		else:
-			update_edit_object_edit(context)
-
 		return self.execute(context)
 		
 	def execute(self, context):
@@ -1871,6 +1824,7 @@ class BT_SetBezierHandleType(Operator):
 			for curve in context.selected_objects:	
 				set_handle_type(self, curve, self.handle_type)
 
+		sync_curve_data(context, context.selected_objects)
 		return {'FINISHED'}
 
 def get_bezier_point_index(bezier_points, point):
@@ -1887,14 +1841,10 @@ def get_selected_bezier_points_indices(bezier_points):
 	return indices
 
 def find_nearest_screen_point(self, cursor, screen_world_map):
-	dist = dict()
-	for point in screen_world_map.keys():
-		dist[get_distance(point, Vector(cursor))] = point
-
-	if not len(dist) > 0:
-		return None	
+	if not len(screen_world_map) > 0:
+		return None
 
-	return dist.get(min(dist)).freeze()
+	return get_screen_index(self, screen_world_map).find_nearest(cursor)
 
 class BT_Add(Operator, BT_Cursor):
 	bl_idname = 'curve.bt_add_point'
@@ -1910,7 +1860,6 @@ class BT_Add(Operator, BT_Cursor):
 	def poll(cls, context):
 		return context.object is not None and context.mode == 'EDIT_CURVE' and context.window_manager.bt_modal_on != 'BT_ADD_POINT'	
 
-	screen_world_map_needs_update = False
 	target_handler = None
 
 	def remove_target_handler(self):
@@ -1921,21 +1870,12 @@ class BT_Add(Operator, BT_Cursor):
 		points = self.points		
 		cursor = get_cursor(self, event)
 
-		dist = dict()
-		for point in self.screen_world_map.keys():
-			dist[get_distance(point, Vector(cursor))] = point
-
-		if not len(dist) > 0:
-			return 0	
-
-		nearest_screen = dist.get(min(dist)).freeze()
+		nearest_screen = find_nearest_screen_point(self, cursor, self.screen_world_map)
+		if nearest_screen is None:
+			return 0
 
 		if get_distance(Vector((cursor)), nearest_screen) <= self.RADIUS:
-			curve = context.object
-			
-			screen_world_map = get_screen_world_map(self, context, self.points)			
-			nearest_world = self.screen_world_map.get(nearest_screen).freeze()			
-			resolution = curve.data.splines[0].resolution_u
+			nearest_world = self.screen_world_map.get(nearest_screen).freeze()
 
 			# control point indices (p0 and p3) are divisible by resolution
 			for index, point in enumerate(points):
@@ -1964,6 +1904,7 @@ class BT_Add(Operator, BT_Cursor):
 			return {'CANCELLED'}
 
 		self.points = mathutils_interpolate_n_bezier_points(curve, resolution+1)
+		invalidate_screen_world_map(self)
 
 		if not resolution > 1:
 			self.report({'ERROR'}, "Resolution must be higher than 1")
@@ -1971,8 +1912,7 @@ class BT_Add(Operator, BT_Cursor):
 
 		context.window.cursor_modal_set('CROSS')
 		
-		if len(self.screen_world_map) == 0: 
-			self.screen_world_map = get_screen_world_map(self, context, self.points)
+		get_cached_screen_world_map(self, context, self.points)
 
 		context.window_manager.modal_handler_add(self)
 		context.workspace.status_text_set('[LMB]: Add a new point  [ESC]: Quit')
@@ -1981,135 +1921,21 @@ class BT_Add(Operator, BT_Cursor):
 		return {'RUNNING_MODAL'}
 	
 	def add_point(self, context, bezier_split_point):
-		source = context.object
-		matrix = source.matrix_world
-		bezier_points = source.data.splines[0].bezier_points
-		resolution = source.data.splines[0].resolution_u
-
-		split_point_segment_index = bezier_split_point%resolution
-
-		# find p0 and p3 as indices in bezier_points
-		p0_full = bezier_split_point - split_point_segment_index
-		p3_full = p0_full + resolution
-
-		p0 = int(p0_full/resolution)
-		p3 = int(p3_full/resolution)
-
-		t = (bezier_split_point%resolution)/resolution
-
-		split = calculate_new_bezier_point_at_t(self, (
-			matrix @ bezier_points[p0].co,
-			matrix @ bezier_points[p0].handle_right,
-			matrix @ bezier_points[p3].handle_left,
-			matrix @ bezier_points[p3].co,
-		 ), t)
-
-		points_left_to_split = bezier_points[0:p3]
-		points_right_to_split = bezier_points[p3:]
+		curve = context.object
+		spline = curve.data.splines[0]
 
-		curve_data_left = BT_BezierCurve(None)
-		# all points on the left
-		for point in points_left_to_split:
-			curve_data_left.points.append(
-								[
-									matrix @ point.handle_left,
-									matrix @ point.co,
-									matrix @ point.handle_right
-								]
-							)
-		
-		point_exists = False
-		bezier_full_points_coords = [point.co for point in bezier_points]
-		for position in bezier_full_points_coords:			
-			if is_equal(matrix@position, split[1][1], 5):
-				point_exists = True				
-				break
-		
-		if point_exists:
+		# self.points has <resolution> samples per segment, control points are at its multiples
+		index, step = divmod(bezier_split_point, spline.resolution_u)
+		if step == 0:
 			return
 
-		# new point
-		curve_data_left.points.append(
-								[									
-									split[1][0],
-									split[1][1],
-									split[1][1]
-								]
-							)
-			
-		# change left to the split point's right handle
-		# curve_left.data.splines[0].bezier_points[-2].handle_right = split[0][2]
-		curve_data_left.points[-2][2] = split[0][2]
-
-		# curve_2
-		curve_data_right = BT_BezierCurve(None)
-		curve_data_right.points.append(
-								[
-									split[1][1],
-									split[1][1],
-									split[1][2]
-								]
-							)
-
-		for point in points_right_to_split:
-			curve_data_right.points.append(
-								[
-									matrix @ point.handle_left,
-									matrix @ point.co,
-									matrix @ point.handle_right
-								]
-							)
-
-		curve_data_left.points[-1][2] = split[1][2]
-		curve_data_right.points[1][0] = split[2][0]
-
-		new_point_index = len(curve_data_left.points) - 1
-
-		for point in curve_data_right.points[1:]:
-			curve_data_left.points.append(point)
-
-		new_curve = curve_data_left.build(context, resolution, 'BézierCurve')
-		new_curve.select_set(True)
-
-		set_pivot(new_curve, source.location)
-		
-		bpy.context.view_layer.objects.active = source		
-		bt_transfer_curve_data(self, source, (source, new_curve))
-		
-		name = source.name
-		parent = source.parent
-
-		bpy.context.view_layer.objects.active = new_curve
-		
-		new_curve.name = name
-		new_curve.select_set(True)
-
-		collection = source.users_collection[0]
-		if collection != context.scene.collection:
-			if new_curve.name not in collection.objects:
-				collection.objects.link(new_curve)
-			if new_curve.name in context.scene.collection.objects:
-				context.scene.collection.objects.unlink(new_curve)
-		
-		if parent is not None:
-			new_curve.parent = parent
-
-		bpy.ops.object.mode_set(mode = 'EDIT')		
-		point = new_curve.data.splines[0].bezier_points[new_point_index]
-		point.select_control_point = True
-		point.handle_left_type = 'ALIGNED'
-		point.handle_right_type = 'ALIGNED'
-		
-		source.user_remap(new_curve)				
-		bpy.data.objects.remove(source)
-		context.view_layer.objects.active = new_curve		
-		bpy.ops.object.mode_set(mode = 'EDIT')				
+		insert_bezier_point(spline, index, step/spline.resolution_u)
+		curve.data.update_tag()
 
 	def modal(self, context, event):		
 		if (event.alt and event.type in {'LEFTMOUSE', 'RIGHTMOUSE', 'MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE'}) or (event.type in {'MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE'}): 
 			self.remove_target_handler()
 			update_viewport(self, context)
-			self.screen_world_map_needs_update = True			
 			return {'PASS_THROUGH'}
 
 		elif event.type == 'LEFTMOUSE' and event.value == 'PRESS':			
@@ -2121,25 +1947,22 @@ class BT_Add(Operator, BT_Cursor):
 			self.add_point(context, bezier_split_point)
 			curve = context.object
 			self.points = mathutils_interpolate_n_bezier_points(curve, curve.data.splines[0].resolution_u+1)
-			self.screen_world_map = get_screen_world_map(self, context, self.points)
+			invalidate_screen_world_map(self)
+			get_cached_screen_world_map(self, context, self.points)
 			
 			self.remove_target_handler()			
 			update_viewport(self, context)
 			# context.window.cursor_modal_set('DEFAULT')
 			# context.workspace.status_text_set(None)
 			# context.window_manager.bt_modal_on = 'NONE'			
-			update_object_edit(context)
 			return {'RUNNING_MODAL'}
 
 		elif event.type == 'MOUSEMOVE':
 			self.remove_target_handler()		
 			cursor = get_cursor(self, event)
 			
-			if self.screen_world_map_needs_update:
-				self.screen_world_map = get_screen_world_map(self, context, self.points)
-				self.screen_world_map_needs_update = False
-
-			nearest_screen_point = find_nearest_screen_point(self, get_cursor(self, event), self.screen_world_map)
+			screen_world_map = get_cached_screen_world_map(self, context, self.points)
+			nearest_screen_point = find_nearest_screen_point(self, cursor, screen_world_map)
 			if not nearest_screen_point:
 				return {'RUNNING_MODAL'}
 
@@ -2154,7 +1977,7 @@ class BT_Add(Operator, BT_Cursor):
 			context.window.cursor_modal_set('DEFAULT')
 			context.workspace.status_text_set(None)
 			context.window_manager.bt_modal_on = 'NONE'
-			update_object_edit(context)
+			sync_curve_data(context)
 			return {'CANCELLED'}
 		
 		return{'RUNNING_MODAL'}
@@ -2194,7 +2017,6 @@ class BT_Move(Operator):
 			self.report({'ERROR'}, "Can only slide Bézier points")
 			return{'CANCELLED'}
 
-		update_edit_object_edit(context)
 		matrix = curve.matrix_world
 		bezier_points = curve.data.splines[0].bezier_points
 		selected_points = [point for point in bezier_points if point.select_control_point]
@@ -2220,6 +2042,7 @@ class BT_Move(Operator):
 			new_point = None			
 			if index == 0:
 				p3 = bezier_points[index+1]
+				keep_handles(bezier_points, (index+1,))
 				
 				# get a new position for the point and handles at t
 				new_point = calculate_new_bezier_point_at_t(self, (
@@ -2236,6 +2059,7 @@ class BT_Move(Operator):
 
 			else:
 				p0 = bezier_points[index-1]
+				keep_handles(bezier_points, (index-1,))
 				
 				new_point = calculate_new_bezier_point_at_t(self, (
 					p0.co,
@@ -2258,6 +2082,7 @@ class BT_Move(Operator):
 
 			p0 = bezier_points[index-1]
 			p3 = bezier_points[index+1]
+			keep_handles(bezier_points, (index-1, index+1))
 					
 			# here path is curve segment with the sliding point removed and handles adjusted
 			handle_right = p0.co + ((p0.handle_right - p0.co)*(1/T))
@@ -2277,6 +2102,7 @@ class BT_Move(Operator):
 			p0.handle_right = update[0][2]
 			p3.handle_left = update[2][0]
 
+		sync_curve_data(context)
 		return {'FINISHED'}
 
 class BT_Flatten(Operator):
@@ -2304,7 +2130,6 @@ class BT_Flatten(Operator):
 			self.report({'ERROR'}, "Can only flatten Bézier points!")
 			return{'CANCELLED'}
 
-		update_edit_object_edit(context)
 		axis = self.axis			
 		bezier_points = curve.data.splines[0].bezier_points
 		selected_points = [point for point in bezier_points if point.select_control_point]
@@ -2375,6 +2200,7 @@ class BT_Flatten(Operator):
 			point.handle_right = offset@point.handle_right
 			point.handle_left = offset@point.handle_left
 
+		sync_curve_data(context)
 		return {'FINISHED'}
 
 def find_t(self, point):
@@ -2430,10 +2256,21 @@ def calculate_next_rmf(p_data, p_next_data):
 
 	return (p_next, t_next, r_next, s_next)
 
-def spawn_empty(name, location, *, size=0.05):	
+def calculate_curve_rmfs(curve, count, *, binormal=None, world_space=True):
+	# rotation minimizing frames along a whole Bézier spline, <count> samples per segment
+	# can be used to sweep profiles along rails or to orient objects along a curve
+	# returns (N, 3) arrays of points, tangents, binormals and normals
+	points = get_bezier_points_array(curve.data.splines[0])
+	if world_space:
+		points = transform_points_array(curve.matrix_world, points)
+	return geometry.rmfs(points, count, binormal=binormal)
+
+def spawn_empty(name, location, *, size=0.05, orientation=None):	
 	empty = bpy.data.objects.new(name, None)
 	bpy.context.scene.collection.objects.link(empty)		
 	empty.empty_display_size = size
+	if orientation is not None:
+		empty.matrix_world = Matrix.Translation(location) @ orientation.to_4x4()
 	empty.matrix_world.translation = location
 
 class BT_Offset(Operator):
@@ -2444,7 +2281,9 @@ class BT_Offset(Operator):
 	distance: bpy.props.FloatProperty(name='Distance', description='Distance from the source curve')
 	rotation: bpy.props.FloatProperty(name='Rotation°', description='Angle of rotation around the source curve in degrees')
 	spawn_offset_points: bpy.props.BoolProperty(name='Spawn Offset Points', description='The target points that a perfect offset curve should pass through')
-	precision: bpy.props.IntProperty(name='Precision', description='Changing precision can fix wrong curvature in some cases', soft_min=2, min=2, soft_max=1000, max=1000, default=100)
+	precision: bpy.props.IntProperty(name='Precision', description='Count of offset points per segment the handles are fitted to', soft_min=2, min=2, soft_max=1000, max=1000, default=100)
+	adaptive: bpy.props.BoolProperty(name='Adaptive', description='Add control points where the offset curve deviates from the offset points more than Tolerance')
+	tolerance: bpy.props.FloatProperty(name='Tolerance', description='Maximum deviation of the offset curve in Adaptive mode', min=0.0, default=0.001, precision=4)
 	duplicate: bpy.props.BoolProperty(name='Duplicate', default=True, description='Keep the original curve unchanged')
 	
 	def draw(self, context):
@@ -2452,7 +2291,10 @@ class BT_Offset(Operator):
 		column = layout.column()
 		column.prop(self, 'distance')
 		column.prop(self, 'rotation')
-		column.prop(self, 'precision')		
+		column.prop(self, 'precision')
+		column.prop(self, 'adaptive')
+		if self.adaptive:
+			column.prop(self, 'tolerance')
 		column.prop(self, 'spawn_offset_points')
 		column.prop(self, 'duplicate')	
 		column.separator()
@@ -2471,47 +2313,6 @@ class BT_Offset(Operator):
 		normal = tangent.cross(binormal).normalized()		
 		return (point.co, tangent, binormal, normal)
 
-	def find_best_handle_length(self, points, handle_index, target):
-		precision = self.precision
-		def find_closest_interpolated_point(h):
-			interpolated_points = mathutils.geometry.interpolate_bezier(p0, h if handle_index else p1, h if not handle_index else p2, p3, precision)
-			kd_tree = build_kd_tree(interpolated_points)			
-			return kd_tree.find(target)[0].copy().freeze()
-
-		# Here we will try to approximate the best handle length for offset
-		# The best length should give us the closest interpolated point to the target
-		# Targets are rmfs interpolated points
-		p0, p1, p2, p3 = points
-
-		n = 0.01*(p1-p0) if handle_index else 0.01*(p2-p3)
-		h = p1.copy() if handle_index else p2.copy()
-
-		# initial distance to target
-		current_distance = get_distance(find_closest_interpolated_point(h), target)		
-		best_handle = None
-
-		# try making the handle longer
-		for k in range(precision):
-			h += n		
-			new_distance = get_distance(find_closest_interpolated_point(h), target)
-			if new_distance > current_distance:		
-				best_handle = h				
-				break
-
-			current_distance = new_distance
-
-		# try making the handle shorter		
-		for k in range(precision):
-			h -= n
-			new_distance = get_distance(find_closest_interpolated_point(h), target)
-			if new_distance > current_distance:
-				best_handle = h				
-				break
-
-			current_distance = new_distance				
-
-		return best_handle
-
 	def execute(self, context):	
 		context.evaluated_depsgraph_get()	
 		bpy.ops.object.mode_set(mode='OBJECT')		
@@ -2532,148 +2333,36 @@ class BT_Offset(Operator):
 			offset_curve.matrix_world = curve.matrix_world
 			curve = offset_curve	
 
-		# pivot = curve.location.copy()
-		
-		distance = self.distance		
-		rotation = self.rotation		
-
-		interpolated_points = mathutils_interpolate_n_bezier_points(curve, 4, world_space=False)
-
-		# we want to remove control points and leave only interpolated intermediate points
-		for index, point in enumerate(interpolated_points[:]):
-			if index%3 == 0:
-				interpolated_points.remove(point)
-
-		# now let's pack each two intermediate points between bezier_points[n] and bezier_points[n+1] segment into tuples
-		intermediate_points = list(zip(interpolated_points[::2], interpolated_points[1::2]))			
-
-		bezier_points = curve.data.splines[0].bezier_points
+		if not all(len(spline.bezier_points) > 1 for spline in curve.data.splines):
+			self.report({'ERROR'}, "Every Bézier spline must have at least 2 control points")
+			return {'CANCELLED'}
 
 		set_handle_type(self, curve, 'FREE')
 		
-		initial_rmf = self.calculate_initial_rmf(bezier_points[0])		
-		rmfs = [initial_rmf]
-
-		# here we will iterate through bezier segments
-		# index = segment index
-		# p0 = bezier_points[index]
-		# p1 = bezier_points[index+1]
-		for index in range(len(bezier_points)-1):
-			rmfs.append(calculate_next_rmf(rmfs[-1], (
-				intermediate_points[index][0],
-				calculate_bezier_tangent((
-					bezier_points[index].co,
-					bezier_points[index].handle_right,
-					bezier_points[index+1].handle_left,
-					bezier_points[index+1].co,
-					), 1/3).normalized()
-				)))
-			
-			rmfs.append(calculate_next_rmf(rmfs[-1], (
-				intermediate_points[index][1],
-				calculate_bezier_tangent((
-					bezier_points[index].co,
-					bezier_points[index].handle_right,
-					bezier_points[index+1].handle_left,
-					bezier_points[index+1].co,
-					), 2/3).normalized()
-				)))
-			
-			rmfs.append(calculate_next_rmf(rmfs[-1], (
-				bezier_points[index+1].co,
-				(bezier_points[index+1].co - bezier_points[index+1].handle_left).normalized()
-				)))
-
-		if self.spawn_offset_points:
-			for rmf in rmfs:
-				p, s = (rmf[0], rmf[-1])
-				
-				empty = bpy.data.objects.new('Normal', None)
-				bpy.context.scene.collection.objects.link(empty)			
-				empty.empty_display_size = 0.05				
-			
-				offset = Matrix.Translation(p)	
-				position = distance*s
-				empty.location = curve.matrix_world@(offset@position)
-
-		# Bezier_points_lookup is a list of 4-point segments
-		# p0 first point
-		# p1 and p2 are rmf interpolated points
-		# p3 last point
-		bezier_points_lookup = []
-		for index in range(len(bezier_points)-1):			
-			if (index+3) % len(rmfs) != 0:			
-				p0 = Matrix.Translation(rmfs[(index*3)][0])@(distance*rmfs[(index*3)][-1])
-				p1 = Matrix.Translation(rmfs[(index*3)+1][0])@(distance*rmfs[(index*3)+1][-1])
-				p2 = Matrix.Translation(rmfs[(index*3)+2][0])@(distance*rmfs[(index*3)+2][-1])		
-				p3 = Matrix.Translation(rmfs[(index*3)+3][0])@(distance*rmfs[(index*3)+3][-1])	
-
-				bezier_points_lookup.append((
-					p0,
-					p1,
-					p2,
-					p3
-				   ))
+		# every spline is offset on its own, starting from the frame of its first point, cyclic ones through their closing segment
+		for spline in curve.data.splines:
+			bezier_points = spline.bezier_points
+			binormal = np.array(self.calculate_initial_rmf(bezier_points[0])[2])
+			points, frames = geometry.offset(get_bezier_points_array(spline), self.distance, binormal, precision=self.precision, tolerance=self.tolerance if self.adaptive else None, cyclic=spline.use_cyclic_u)
+
+			if self.spawn_offset_points:
+				# empties are oriented by their frames: X - tangent, Y - binormal, Z - normal
+				matrix = curve.matrix_world
+				for frame in frames.tolist():
+					orientation = matrix.to_3x3() @ Matrix(frame[1:]).transposed()
+					spawn_empty('Normal', matrix @ Vector(frame[0]), orientation=orientation.normalized())
+
+			# adaptive mode adds control points
+			if len(points) > len(bezier_points):
+				bezier_points.add(len(points) - len(bezier_points))
+				for point in bezier_points:
+					point.handle_left_type = 'FREE'
+					point.handle_right_type = 'FREE'
+
+			set_bezier_points_array(spline, points)
+
+		curve.data.update_tag()
 
-		for index in range(len(bezier_points)-1):			
-			p0, p1, p2, p3 = bezier_points_lookup[index]
-
-			point = bezier_points[index]
-			normal = rmfs[index*3][-1]
-			offset = Matrix.Translation(point.co)
-			position = distance*normal
-			point.co = p0
-			offset = Matrix.Translation(point.handle_right)
-			point.handle_right = offset@position
-			point.handle_right = (point.handle_right - point.co) + p0
-
-			next_point = bezier_points[index+1]
-			normal = rmfs[(index*3)+3][-1]
-			offset = Matrix.Translation(next_point.co)
-			position = distance*normal
-			next_point.co = p3
-			offset = Matrix.Translation(next_point.handle_left)
-			next_point.handle_left = offset@position
-			next_point.handle_left = (next_point.handle_left - next_point.co) + p3
-			
-			# Approximate right handle 
-			handle_right = self.find_best_handle_length((
-			 p0, point.handle_right, next_point.handle_left, p3),
-			 True,
-			 Matrix.Translation(rmfs[(index*3)+1][0])@(distance*rmfs[(index*3)+1][-1]),
-			 )
-			
-			if handle_right:
-				point.handle_right = handle_right
-
-			# Approximate left handle
-			handle_left = self.find_best_handle_length((
-			 p0, point.handle_right, next_point.handle_left, p3),
-			 False,
-			 Matrix.Translation(rmfs[(index*3)+2][0])@(distance*rmfs[(index*3)+2][-1]),
-			 )
-
-			if handle_left:
-				next_point.handle_left = handle_left
-			
-		# Fix the first and last point's idle handles
-		point_first, point_last = (bezier_points[0], bezier_points[-1])
-		
-		normal = rmfs[0][-1]
-		position = distance*normal
-		offset = Matrix.Translation(point_first.handle_left)
-		point_first.handle_left = offset@position
-		point_first.handle_left = ((point_first.handle_left - point_first.co ) + bezier_points_lookup[0][0])
-
-		normal = rmfs[-1][-1]
-		position = distance*normal		
-		offset = Matrix.Translation(point_last.handle_right)
-		point_last.handle_right = offset@position
-		point_last.handle_right = ((point_last.handle_right - point_last.co) + bezier_points_lookup[-1][-1])
-
-		# set_pivot(curve, pivot)
-		# bpy.ops.object.mode_set(mode='EDIT')
-			
 		return {'FINISHED'}
 
 class BT_Remove(Operator, BT_Cursor):
@@ -2886,7 +2575,7 @@ class BT_Blend1Profile2Rails(Operator):
 	bl_options = {'REGISTER', 'UNDO'}
 	count: bpy.props.IntProperty(default=12, min=1, name='Count')
 	precision: bpy.props.IntProperty(name='Precision', min=1, max=100, default=10, description='Resolution of constraint curve. Low - may lead to missing points, high - to slow calculation')
-	search_limit: bpy.props.IntProperty(default=5, min=1, max=100, name = 'Search Limit', description='Limit of searching curves common points. Increase or decrease in case of search warnings')
+	search_limit: bpy.props.IntProperty(default=5, min=1, max=100, name = 'Search Limit', description='Curve ends closer than 10^-limit are common points. Increase or decrease in case of search warnings')
 		
 	@classmethod
 	def poll(cls, context):
@@ -2913,37 +2602,29 @@ class BT_Blend1Profile2Rails(Operator):
 		# bpy.ops.object.mode_set(mode='OBJECT')
 		# bpy.ops.object.transform_apply(location=True, rotation=False, scale=False)		
 
-		# points_map
-		points_map = {}
-		for curve in sel:
-			points_map[curve] = []
-			for point in curve.data.splines[0].bezier_points:
-				points_map[curve].append(to_world(self, curve.matrix_world, point.co.copy().freeze()))
-
 		path = context.active_object
 		rail_1 = None
 		rail_2 = None
 
 		need_reverse = []
 
-		if path not in points_map.keys():
+		if path not in sel:
 			self.report({'ERROR'}, "Construction data is not valid! Possible reason: context object is not in expected Path position between 2 Rails")
 			return {'CANCELLED'}
 
-		# find the closest curve to path start point    
-		for curve, coords in points_map.items():
-			if curve is not path:           
-				if is_equal(points_map[path][0], coords[0], self.search_limit):
-					rail_1 = curve
-				elif is_equal(points_map[path][0], coords[-1], self.search_limit):
-					need_reverse.append(curve)
+		# rails start on the path ends
+		nodes = get_curve_end_nodes(self, sel).tolist()
+		path_start, path_end = nodes[sel.index(path)]
+		for curve, (start, end) in zip(sel, nodes):
+			if curve is not path:
+				if rail_1 is None and path_start in (start, end):
 					rail_1 = curve
-
-				if is_equal(points_map[path][-1], coords[-1], self.search_limit):
-					need_reverse.append(curve)
-					rail_2 = curve
-				elif is_equal(points_map[path][-1], coords[0], self.search_limit):
+					if start != path_start:
+						need_reverse.append(curve)
+				elif rail_2 is None and path_end in (start, end):
 					rail_2 = curve
+					if start != path_end:
+						need_reverse.append(curve)
 
 		for curve in need_reverse:
 			reverse_curve(self, curve)
@@ -2957,22 +2638,12 @@ class BT_Blend1Profile2Rails(Operator):
 			self.report({'ERROR'}, "Rails must have equal number of points")
 			return {'CANCELLED'}            
 		
-		# snap points		
-		interpolated_points = space_interpolate_bezier(path, self.precision, self.count+1)[1:-1]
-
-		blends = blend_bezier(self, context, len(interpolated_points), BT_BezierCurve(rail_1), BT_BezierCurve(rail_2))
-		curves = []
-
+		# blends start on the path
+		blends = geometry.blend_1_profile_2_rails(get_bezier_points_array_world(rail_1), get_bezier_points_array_world(rail_2), get_bezier_points_array_world(path), self.count, precision=self.precision)
 		resolution = rail_1.data.splines[0].resolution_u
 
-		for index, blend in enumerate(blends):
-			curve = blend.build(context, resolution, 'BézierCurve', is_set_pivot=False)
-			p0 = curve.data.splines[0].bezier_points[0]
-			target = interpolated_points[index]
-			translation = Matrix.Translation(target-p0.co)
-			p0.co = translation @ p0.co
-			p0.handle_right = translation @ p0.handle_right
-			p0.handle_left = translation @ p0.handle_left       
+		for blend in blends:
+			BT_BezierCurve(blend.tolist()).build(context, resolution, 'BézierCurve', is_set_pivot=False)
 
 		for obj in context.selected_objects:
 			obj.select_set(False)
@@ -2998,41 +2669,16 @@ def blend_2_profiles_2_rails(self, context, count, *, curves):
 
 	resolution = path1.data.splines[0].resolution_u
 
-	path1_interp_points = space_interpolate_bezier(path1, self.precision, count)[1:-1]
-	path2_interp_points = space_interpolate_bezier(path2, self.precision, count)[1:-1]
-
-	# for index, point in enumerate(path1_interp_points):
-	# 	path1_interp_points[index] = path1.matrix_world.inverted()@point
-
-	# for index, point in enumerate(path2_interp_points):
-	# 	path2_interp_points[index] = path2.matrix_world.inverted()@point
-
-	# blends
-	blends = blend_bezier(self, context, len(path1_interp_points), BT_BezierCurve(profile1), BT_BezierCurve(profile2))
-
-	curves = []
-
-	# fit blends 
-	for index, blend in enumerate(blends):
-		curve = blend.build(context, resolution, 'BézierCurve', is_set_pivot=False)
-		p_first = curve.data.splines[0].bezier_points[0]
-		offset = Matrix.Translation(curve.matrix_world.inverted()@-p_first.co)
-
-		if index < len(path1_interp_points):
-			curve.data.transform(Matrix.Translation(offset@path1_interp_points[index]))
-
-		if index < len(path2_interp_points):
-			p_last = curve.data.splines[0].bezier_points[-1]
-			target = path2_interp_points[index]
-			offset = Matrix.Translation(curve.matrix_world.inverted()@(target - p_last.co))
-			p_last.co = target
-
-			p_last.handle_right = offset @ p_last.handle_right
-			p_last.handle_left = offset @ p_last.handle_left
+	points = [get_bezier_points_array_world(curve) for curve in (path1, profile1, profile2)]
+	if path2 is None:
+		# 3-sided loop, the second path collapses into the point where the profiles meet
+		points.insert(1, geometry.point_curve(points[2][-1, 1]))
+	else:
+		points.insert(1, get_bezier_points_array_world(path2))
 
-		curves.append(curve)
-	
-	return curves
+	# blends fitted between the paths
+	blends = geometry.blend_2_profiles_2_rails(*points, count, precision=self.precision)
+	return [BT_BezierCurve(blend.tolist()).build(context, resolution, 'BézierCurve', is_set_pivot=False) for blend in blends]
 
 class BT_Blend2Profiles2Rails(Operator):
 	bl_options = {'REGISTER', 'UNDO'}
@@ -3041,7 +2687,7 @@ class BT_Blend2Profiles2Rails(Operator):
 	bl_description = 'Build an array of interpolated Bézier curves. Takes 4 Bézier curves: 2 Rails and 2 Profiles'
 	count: bpy.props.IntProperty(default=1, min=1, soft_min=1, name = 'Count')
 	precision: bpy.props.IntProperty(name='Precision', min=1, max=100, default=10, description='Resolution of constraint curve. Low - may lead to missing points, high - to slow calculation')
-	search_limit : bpy.props.IntProperty(default=5, min=1, max=5, name = 'Search Limit', description='Limit of searching curves common points. Increase or decrease in case of search warnings')
+	search_limit : bpy.props.IntProperty(default=5, min=1, max=5, name = 'Search Limit', description='Curve ends closer than 10^-limit are common points. Increase or decrease in case of search warnings')
 	
 	@classmethod
 	def poll(cls, context):
@@ -3069,61 +2715,22 @@ class BT_Blend2Profiles2Rails(Operator):
 		# bpy.ops.object.mode_set(mode='OBJECT')
 		# bpy.ops.object.transform_apply(location=True, rotation=False, scale=False)		
 
-		points_map = {}
-		for curve in sel:
-			points_map[curve] = []
-			for point in curve.data.splines[0].bezier_points:
-				points_map[curve].append(to_world(self, curve.matrix_world, point.co.copy().freeze()))
-
 		horizon_1 = context.active_object
-		horizon_2 = None
-		vertical_1 = None
-		vertical_2 = None
 
-		need_reverse = []
-
-		if horizon_1 not in points_map.keys():
+		if horizon_1 not in sel:
 			self.report({'ERROR'}, "Construction data is not valid! Possible reason: context object is not one of 4 loop curves")
 			return {'CANCELLED'}
 
-		# find the closest curve to horizon_1 start point   
-		for curve, coords in points_map.items():
-			if curve is not horizon_1:                                  
-				if is_equal(points_map[horizon_1][0], coords[0], self.search_limit):
-					vertical_1 = curve                          
-				elif is_equal(points_map[horizon_1][0], coords[-1], self.search_limit):
-					need_reverse.append(curve)              
-					vertical_1 = curve                      
-									
-				if is_equal(points_map[horizon_1][-1], coords[-1], self.search_limit):
-					need_reverse.append(curve)
-					vertical_2 = curve                                      
-				elif is_equal(points_map[horizon_1][-1], coords[0], self.search_limit):
-					vertical_2 = curve
-
-				if  (not is_equal(points_map[horizon_1][0], coords[0], self.search_limit) and not is_equal(points_map[horizon_1][0], coords[-1], self.search_limit)) and (not is_equal(points_map[horizon_1][-1], coords[0], self.search_limit) and not is_equal(points_map[horizon_1][-1], coords[-1], self.search_limit)):
-					horizon_2 = curve
-
-		for curve in need_reverse:
-			reverse_curve(self, curve)
+		loop = next((loop for loop in geometry.curve_loops(get_curve_end_nodes(self, sel), sides=(4,)) if sel.index(horizon_1) in [index for index, _ in loop]), None)
+		if loop is None:
+			self.report({'ERROR'}, "Construction data is not valid. Check if the curve loop is enclosed and there are no gaps between curves")
+			return {'CANCELLED'}
 
-		for curve in (horizon_1, vertical_1, vertical_2, horizon_2):
-			if curve is None:
-				self.report({'ERROR'}, "Construction data is not valid. Check if the curve loop is enclosed and there are no gaps between curves")
-				return {'CANCELLED'}
+		horizon_1, horizon_2, vertical_1, vertical_2 = orient_loop_curves(self, sel, geometry.loop_sides(loop, sel.index(horizon_1)), {})
 		
 		if len(horizon_1.data.splines[0].bezier_points) != len(horizon_2.data.splines[0].bezier_points) or len(vertical_1.data.splines[0].bezier_points) != len(vertical_2.data.splines[0].bezier_points):
 			self.report({'ERROR'}, "Parallel curves must have equal number of points")
 			return {'CANCELLED'}
-		
-		points_map.clear()
-		for curve in (horizon_1, vertical_1, vertical_2, horizon_2):
-			points_map[curve] = []
-			for point in curve.data.splines[0].bezier_points:
-				points_map[curve].append(to_world(self, curve.matrix_world, point.co.copy().freeze()))
-
-		if not is_equal(points_map[vertical_2][-1], points_map[horizon_2][-1], self.search_limit):
-			reverse_curve(self, horizon_2)
 
 		blend_2_profiles_2_rails(self, context, self.count+1, curves=(horizon_1, horizon_2, vertical_1, vertical_2))
 		
@@ -3137,50 +2744,38 @@ class BT_Blend2Profiles2Rails(Operator):
 		return{'FINISHED'}
 
 def add_polyline(self, context, coords, name, *, is_closed=False):
-	sel = context.selected_objects
-	
-	if bpy.ops.object.select_all.poll():
-		bpy.ops.object.select_all(action='DESELECT')
-
 	curve = bpy.data.curves.new(name="Polyline", type='CURVE')
 	curve.dimensions = '3D'
 	polyline = bpy.data.objects.new(name, curve)
 	
 	if len(coords) > 0:
 		spline = curve.splines.new('POLY')
-		
-		spline.points.add(len(coords)-1)		
-		
-		for index, coord in enumerate(coords):
-			if spline.points[index] is not None:
-				spline.points[index].co[:3] = coord
+		coords = np.array(coords, dtype=np.float64).reshape(-1, 3)
+
+		# closed polylines are pivoted at their bounds center, open ones at the first point
+		if is_closed:
+			pivot = (coords.min(axis=0) + coords.max(axis=0))/2
+		else:
+			pivot = coords[0].copy()
+
+		set_poly_points_array(spline, coords - pivot)
+		polyline.matrix_world.translation = pivot
 	
 	context.scene.collection.objects.link(polyline)
 	polyline.select_set(True)
 	context.view_layer.objects.active = polyline
-	bpy.ops.object.origin_set(type='ORIGIN_GEOMETRY', center='BOUNDS')
 
 	polyline.data.bevel_depth = context.scene.bt_pipe_radius
 	polyline.data.bevel_resolution = context.scene.bt_pipe_resolution
 	polyline.data.extrude = context.scene.bt_band_width
 
-	if not is_closed:
-		set_pivot(polyline, polyline.matrix_world@polyline.data.splines[0].points[0].co.xyz)
-
-	for obj in sel:
-		obj.select_set(True)	
-
 	return polyline
 
 def add_polyline_spline(self, context, curve, data):
 	# add a new spline to the existing polyline
 	# data is a list of points
 	spline = curve.data.splines.new('POLY')
-	spline.points.add(len(data)-1)
-
-	for index, point in enumerate(data):
-		spline.points[index].co = point
-
+	set_poly_points_array(spline, data)
 	return spline
 
 def add_bezier(self, context, resolution, name):
@@ -3204,55 +2799,24 @@ def add_bezier(self, context, resolution, name):
 def create_bezier(self, context, data, resolution, name):
 	bezier = add_bezier(self, context, resolution, name)
 	spline = bezier.data.splines[0]
-	points = bezier.data.splines[0].bezier_points
 
-	# if n-degree Bézier has more than 2 points
-	if isinstance(data, list):
-		# <data> is a list of chunks of vectors
-		# each chunk is a portion of n-degree spline
-		spline.bezier_points.add(len(data))
-	
-		for index, chunk in enumerate(data):
-			points[index].co = chunk.p0_co          
-			points[index].handle_right = chunk.p0_handle_right          
-			points[index+1].co = chunk.p1_co
-			points[index+1].handle_left = chunk.p1_handle_left  
-	
-	else: # standard 2-point cubic bezier
-		spline.bezier_points.add(1)
-		points[0].co = data.p0_co
-		points[0].handle_left = data.p0_handle_left
-		points[0].handle_right = data.p0_handle_right
-		points[1].co = data.p1_co
-		points[1].handle_left = data.p1_handle_left
-		points[1].handle_right = data.p1_handle_right
+	# <data> is either a standard 2-point cubic bezier or a list of chunks of vectors
+	# each chunk is a portion of n-degree spline
+	# chunks don't define the outer handles of the end points, they used to stay at the new points' default (0, 0, 0)
+	# and now mirror the inner handles, which doesn't change the open curve's shape
+	points = bezier_chunks_to_array(data)
+	if not isinstance(data, list):
+		points[0, 0] = data.p0_handle_left
+		points[-1, 2] = data.p1_handle_right
 
+	set_bezier_points_array(spline, points)
 	return bezier
 
 def add_bezier_spline(self, context, curve, data, resolution):
 	# add a new spline to the existing bezier curve
 	spline = curve.data.splines.new('BEZIER')
-	points = spline.bezier_points  
-	if isinstance(data, list):
-		points.add(len(data))           
-		for index, chunk in enumerate(data):
-			points[index].co = chunk.p0_co          
-			points[index].handle_right = chunk.p0_handle_right      
-			points[index+1].co = chunk.p1_co
-			points[index+1].handle_left = chunk.p1_handle_left
-	else:
-		spline.bezier_points.add(1)
-		points[0].co = data.p0_co
-		points[0].handle_left = data.p0_handle_left
-		points[0].handle_right = data.p0_handle_right
-		points[1].co = data.p1_co
-		points[1].handle_left = data.p1_handle_left
-		points[1].handle_right = data.p1_handle_right
-
-	# fix idle handles
-	points[0].handle_left = Matrix.Translation(points[0].co) @ points[0].co - points[0].handle_right
-	points[-1].handle_right = Matrix.Translation(points[-1].co) @ points[-1].co - points[-1].handle_left
-
+	# idle end handles are mirrored
+	set_bezier_points_array(spline, bezier_chunks_to_array(data))
 	spline.resolution_u = resolution
 	return spline
 
@@ -3260,26 +2824,8 @@ def blend_bezier(self, context, count, curve1, curve2):
 	if count == 0:
 		return []
 	
-	blends = []
-
-	count += 1
-	for index in range(count):
-		if index == 0:
-			continue
-
-		t = index/count
-
-		interpolated_points = []
-		for i, point in enumerate(curve1.points):           
-			interpolated_points.append([
-				interpolate_2_vectors(self, point[0], curve2.points[i][0], t),
-				interpolate_2_vectors(self, point[1], curve2.points[i][1], t),              
-				interpolate_2_vectors(self, point[2], curve2.points[i][2], t),
-				])
-		
-		blends.append(BT_BezierCurve(interpolated_points))
-
-	return blends
+	blends = geometry.blend(np.array(curve1.points), np.array(curve2.points), count)
+	return [BT_BezierCurve([[Vector(vector) for vector in point] for point in points]) for points in blends.tolist()]
 
 def rebuild_bezier(self, context, curve):   
 	name = copy(curve.name)
@@ -3409,6 +2955,8 @@ class BT_Convert(Operator):
 	to_wireframe: bpy.props.BoolProperty(name='Wireframe', description='Converts the result to a mesh wireframe object')
 	to_face: bpy.props.BoolProperty(name='Face', description='Converts the result to a mesh single-face object')
 	exact: bpy.props.BoolProperty(name='Exact', description='No spacing. Keep existing Bézier interpolation')
+	adaptive: bpy.props.BoolProperty(name='Adaptive', description='Mesh vertices placed by curvature instead of Resolution: more in bends, fewer on flat spans')
+	tolerance: bpy.props.FloatProperty(name='Tolerance', default=0.001, min=0.00001, precision=5, description='Largest distance between the curve and the mesh edges in adaptive mode')
 
 	do_not_remove = []
 
@@ -3446,6 +2994,10 @@ class BT_Convert(Operator):
 			column.separator(factor=1.0)
 
 		column.prop(self, 'exact')
+		if self.to_wireframe or self.to_face:
+			column.prop(self, 'adaptive')
+			if self.adaptive:
+				column.prop(self, 'tolerance')
 		column.prop(self, 'remove_src')	
 
 	# find the handle for a square bezier 
@@ -3583,12 +3135,26 @@ class BT_Convert(Operator):
 		return spline
 	
 	def bezier_to_poly(self, context, curve, spline):		
-		bezier_points = spline.bezier_points
-		interpolated_points = []		
-		matrix=curve.matrix_world
-		poly_points = [matrix.inverted()@point.to_4d() for point in (mathutils_interpolate_n_bezier_points(curve, self.resolution) if self.exact else space_interpolate_bezier(curve, 1000, self.resolution))]
-		spline = add_polyline_spline(self, context, curve, poly_points)
-		return spline
+		# local space samples of this spline, cyclic splines stay closed
+		poly_points = self.get_spline_mesh_points(spline)
+		poly_spline = add_polyline_spline(self, context, curve, poly_points)
+		poly_spline.use_cyclic_u = spline.use_cyclic_u
+		return poly_spline
+
+	def get_spline_mesh_points(self, spline):
+		# local space points of a spline, the closing point of cyclic bezier splines is not repeated
+		if spline.type != 'BEZIER':
+			return get_poly_points_array(spline)
+
+		points = get_bezier_points_array_closed(spline)
+		if self.adaptive and (self.to_wireframe or self.to_face):
+			# flat spans are split until they are within tolerance
+			samples = geometry.adaptive_samples(points, self.tolerance)
+		elif self.exact:
+			samples = geometry.evaluate_splines([points], [self.resolution])[0]
+		else:
+			samples = geometry.space_interpolate(points, 1000, self.resolution)
+		return samples[:-1] if spline.use_cyclic_u and len(samples) > 1 else samples
 
 	def explicit_to_bezier(self, spline, handle_type):
 		spline.type = 'BEZIER'
@@ -3607,89 +3173,38 @@ class BT_Convert(Operator):
 		return new_curve
 
 	def mesh_to_curve(self, obj):
+		mesh = obj.data
+		coords = np.empty(len(mesh.vertices)*3, dtype=np.float32)
+		mesh.vertices.foreach_get('co', coords)
+		edges = np.empty(len(mesh.edges)*2, dtype=np.int32)
+		mesh.edges.foreach_get('vertices', edges)
+
+		# every chain or loop of edges becomes a spline
+		chains = geometry.edge_chains(edges, len(mesh.vertices))
+		if not len(chains):
+			self.do_not_remove.append(obj)
+			return
+
 		curve_data = bpy.data.curves.new('Curve', 'CURVE')
 		curve_data.dimensions = '3D'		
 		curve = bpy.data.objects.new('ConvertedCurve', curve_data)
-		spline = curve.data.splines.new('POLY')
 		bpy.context.scene.collection.objects.link(curve)
-
 		curve.matrix_world = obj.matrix_world		
-		mesh = obj.data		
 
-		bm = bmesh.new()
-		verts = bm.verts
-		edges = bm.edges
-		bm.from_mesh(mesh)
-
-		verts.index_update()
-		verts.ensure_lookup_table()		
-		edges.index_update()
-		edges.ensure_lookup_table()	
-		
-		# find start_vert as an entry point	for search	
-		start_vert = verts[0] # if closed loop
-		is_closed_loop = True # if not closed loop		
-		for vert in verts:
-			if len(vert.link_edges) == 1:
-				start_vert = vert
-				is_closed_loop = False
-				break	
-
-		# find start edge
-		start_edge = [edge for edge in edges if (start_vert in edge.verts)][0]
-
-		ordered_edges = []
-		ordered_verts = [start_vert.index]
-
-		def find_next_edge_recursive(edge, vert):
-			if edge is None:
-				return None
-			
-			if not edge.index in ordered_edges:
-				ordered_edges.append(edge.index)
-
-			if not vert.index in ordered_verts:
-				ordered_verts.append(vert.index)
-
-			link_edges = list(vert.link_edges)
-			if len(link_edges) > 1:
-				link_edges.remove(edge)
-				next_edge = link_edges[0]
-
-				# if loop
-				if next_edge.index in ordered_edges:
-					return None
-
-				return find_next_edge_recursive(next_edge, next_edge.other_vert(vert))
-
-			return None		
-		
-		find_next_edge_recursive(start_edge, start_edge.other_vert(start_vert))
-				
-		if len(ordered_verts) == len(verts):
-			spline.points.add(len(verts)-1)
-			for index, index_ordered in enumerate(ordered_verts):
-				spline.points[index].co.xyz = verts[index_ordered].co.copy()
-
-			if is_closed_loop:
-				spline.points.add(1)
-				spline.points[-1].co.xyz = spline.points[0].co.xyz
+		coords = coords.reshape(-1, 3)
+		for chain in chains:
+			spline = curve.data.splines.new('POLY')
+			set_poly_points_array(spline, coords[chain])
 
 			if self.type == 'Bezier':
 				if self.keep_all_points:
 					self.explicit_to_bezier(spline, self.handle_type)
 				else:
-					new_spline = self.poly_to_bezier(bpy.context, curve, spline)
+					self.poly_to_bezier(bpy.context, curve, spline)
 					curve.data.splines.remove(spline)
 
-			bpy.context.view_layer.objects.active = curve
-			curve.select_set(True)
-
-		else:
-			# self.report({'ERROR'}, self.bl_idname + ': Count of converted and original points is not the same!')			
-			self.do_not_remove.append(obj)
-		
-		bm.free()
+		bpy.context.view_layer.objects.active = curve
+		curve.select_set(True)
 
 	def any_to_mesh(self, context, curve):
 		data = bpy.data
@@ -3697,49 +3212,35 @@ class BT_Convert(Operator):
 		mesh = data.meshes.new(curve.name + ' mesh')
 		obj = bpy.data.objects.new(curve.name, mesh)
 		scene.collection.objects.link(obj)
-		matrix = curve.matrix_world
 
 		bm = bmesh.new()
 		bm.from_mesh(mesh)		
 		
-		edge_buffer = []
-		points = (mathutils_interpolate_n_bezier_points(curve, self.resolution) if self.exact else space_interpolate_bezier(curve, 1000, self.resolution)) if is_bezier(curve) else [matrix@point.co.xyz for point in curve.data.splines[0].points]
-			
-		for index, point in enumerate(points):
-			points[index] = matrix.inverted()@point
-
-		for point in points:
-			bm.verts.new(point)
-
-		bm.verts.index_update()
-		bm.verts.ensure_lookup_table()
+		# every spline is a chain of edges, closed for cyclic splines, and optionally a face
+		view_direction = get_view_direction(self, context)
+		normal_matrix = curve.matrix_world.to_3x3().inverted().transposed()
+		for spline in curve.data.splines:
+			if spline.type == 'NURBS':
+				continue
 
-		for index, vert in enumerate(bm.verts):
-			if index + 1 != len(bm.verts):
-				edge_buffer.append([vert, bm.verts[index+1]])
+			verts = [bm.verts.new(point) for point in self.get_spline_mesh_points(spline).tolist()]
+			for vert, next_vert in zip(verts, verts[1:]):
+				bm.edges.new((vert, next_vert))
+			if spline.use_cyclic_u and len(verts) > 2:
+				bm.edges.new((verts[-1], verts[0]))
 
-		for i in range(len(points)-1):
-			bm.edges.new(edge_buffer[i])
+			if self.to_face and len(verts) > 2:
+				face = bm.faces.new(verts)
+				face.normal_update()
 
-		bm.edges.index_update()
-		bm.edges.ensure_lookup_table()
+				# new face should be turned towards view direction, hopefully
+				if (normal_matrix @ face.normal).dot(view_direction) < 0:
+					face.normal_flip()
+					face.normal_update()
 
 		weld_map = bmesh.ops.find_doubles(bm, verts=bm.verts, dist=1e-5)
 		bmesh.ops.weld_verts(bm, targetmap=weld_map['targetmap'])
 
-		if self.to_face:
-			face = bm.faces.new(
-				[vert for vert in bm.verts]
-				)
-			bm.faces.index_update()
-			bm.faces.ensure_lookup_table()
-			face.normal_update()
-
-			# new face should be turned towards view direction, hopefully
-			if face.normal.dot(get_view_direction(self, context)) < 0:
-				face.normal_flip()
-				face.normal_update()
-
 		bm.to_mesh(mesh)
 		bm.free()
 		obj.matrix_world = curve.matrix_world
@@ -3769,7 +3270,8 @@ class BT_Convert(Operator):
 
 				new_curve = self.add_curve_copy(curve)	
 
-				for spline in new_curve.data.splines:
+				# new splines are appended while converting, only the source ones are walked
+				for spline in list(new_curve.data.splines):
 					if not spline.type in {'BEZIER', 'POLY'}:
 						self.report({'WARNING'}, self.bl_idname + ": " + str(spline) + " unsupported type " + spline.type)
 						continue
@@ -3838,174 +3340,154 @@ class BT_ChangeColor(Operator):
 		return {'FINISHED'}
 
 # MESH OPS ######################################################################
-def recalculate_face_normal(self, context, face):
-	if face.normal.dot(get_view_direction(self, context).normalized()) < 0:
-		face.flip()
-
-def get_quad_loop_verts_data(self, curve_1_interp_points_buffer, curve_2_interp_points_buffer):
-	curve_2_interp_points_buffer.reverse()
-	vertex_buffer = []
-
-	for point in curve_1_interp_points_buffer:
-		vertex_buffer.append(point)
-
-	for point in curve_2_interp_points_buffer:
-		vertex_buffer.append(point)
-
-	return vertex_buffer
-
-def build_quad_loop(self, bm, loop):
-	verts_buffer_size = len(loop)
-
-	for index, vert in enumerate(loop):
-		if index < (verts_buffer_size/2)-1:
-			try:
-				new_face = bm.faces.new(
-					[
-						loop[index],
-						loop[index+1],
-						loop[(verts_buffer_size-1)-(index+1)],
-						loop[(verts_buffer_size-1)-index]
-					]
-				)
-				recalculate_face_normal(self, bpy.context, new_face)
-			except:				
-				pass
-
-		bm.faces.index_update()
-		bm.faces.ensure_lookup_table()
-
-		for face in bm.faces:
-			face.smooth = True
-
-def loft_bezier(self, context, curves, count, flip_normals, merge_distance, *, precision=10, name):
-	data = bpy.data
-	scene = context.scene
-	BT_Loft_data = data.meshes.new('BT_Loft_data')
-
-	bm = bmesh.new()
-	bm.from_mesh(BT_Loft_data)
-
-	# each quad loop vertex buffer will be stored in vertex_buffer<collection of collections>
-	vertex_buffer = []
-	
-	for index, curve in enumerate(curves):
-		if (index+1) >= len(curves):
-			break
-		
-		curve_next = curves[index+1]
-		vertex_buffer.append(get_quad_loop_verts_data(self,
-			[point for point in space_interpolate_bezier(curve, precision, count)],
-			[point for point in space_interpolate_bezier(curve_next, precision, count)]
-			)
-		)
-
-	# now we fill bm.verts and build faces
-	for loop in vertex_buffer:
-		quads = []
-		for vert in loop:
-			quads.append(bm.verts.new(vert))
-
-		# build quad loop
-		build_quad_loop(self, bm, quads)
-
-		bm.verts.index_update()
-		bm.verts.ensure_lookup_table()
-
-	for vert in bm.verts:
-		vert.normal_update()
-
-	weld_map = bmesh.ops.find_doubles(bm, verts=bm.verts, dist=merge_distance) 
-	bmesh.ops.weld_verts(bm, targetmap=weld_map['targetmap'])
-
-	bm.faces.ensure_lookup_table()
-	
-	for vert in bm.faces:
-		vert.normal_update()    
+def build_grid_mesh(self, context, grid, name, *, flip_normals=False, merge_distance=0.0):
+	# (rows, cols, 3) grid of samples to a mesh, welds boundary vertices closer than merge_distance
+	verts, faces = geometry.grid_to_quads(grid, merge_distance=merge_distance)
+	return build_quad_mesh(self, context, verts, faces, name, flip_normals=flip_normals)
+
+def build_quad_mesh(self, context, verts, faces, name, *, flip_normals=False, normals=None):
+	# quads share one winding, so the whole mesh is oriented towards the view at once
+	flip = geometry.needs_flip(verts, faces, np.array(get_view_direction(self, context)), flip=flip_normals)
+	loops, totals = geometry.quads_to_polygons(faces[:, ::-1] if flip else faces)
+	mesh = mesh_from_polygons(name, verts, loops, totals)
+	if normals is not None:
+		# analytic (V, 3) vertex normals turn with the faces, zero vectors keep the default normal
+		mesh.normals_split_custom_set_from_vertices(np.asarray(-normals if flip else normals, dtype=np.float32))
+	return mesh
+
+def mesh_from_polygons(name, verts, loops, totals):
+	# writes (V, 3) verts, flat loop vertex indices and per polygon loop totals straight into a new mesh
+	mesh = bpy.data.meshes.new(name)
+	mesh.vertices.add(len(verts))
+	mesh.loops.add(len(loops))
+	mesh.polygons.add(len(totals))
+	mesh.vertices.foreach_set('co', np.asarray(verts, dtype=np.float32).ravel())
+	mesh.loops.foreach_set('vertex_index', np.asarray(loops, dtype=np.int32))
+	mesh.polygons.foreach_set('loop_start', (np.cumsum(totals) - totals).astype(np.int32))
+	mesh.polygons.foreach_set('use_smooth', np.ones(len(totals), dtype=bool))
+	mesh.update(calc_edges=True)
+	return mesh
+
+def loft_bezier(self, context, curves, count, flip_normals, merge_distance, *, precision=10, tolerance=None, name):
+	if len(curves) < 2:
+		return None
 
-	if are_normals_flipped(self, context, bm):
-		for face in bm.faces:           
-			face.normal_flip()
-			face.normal_update()
+	# each curve is sampled once into a row of the shared vertex grid
+	# with a <tolerance>, columns are placed where any of the curves bends instead of <count> even spans
+	points = [get_bezier_points_array_world(curve) for curve in curves]
+	if tolerance is not None:
+		count = geometry.adaptive_fractions(points, tolerance, precision=precision)
+	verts, faces = geometry.loft(points, count, precision=precision, merge_distance=merge_distance)
+	return quad_mesh_object(self, context, verts, faces, name, flip_normals=flip_normals)
+
+def get_patch_side_points(curves, sides):
+	# world space point arrays of (curve index, is_reversed) sides, the source curves keep their direction
+	# a missing side (3-sided loop) stays None
+	points = []
+	for side in sides:
+		if side is None:
+			points.append(None)
+			continue
+		index, is_reversed = side
+		side_points = get_bezier_points_array_world(curves[index])
+		points.append(geometry.reverse(side_points) if is_reversed else side_points)
+	return points
 
-	if flip_normals:
-		for face in bm.faces:           
-			face.normal_flip()
-			face.normal_update()
+def patch_bezier(self, context, curves, sides, count_u, count_v, flip_normals, merge_distance, *, precision=10, surface='BLEND', tolerance=None, name):
+	# the blends between the profiles only live as point arrays, only the final mesh becomes a datablock
+	# <surface> 'COONS' shapes the interior by all 4 sides and writes its analytic normals
+	verts, faces, normals = geometry.patch_loop(*get_patch_side_points(curves, sides), count_u, count_v, precision=precision, surface=surface, tolerance=tolerance, merge_distance=merge_distance)
+	return quad_mesh_object(self, context, verts, faces, name, flip_normals=flip_normals, normals=normals)
 
-	# finalizing bmesh
-	bm.to_mesh(BT_Loft_data)    
+def quad_mesh_object(self, context, verts, faces, name, *, flip_normals=False, normals=None):
+	BT_Loft_data = build_quad_mesh(self, context, verts, faces, 'BT_Loft_data', flip_normals=flip_normals, normals=normals)
 
 	# finalizing BT_Loft
 	BT_Loft_object = bpy.data.objects.new(name, BT_Loft_data)
 	BT_Loft_data.calc_loop_triangles()
-	scene.collection.objects.link(BT_Loft_object)
-	bm.free()
+	context.scene.collection.objects.link(BT_Loft_object)
 
 	return BT_Loft_object	
 
 def loft_polyline(self, context, curves, flip_normals):
-	# create bmesh
-	data = bpy.data
-	scene = context.scene
-	BT_Loft_data = data.meshes.new('BT_Loft_data')
-
-	bm = bmesh.new()
-	bm.from_mesh(BT_Loft_data)
-
-	# each quad loop vertex buffer will be stored in vertex_buffer<collection of collections>
-	vertex_buffer = []
-
-	for index, curve in enumerate(curves):
-		if (index+1) >= len(curves):
-			break        
-
-		vertex_buffer.append(get_quad_loop_verts_data(self,
-			[to_world(self, curve.matrix_world, point) for point in [Vector((point.co.xyz)) for point in curve.data.splines[0].points]],
-			[to_world(self, curves[index+1].matrix_world, point) for point in [Vector((point.co.xyz)) for point in curves[index+1].data.splines[0].points]]
-			)
-		)
-
-	# now we fill bm.verts and build faces
-	for loop in vertex_buffer:
-		quads = []
-		for vert in loop:
-			quads.append(bm.verts.new(vert))
-
-		# build quad loop
-		build_quad_loop(self, bm, quads)
-
-		bm.verts.index_update()
-		bm.verts.ensure_lookup_table()
-
-	for vert in bm.verts:
-		vert.normal_update()
+	if len(curves) < 2:
+		return None
 
-	weld_map = bmesh.ops.find_doubles(bm, verts=bm.verts, dist=0.0001)
-	bmesh.ops.weld_verts(bm, targetmap=weld_map['targetmap'])
+	coords = [transform_points_array(curve.matrix_world, get_poly_points_array(curve.data.splines[0])) for curve in curves]
+	count = len(coords[0])
 
-	if flip_normals:
-		for face in bm.faces:
-			face.normal_flip()
-			face.normal_update()
+	if any(len(points) != count for points in coords):
+		self.report({'ERROR'}, self.bl_label + ': Polylines must have the same number of points!')
+		return None
 
-	# finalizing bmesh
-	bm.to_mesh(BT_Loft_data)    
+	BT_Loft_data = build_grid_mesh(self, context, np.stack(coords), 'BT_Loft_data', flip_normals=flip_normals, merge_distance=0.0001)
 
 	# finalizing BT_Loft
 	BT_Loft_object = bpy.data.objects.new('BT_LoftMesh', BT_Loft_data)
 	BT_Loft_data.calc_loop_triangles()
-	scene.collection.objects.link(BT_Loft_object)
-	bm.free()
+	context.scene.collection.objects.link(BT_Loft_object)
 
 	return BT_Loft_object
 
+# Batch meshes -------------------------
+# Many independent Loft/Patch meshes: sampling and grid generation run in pure NumPy worker
+# processes (geometry.build_mesh_data), meshes are written on the main thread
+
+def loft_description(curves, count, *, precision=10, merge_distance=0.0, tolerance=None, flip_normals=False, direction=None, name='LoftMesh'):
+	# batch description of a loft through Bézier curve objects, read on the main thread
+	return {
+		'type': 'LOFT',
+		'name': name,
+		'curves': [get_bezier_points_array_world(curve) for curve in curves],
+		'count': count,
+		'precision': precision,
+		'merge_distance': merge_distance,
+		'tolerance': tolerance,
+		'flip_normals': flip_normals,
+		'direction': direction
+	}
+
+def patch_description(curves, sides, count_u, count_v, *, precision=10, merge_distance=0.0, tolerance=None, surface='BLEND', flip_normals=False, direction=None, name='PatchMesh'):
+	# batch description of one loop of a patch, <sides> as returned by patch_loop_sides
+	horizon_1, horizon_2, vertical_1, vertical_2 = get_patch_side_points(curves, sides)
+	return {
+		'type': 'PATCH',
+		'name': name,
+		'rails': (horizon_1, horizon_2),
+		'profiles': (vertical_1, vertical_2),
+		'count_u': count_u,
+		'count_v': count_v,
+		'precision': precision,
+		'merge_distance': merge_distance,
+		'tolerance': tolerance,
+		'surface': surface,
+		'flip_normals': flip_normals,
+		'direction': direction
+	}
+
+def build_meshes_batch(context, descriptions, *, max_workers=None):
+	# <descriptions> are dicts of control point arrays and parameters, see geometry.build_mesh_data
+	# returns the new mesh objects linked to the scene, in order
+	objects = []
+	for description, (verts, loops, totals, normals) in zip(descriptions, geometry.build_mesh_data_batch(descriptions, max_workers=max_workers)):
+		name = description.get('name', 'BatchMesh')
+		mesh = mesh_from_polygons(name, verts, loops, totals)
+		if normals is not None:
+			mesh.normals_split_custom_set_from_vertices(np.asarray(normals, dtype=np.float32))
+		obj = bpy.data.objects.new(name, mesh)
+		context.scene.collection.objects.link(obj)
+		objects.append(obj)
+
+	return objects
+
 class BT_Loft(Operator):
 	bl_idname = 'object.bt_bezier_mesh_loft'
 	bl_label = 'Loft'
 	bl_description = 'Build a Loft Mesh. Takes at least 2 parallel Bézier or Polyline curves'
 	bl_options = {'REGISTER', 'UNDO'}
 	resolution: bpy.props.IntProperty(name='Resolution', default=8, min=1)
+	adaptive: bpy.props.BoolProperty(name='Adaptive', default=False, description='Place vertices by curvature instead of Resolution: more in bends, fewer on flat spans. Bézier curves only')
+	tolerance: bpy.props.FloatProperty(name='Tolerance', default=0.001, min=0.00001, precision=5, description='Largest distance between the curves and the mesh edges in adaptive mode')
 	precision: bpy.props.IntProperty(name='Precision', min=1, max=100, default=10, description='Resolution of constraint curve. Low - may lead to missing points, high - to slow calculation')
 	merge_distance: bpy.props.FloatProperty(name='Merge Distance', default=0.001, min=0, soft_min=0, description='Distance at which neighbouring vertices will merge')
 	flip_normals: bpy.props.BoolProperty(name='Flip Normals', default=False, description='Flip face normals', options={'SKIP_SAVE'})
@@ -4018,7 +3500,8 @@ class BT_Loft(Operator):
 	def draw(self, context):
 		layout = self.layout
 		column = layout.column()
-		column.prop(self, 'resolution')
+		column.prop(self, 'adaptive')
+		column.prop(self, 'tolerance' if self.adaptive else 'resolution')
 		column.prop(self, 'precision')		
 		column.prop(self, 'merge_distance')
 		column.prop(self, 'flip_normals', toggle=1)
@@ -4039,7 +3522,7 @@ class BT_Loft(Operator):
 
 			# sort curves in the selection list by distance starting from the active one        
 			sort_by_distance(self, context.object, curves)          
-			loft_mesh = loft_bezier(self, context, curves, resolution+1, self.flip_normals, self.merge_distance, precision=self.precision, name='LoftMesh') 
+			loft_mesh = loft_bezier(self, context, curves, resolution+1, self.flip_normals, self.merge_distance, precision=self.precision, tolerance=self.tolerance if self.adaptive else None, name='LoftMesh') 
 
 			if loft_mesh is not None:
 				loft_mesh.select_set(True)
@@ -4072,18 +3555,36 @@ class BT_Loft(Operator):
 			
 		return {'FINISHED'}
 
+def patch_loop_sides(self, context, curves, loop):
+	# patch sides of a loop with matching point counts, the context object is preferred as horizon_1
+	counts = [len(curve.data.splines[0].bezier_points) for curve in curves]
+	candidates = [index for index, _ in loop]
+	if context.object in curves and curves.index(context.object) in candidates:
+		candidates.insert(0, curves.index(context.object))
+
+	for first in candidates:
+		horizon_1, horizon_2, vertical_1, vertical_2 = geometry.loop_sides(loop, first)
+		if counts[vertical_1[0]] == counts[vertical_2[0]] and (horizon_2 is None or counts[horizon_1[0]] == counts[horizon_2[0]]):
+			return horizon_1, horizon_2, vertical_1, vertical_2
+	return None
+
 class BT_Patch(Operator):
 	bl_idname = "object.bt_build_bezier_mesh_patch"
 	bl_label = "Patch"
-	bl_description = 'Build a Patch mesh. Takes 4 Bézier curves: 2 Rails and 2 Profiles'
+	bl_description = 'Build Patch meshes. Takes loops of 4 Bézier curves: 2 Rails and 2 Profiles, or 3 curves meeting in one point'
 	bl_options = {'REGISTER', 'UNDO'}	
 	resolution_u: bpy.props.IntProperty(default=8, min=1, max=100, name='Resolution U')      
 	resolution_v: bpy.props.IntProperty(default=8, min=1, max=100, name = 'Resolution V')
 	precision: bpy.props.IntProperty(name='Precision', min=1, max=100, default=10, description='Resolution of constraint curve. Low - may lead to missing points, high - to slow calculation')
-	search_limit : bpy.props.IntProperty(default=5, min=1, max=5, name = 'Search Limit', description='Limit value for searching common points for loop curves. Increase or decrease in case of search warnings')
+	search_limit : bpy.props.IntProperty(default=5, min=1, max=5, name = 'Search Limit', description='Curve ends closer than 10^-limit are common points. Increase or decrease in case of search warnings')
 	merge_distance: bpy.props.FloatProperty(name='Merge Distance', default=0.001, min=0.0, description='Distance at which neighbouring vertices will merge')
 	flip_normals: bpy.props.BoolProperty(name='Flip Normals', default=False, description='Flip face normals', options={'SKIP_SAVE'})
 	remove_source: bpy.props.BoolProperty(name='Remove Source', default=False, description='Remove source curves and finish', options={'SKIP_SAVE'})
+	network: bpy.props.BoolProperty(name='Network', default=False, description='Build all loops into a single mesh with shared boundary vertices')
+	surface: bpy.props.EnumProperty(name='Surface', default='BLEND', items=[('BLEND', 'Blend', 'Profiles blended between the rails'), ('COONS', 'Coons', 'Coons patch shaped by all sides, with smooth analytic normals')])
+	adaptive: bpy.props.BoolProperty(name='Adaptive', default=False, description='Place vertices by curvature instead of Resolution: more in bends, fewer on flat spans')
+	tolerance: bpy.props.FloatProperty(name='Tolerance', default=0.001, min=0.00001, precision=5, description='Largest distance between the curves and the mesh edges in adaptive mode')
+	batch: bpy.props.BoolProperty(name='Worker Processes', default=False, description='Build the loops in parallel worker processes. Faster for many loops, the meshes appear when all of them are done')
 	
 	@classmethod
 	def poll(cls, context):
@@ -4092,10 +3593,21 @@ class BT_Patch(Operator):
 	def draw(self, context):
 		layout = self.layout
 		column = layout.column()
-		column.prop(self, 'resolution_u')
-		column.prop(self, 'resolution_v')
+		column.prop(self, 'adaptive')
+		if self.adaptive:
+			column.prop(self, 'tolerance')
+		else:
+			column.prop(self, 'resolution_u')
+			column.prop(self, 'resolution_v')
 		column.prop(self, 'precision')		
-		column.prop(self, 'merge_distance')
+		column.prop(self, 'surface')
+		column.prop(self, 'network')
+		row = column.row()
+		row.enabled = not self.network
+		row.prop(self, 'merge_distance')
+		row = column.row()
+		row.enabled = not self.network
+		row.prop(self, 'batch')
 		column.prop(self, 'search_limit')		
 		column.prop(self, 'flip_normals', toggle=True)
 		column.prop(self, 'remove_source')
@@ -4107,86 +3619,68 @@ class BT_Patch(Operator):
 			if  len(curve.data.splines) == 1 and is_bezier(curve):
 				continue
 			else:
-				self.report({'ERROR'}, "Patch requires selection of a loop made by 4 separate bezier curves")
+				self.report({'ERROR'}, "Patch requires selection of loops made by separate bezier curves")
 				return{'CANCELLED'}
 
-		# points_map
-		points_map = {}
-		for curve in sel:
-			points_map[curve] = []
-			for point in curve.data.splines[0].bezier_points:
-				points_map[curve].append(to_world(self, curve.matrix_world, point.co.copy().freeze()))
-
-		horizon_1 = context.object
-		horizon_2 = None
-		vertical_1 = None
-		vertical_2 = None
-
-		needs_reverse = []
-
-		if horizon_1 not in context.selected_objects:
-			self.report({'ERROR'}, "Context object must be one of the loop curves!")
-			return {'CANCELLED'}
-
-		# find the closest curve to horizon_1 start point   
-		for curve, coords in points_map.items():
-			if curve is not horizon_1:                          
-				if is_equal(points_map[horizon_1][0], coords[0], self.search_limit):
-					vertical_1 = curve                          
-				elif is_equal(points_map[horizon_1][0], coords[-1], self.search_limit):
-					needs_reverse.append(curve)             
-					vertical_1 = curve                      
-									
-				if is_equal(points_map[horizon_1][-1], coords[-1], self.search_limit):
-					needs_reverse.append(curve)
-					vertical_2 = curve                                      
-				elif is_equal(points_map[horizon_1][-1], coords[0], self.search_limit):
-					vertical_2 = curve
-
-				if  (not is_equal(points_map[horizon_1][0], coords[0], self.search_limit) and not is_equal(points_map[horizon_1][0], coords[-1], self.search_limit)) and (not is_equal(points_map[horizon_1][-1], coords[0], self.search_limit) and not is_equal(points_map[horizon_1][-1], coords[-1], self.search_limit)):
-					horizon_2 = curve
-
-		for curve in needs_reverse:
-			reverse_curve(self, curve)      
-
-		for curve in (horizon_1, vertical_1, vertical_2, horizon_2):
-			if curve is None:
-				self.report({'ERROR'}, "Patch construction data is not valid. Check if the curve perimeter is enclosed and there are no gaps between curves")
-				return {'FINISHED'}
-		
-		if len(horizon_1.data.splines[0].bezier_points) != len(horizon_2.data.splines[0].bezier_points) or len(vertical_1.data.splines[0].bezier_points) != len(vertical_2.data.splines[0].bezier_points):
-			self.report({'ERROR'}, "Parallel curves must have equal number of points")
-			return {'CANCELLED'}
+		# every closed loop of 3 or 4 curves in the selection is a patch
+		nodes = get_curve_end_nodes(self, sel)
+		loops = geometry.curve_loops(nodes)
+		if not len(loops):
+			self.report({'ERROR'}, "Patch construction data is not valid. Check if the curve perimeter is enclosed and there are no gaps between curves")
+			return {'FINISHED'}
 
-		points_map.clear()
-		for curve in (horizon_1, vertical_1, vertical_2, horizon_2):
-			points_map[curve] = []
-			for point in curve.data.splines[0].bezier_points:
-				points_map[curve].append(to_world(self, curve.matrix_world, point.co.copy().freeze()))
+		skipped = 0
+		patch_mesh = None
+		if self.network:
+			# one mesh, cells share the samples of their common curves
+			verts, faces, skipped = geometry.patch_network([get_bezier_points_array_world(curve) for curve in sel], nodes, loops, self.resolution_u, self.resolution_v, precision=self.precision, surface=self.surface, tolerance=self.tolerance if self.adaptive else None)
+			if len(faces):
+				patch_mesh = quad_mesh_object(self, context, verts, faces, 'PatchMesh', flip_normals=self.flip_normals)
+				patch_mesh.select_set(True)
+				context.view_layer.objects.active = patch_mesh
+			loops_to_patch = []
+		else:
+			loops_to_patch = loops
+
+		tolerance = self.tolerance if self.adaptive else None
+		if self.batch and len(loops_to_patch) > 1:
+			# every loop is a description for the worker processes, the meshes are written afterwards
+			descriptions = []
+			direction = np.array(get_view_direction(self, context))
+			for loop in loops_to_patch:
+				sides = patch_loop_sides(self, context, sel, loop)
+				if sides is None:
+					skipped += 1
+					continue
+				descriptions.append(patch_description(sel, sides, self.resolution_u, self.resolution_v, precision=self.precision, merge_distance=self.merge_distance, tolerance=tolerance, surface=self.surface, flip_normals=self.flip_normals, direction=direction))
+
+			for patch_mesh in build_meshes_batch(context, descriptions):
+				patch_mesh.data.calc_loop_triangles()
+				patch_mesh.select_set(True)
+				context.view_layer.objects.active = patch_mesh
+			loops_to_patch = []
+
+		for loop in loops_to_patch:
+			sides = patch_loop_sides(self, context, sel, loop)
+			if sides is None:
+				skipped += 1
+				continue
 
-		if not is_equal(points_map[vertical_2][-1], points_map[horizon_2][-1], self.search_limit):
-			reverse_curve(self, horizon_2)
+			patch_mesh = patch_bezier(self, context, sel, sides, self.resolution_u, self.resolution_v, self.flip_normals, self.merge_distance, precision=self.precision, surface=self.surface, tolerance=tolerance, name='PatchMesh')
+			if patch_mesh is not None:
+				patch_mesh.select_set(True)
+				context.view_layer.objects.active = patch_mesh
 
-		curves = [vertical_1]
-		blends = blend_2_profiles_2_rails(self, context, self.resolution_v, curves = (horizon_1, horizon_2, vertical_1, vertical_2))
-		curves.extend(blends)
-		curves.append(vertical_2)
-		patch_mesh = loft_bezier(self, context, curves, self.resolution_u, self.flip_normals, self.merge_distance, precision=self.precision, name='PatchMesh')
+		if skipped:
+			self.report({'WARNING'}, str(skipped) + " loop(s) skipped: parallel curves must have equal number of points")
 
-		if patch_mesh is not None:
-			patch_mesh.select_set(True)
-			context.view_layer.objects.active = patch_mesh			
-		
-		# horizon_1.select_set(True)
-		# context.view_layer.objects.active = horizon_1
-		
 		if self.remove_source:
-			for curve in (horizon_1, vertical_1, vertical_2, horizon_2):
-				if curve is not None and curve.name in bpy.data.objects:
-					bpy.data.objects.remove(curve, do_unlink=True)   
+			for index in {index for loop in loops for index, _ in loop}:
+				if sel[index].name in bpy.data.objects:
+					bpy.data.objects.remove(sel[index], do_unlink=True)
 
-		for blend in blends:
-			bpy.data.objects.remove(blend)
+		if patch_mesh is None:
+			return {'CANCELLED'}
 		
 		bpy.ops.object.origin_set(type='ORIGIN_GEOMETRY', center='MEDIAN')
 
@@ -4259,7 +3753,9 @@ def scene_ray_cast(self, context, cursor):
 #https://en.wikipedia.org/wiki/B%C3%A9zier_curve
 
 def is_bezier(curve):
-	return curve.type == 'CURVE' and curve.data.splines[0].type == 'BEZIER'
+	# every spline of the curve is a bezier spline
+	splines = curve.data.splines if curve.type == 'CURVE' else ()
+	return len(splines) > 0 and all(spline.type == 'BEZIER' for spline in splines)
 
 def is_equal_n(curve1, curve2):
 	if not is_bezier(curve1) or not is_bezier(curve2):
@@ -4437,55 +3933,263 @@ def mathutils_interpolate_bezier_points(self, points, count):
 		
 	return None
 
-def mathutils_interpolate_n_bezier_points(curve, count, *, world_space=True, proportional=False, debug=False):	
-	spline = curve.data.splines[0]
+# Batched Bézier evaluation -------------------------
+# Control points are pulled out of RNA in bulk with foreach_get and every segment
+# is evaluated at every t with a single Bernstein basis product
+
+def get_bezier_points_array(spline):
+	# (N, 3, 3) array of [handle_left, co, handle_right] per bezier point
 	points = spline.bezier_points
-	matrix = curve.matrix_world if world_space else Matrix()
-	interpolated_points = [matrix@points[0].co]
+	count = len(points)
+	data = np.empty((3, count*3), dtype=np.float32)
+	points.foreach_get('handle_left', data[0])
+	points.foreach_get('co', data[1])
+	points.foreach_get('handle_right', data[2])
+	return data.reshape(3, count, 3).transpose(1, 0, 2).astype(np.float64)
+
+def set_bezier_points_array(spline, points):
+	# writes an (N, 3, 3) array of [handle_left, co, handle_right], missing bezier points are added
+	# bezier points can't be removed, a spline with more than N points has to be replaced by the caller
+	bezier_points = spline.bezier_points
+	count = len(points)
+	if len(bezier_points) > count:
+		raise ValueError(f'Spline has {len(bezier_points)} points, cannot write {count}')
+	if len(bezier_points) < count:
+		bezier_points.add(count - len(bezier_points))
+	data = np.asarray(points, dtype=np.float32).transpose(1, 0, 2).reshape(3, -1)
+	bezier_points.foreach_set('handle_left', data[0])
+	bezier_points.foreach_set('co', data[1])
+	bezier_points.foreach_set('handle_right', data[2])
+
+# per bezier point data besides coordinates, handle types are enum values
+BEZIER_POINT_ATTRIBUTES = (
+	('handle_left_type', np.int32),
+	('handle_right_type', np.int32),
+	('hide', bool),
+	('radius', np.float32),
+	('select_control_point', bool),
+	('select_left_handle', bool),
+	('select_right_handle', bool),
+	('tilt', np.float32),
+	('weight_softbody', np.float32)
+)
+
+# per poly/NURBS point data besides coordinates
+POLY_POINT_ATTRIBUTES = (
+	('hide', bool),
+	('radius', np.float32),
+	('select', bool),
+	('tilt', np.float32),
+	('weight_softbody', np.float32)
+)
+
+def get_point_attributes(points, attributes=BEZIER_POINT_ATTRIBUTES):
+	# {attribute name : (N,) array}
+	values = {}
+	for name, dtype in attributes:
+		values[name] = np.empty(len(points), dtype=dtype)
+		points.foreach_get(name, values[name])
+	return values
+
+def set_point_attributes(points, attributes):
+	# bezier handle types should be written before coordinates, changing them recalculates handles
+	for name, values in attributes.items():
+		points.foreach_set(name, values)
+
+def keep_handles(bezier_points, indices):
+	# keep_handle_types for the points <indices> of a spline, written back in bulk
+	mask = np.zeros(len(bezier_points), dtype=bool)
+	mask[list(indices)] = True
+	for name in ('handle_left_type', 'handle_right_type'):
+		types = np.empty(len(bezier_points), dtype=np.int32)
+		bezier_points.foreach_get(name, types)
+		bezier_points.foreach_set(name, keep_handle_types(types, mask))
+
+def insert_bezier_point(spline, index, t):
+	# inserts a bezier point at t of segment <index> in place without changing the curve's shape
+	# the object, its data, modifiers and materials are kept, point data is shifted in bulk
+	# returns the index of the new point, it is the only selected one
+	bezier_points = spline.bezier_points
+	points = geometry.insert_point(get_bezier_points_array(spline), index, t)
+	attributes = {name: np.insert(values, index+1, values[index]) for name, values in get_point_attributes(bezier_points).items()}
+	for name in ('radius', 'tilt', 'weight_softbody'):
+		values = attributes[name]
+		values[index+1] = values[index] + t*(values[index+2] - values[index])
+	# only the new point is selected, hidden points stay hidden and the new one inherits hide from point <index>
+	for name in ('select_control_point', 'select_left_handle', 'select_right_handle'):
+		attributes[name][:] = False
+	attributes['select_control_point'][index+1] = True
+
+	# split handles are shorter than automatic ones would be
+	neighbours = np.zeros(len(points), dtype=bool)
+	neighbours[[index, index+2]] = True
+	for name in ('handle_left_type', 'handle_right_type'):
+		keep_handle_types(attributes[name], neighbours)[index+1] = HANDLE_TYPES['ALIGNED']
+
+	bezier_points.add(1)
+	set_point_attributes(bezier_points, attributes)
+	set_bezier_points_array(spline, points)
+	return index+1
+
+# spline settings copied to a replacement spline, written after its points exist since order can't exceed the point count
+SPLINE_SETTINGS = ('resolution_u', 'resolution_v', 'use_cyclic_u', 'use_cyclic_v', 'use_smooth', 'material_index', 'tilt_interpolation',
+	'radius_interpolation', 'use_endpoint_u', 'use_endpoint_v', 'use_bezier_u', 'use_bezier_v', 'order_u', 'order_v', 'hide')
+
+def new_spline_like(curve, source, count):
+	# appends a spline with the type and settings of <source> and <count> points
+	spline = curve.data.splines.new(source.type)
+	points = spline.bezier_points if source.type == 'BEZIER' else spline.points
+	points.add(count - 1)
+	for name in SPLINE_SETTINGS:
+		setattr(spline, name, getattr(source, name))
+	return spline
+
+def copy_spline(curve, source):
+	# appends a copy of <source>, points with their weights and attributes
+	if source.type == 'BEZIER':
+		spline = new_spline_like(curve, source, len(source.bezier_points))
+		set_point_attributes(spline.bezier_points, get_point_attributes(source.bezier_points))
+		set_bezier_points_array(spline, get_bezier_points_array(source))
+	else:
+		spline = new_spline_like(curve, source, len(source.points))
+		set_point_attributes(spline.points, get_point_attributes(source.points, POLY_POINT_ATTRIBUTES))
+		coords = np.empty(len(source.points)*4, dtype=np.float32)
+		source.points.foreach_get('co', coords)
+		spline.points.foreach_set('co', coords)
+	return spline
+
+def replace_spline(curve, source, count):
+	# replaces <source> by a spline with the same settings and <count> points at the same index of curve.data.splines
+	# splines can't be moved, the ones that followed <source> are copied behind the replacement
+	splines = curve.data.splines
+	index = list(splines).index(source)
+	spline = new_spline_like(curve, source, count)
+	splines.remove(source)
+	for following in list(splines)[index:-1]:
+		copy_spline(curve, following)
+		splines.remove(following)
+	return spline
 
-	disribution=[]
-	full_length = spline.calc_length()
+def replace_bezier_points(curve, spline, points, params):
+	# writes an (N, 3, 3) array over the points of <spline>, returns the spline holding them
+	# <params> place every new point on the old spline, integer params are kept points
+	# radius, tilt and soft body weight are interpolated along the old spline, hide is taken from the point before
+	# kept points keep their handle types, automatic handles of moved ones become ALIGNED/FREE, new points get ALIGNED
+	# bezier points can't be removed, a spline that loses points is replaced by a new one with the same settings
+	params = np.asarray(params, dtype=np.float64)
+	attributes = get_point_attributes(spline.bezier_points)
+	positions = np.arange(len(spline.bezier_points))
+	values = {name: np.interp(params, positions, attributes[name]).astype(np.float32) for name in ('radius', 'tilt', 'weight_softbody')}
+	values.update({name: np.zeros(len(points), dtype=bool) for name in ('select_control_point', 'select_left_handle', 'select_right_handle')})
+	before = np.minimum(np.floor(params).astype(int), len(positions) - 1)
+	values['hide'] = attributes['hide'][before]
+
+	kept = params == before
+	moved = kept & ~np.all(np.isclose(points, get_bezier_points_array(spline)[before]), axis=(1, 2))
+	for name in ('handle_left_type', 'handle_right_type'):
+		types = np.where(kept, attributes[name][before], HANDLE_TYPES['ALIGNED']).astype(np.int32)
+		values[name] = keep_handle_types(types, moved)
+
+	if len(points) < len(spline.bezier_points):
+		spline = replace_spline(curve, spline, len(points))
+	elif len(points) > len(spline.bezier_points):
+		spline.bezier_points.add(len(points) - len(spline.bezier_points))
+
+	set_point_attributes(spline.bezier_points, values)
+	set_bezier_points_array(spline, points)
+	curve.data.update_tag()
+	return spline
+
+def set_poly_points_array(spline, coords):
+	# writes an (N, 3) array of coordinates with w = 1, missing points are added
+	# points can't be removed, a spline with more than N points has to be replaced by the caller
+	points = spline.points
+	count = len(coords)
+	if len(points) > count:
+		raise ValueError(f'Spline has {len(points)} points, cannot write {count}')
+	if len(points) < count:
+		points.add(count - len(points))
+	data = np.ones((count, 4), dtype=np.float32)
+	data[:, :3] = np.asarray(coords, dtype=np.float32).reshape(count, -1)[:, :3]
+	points.foreach_set('co', data.ravel())
+
+def bezier_chunks_to_array(data):
+	# BT_BezierCurve chunk(s) with p0/p1 attributes to an (N, 3, 3) array of bezier points
+	# idle end handles are mirrored
+	chunks = data if isinstance(data, list) else [data]
+	points = np.empty((len(chunks)+1, 3, 3))
+	for index, chunk in enumerate(chunks):
+		points[index, 1] = chunk.p0_co
+		points[index, 2] = chunk.p0_handle_right
+		points[index+1, 0] = chunk.p1_handle_left
+		points[index+1, 1] = chunk.p1_co
+	points[0, 0] = 2*points[0, 1] - points[0, 2]
+	points[-1, 2] = 2*points[-1, 1] - points[-1, 0]
+	return points
+
+def get_bezier_points_array_world(curve):
+	return transform_points_array(curve.matrix_world, get_bezier_points_array(curve.data.splines[0]))
+
+def get_bezier_points_array_closed(spline):
+	# cyclic splines repeat their first point at the end, so the closing segment is evaluated too
+	points = get_bezier_points_array(spline)
+	return np.concatenate((points, points[:1])) if spline.use_cyclic_u and len(points) > 1 else points
+
+def get_spline_points(spline):
+	return spline.bezier_points if spline.type == 'BEZIER' else spline.points
+
+def is_spline_point_selected(point):
+	# bezier points are selected by their control point
+	return point.select_control_point if isinstance(point, bpy.types.BezierSplinePoint) else point.select
+
+def get_bezier_segments_array(spline):
+	# (N-1, 4, 3) array of [p0, handle_right, handle_left, p3] per segment
+	return points_to_segments(get_bezier_points_array(spline))
+
+def matrix_to_array(matrix):
+	return np.array(matrix, dtype=np.float64)
+
+def transform_points_array(matrix, points):
+	# applies a 4x4 matrix to an (..., 3) array of points
+	m = matrix_to_array(matrix)
+	return points @ m[:3, :3].T + m[:3, 3]
+
+def numpy_interpolate_n_bezier_points(curve, count, *, world_space=True, proportional=False):
+	spline = curve.data.splines[0]
+	segments = get_bezier_segments_array(spline)
 
-	if proportional:
+	if not len(segments):
+		points = get_bezier_points_array(spline)[:, 1]
+	
+	elif proportional:
 		# adaptive distribution of interpolated points depending on lengths of spline's segments between control points
-		# in this case final interpolated points count may not match the given count		
-		for index, point in enumerate(points):
-			if index+1 != len(points):
-				length=0
-				ips = mathutils.geometry.interpolate_bezier(point.co, point.handle_right, points[index+1].handle_left, points[index+1].co, 12)			
-				for index_ip, ip in enumerate(ips):
-					if index_ip+1 != len(ips):
-						ip_next = ips[index_ip+1]
-						length += (ip - ip_next).length
-				disribution.append(int(count*(length/full_length)))		
-
-		# if we wanted to be a bit closer to the target count
-		# for i in range(abs(sum(disribution) - count)):
-		# 	if sum(disribution) < count:					
-		# 		_min = min(enumerate(disribution))[0]
-		# 		disribution[_min] += 1		
-
-		# for i in range(abs(sum(disribution) - count)):
-		# 	if sum(disribution) > count:
-		# 		_max = max(enumerate(disribution))[0]
-		# 		if _max > 2:							
-		# 			disribution[_max] -= 1
-			
+		# in this case final interpolated points count may not match the given count
+		rough = evaluate_bezier_segments(segments, 12)
+		lengths = np.linalg.norm(np.diff(rough, axis=1), axis=2).sum(axis=1)
+		full_length = lengths.sum()
+		
 		# bezier interpolation requires count of at least 2
-		for index, c in enumerate(disribution):
-			if c < 2:
-				disribution[index] = 2
+		if full_length > 0:
+			distribution = np.maximum((count*lengths/full_length).astype(int), 2)
+		else:
+			distribution = np.full(len(segments), 2)
 
-	# now we can do final interpolation
-	for index, point in enumerate(points):
-		if index+1 != len(points):
-			for ip in mathutils.geometry.interpolate_bezier(
-				point.co,
-				point.handle_right,
-				points[index+1].handle_left,
-				points[index+1].co,
-				(disribution[index] if len(disribution) else count))[1:]:
-				interpolated_points.append(matrix@ip)	
+		chunks = [segments[0, :1]]
+		for segment, c in zip(segments, distribution):
+			chunks.append((bernstein_matrix(int(c)) @ segment)[1:])
+		points = np.concatenate(chunks)
+
+	else:
+		points = join_segment_samples(evaluate_bezier_segments(segments, count))
+
+	if world_space:
+		points = transform_points_array(curve.matrix_world, points)
+
+	return points
+
+def mathutils_interpolate_n_bezier_points(curve, count, *, world_space=True, proportional=False, debug=False):
+	# Vector adapter over numpy_interpolate_n_bezier_points for existing callers
+	interpolated_points = [Vector(point) for point in numpy_interpolate_n_bezier_points(curve, count, world_space=world_space, proportional=proportional).tolist()]
 
 	if debug:
 		for ip in interpolated_points:
@@ -4493,29 +4197,18 @@ def mathutils_interpolate_n_bezier_points(curve, count, *, world_space=True, pro
 
 	return interpolated_points
 
-def space_interpolate_bezier(curve, precision, count, *, debug=False):
+def numpy_space_interpolate_bezier(curve, precision, count, *, world_space=True):
+	# count+1 points evenly spaced by arc length, including both ends
 	spline = curve.data.splines[0]
-	bezier_points = spline.bezier_points
-	matrix = curve.matrix_world
-	interpolated_points = mathutils_interpolate_n_bezier_points(curve, precision*100, world_space=False, proportional=True)
-	space_points = [matrix@interpolated_points[0]]
-	target_segment_length = round(spline.calc_length()/count, 9)
-	
-	length=0
-	for index, point in enumerate(interpolated_points):	
-		if index+1 != len(interpolated_points):
-			point_next = interpolated_points[index+1]		
-			length += (point - point_next).length
-			
-			if length > target_segment_length:										
-				space_points.append(matrix@interpolated_points[index-1])
-				length = 0
+	points = geometry.space_interpolate(get_bezier_points_array(spline), precision, count)
+
+	if world_space:
+		points = transform_points_array(curve.matrix_world, points)
 
-	if len(space_points)-1 < count:
-		space_points.append(matrix@interpolated_points[-1])
+	return points
 
-	if not isclose(space_points[-1].length - interpolated_points[-1].length, 0.0, abs_tol=1e-5):		
-		space_points[-1] = matrix@interpolated_points[-1]
+def space_interpolate_bezier(curve, precision, count, *, debug=False):
+	space_points = [Vector(point) for point in numpy_space_interpolate_bezier(curve, precision, count).tolist()]
 	
 	if debug:
 		for point in space_points:
@@ -4548,26 +4241,167 @@ def get_bezier_point_t_map(self, curve):
 
 	return point_t_map
 
+# Snap points cache ------------------------------------------------------------
+# {object name : (version, curve data name, local space interpolated points)}
+snap_cache = dict()
+# {object name : version}, bumped by bt_depsgraph_update_post when the geometry of a cached object changes
+snap_cache_versions = dict()
+
+def get_poly_points_array(spline):
+	points = spline.points
+	data = np.empty(len(points)*4, dtype=np.float32)
+	points.foreach_get('co', data)
+	return data.reshape(-1, 4)[:, :3].astype(np.float64)
+
+def get_curve_snap_points(curve):
+	# local space points of every spline, bezier splines are sampled at their resolution in one batch
+	splines = curve.data.splines
+	bezier_splines = [spline for spline in splines if spline.type == 'BEZIER']
+	points = geometry.evaluate_splines([get_bezier_points_array_closed(spline) for spline in bezier_splines], [spline.resolution_u+1 for spline in bezier_splines])
+	points += [get_poly_points_array(spline) for spline in splines if spline.type != 'BEZIER']
+	return np.concatenate(points) if len(points) else np.empty((0, 3))
+
+def get_cached_snap_points(curve, depsgraph):
+	# world space snap points of a curve, interpolation is only redone after the curve has changed
+	name = curve.name
+	version = snap_cache_versions.get(name, 0)
+	entry = snap_cache.get(name)
+	if entry is None or entry[0] != version:
+		entry = (version, curve.data.name, get_curve_snap_points(curve.evaluated_get(depsgraph)))
+		snap_cache[name] = entry
+	return transform_points_array(curve.matrix_world, entry[2])
+
+def dirty_snap_cache(name):
+	snap_cache_versions[name] = snap_cache_versions.get(name, 0) + 1
+
+def is_snap_cached(name):
+	return name in snap_cache or any(key[0] == name for key in vertex_kd_cache)
+
+def prune_snap_cache():
+	# drops the entries of deleted or renamed objects and versions nothing refers to anymore
+	objects = bpy.data.objects
+	for name in [name for name in snap_cache if objects.get(name) is None]:
+		del snap_cache[name]
+	for key in [key for key in vertex_kd_cache if objects.get(key[0]) is None]:
+		del vertex_kd_cache[key]
+	for name in [name for name in snap_cache_versions if not is_snap_cached(name)]:
+		del snap_cache_versions[name]
+
+@persistent
+def bt_depsgraph_update_post(scene, depsgraph):
+	if not (len(snap_cache) or len(vertex_kd_cache)):
+		snap_cache_versions.clear()
+		return
+
+	for update in depsgraph.updates:
+		datablock = update.id
+		if isinstance(datablock, bpy.types.Object):
+			# only objects with cached snap points or vertex trees are tracked
+			if update.is_updated_geometry and is_snap_cached(datablock.name):
+				dirty_snap_cache(datablock.name)
+
+		elif isinstance(datablock, bpy.types.Curve):
+			for name, entry in snap_cache.items():
+				if entry[1] == datablock.name:
+					dirty_snap_cache(name)
+
+	prune_snap_cache()
+
+@persistent
+def bt_clear_snap_cache(*args):
+	snap_cache.clear()
+	snap_cache_versions.clear()
+	vertex_kd_cache.clear()
+
+# Mesh vertex KD-tree cache ----------------------------------------------------
+# {(object name, mesh name) : BT_VertexKDTree}, least recently used first
+vertex_kd_cache = OrderedDict()
+VERTEX_KD_CACHE_LIMIT = 4000000 # total vertex count of all cached trees
+VERTEX_KD_SYNC_LIMIT = 200000 # meshes with more vertices are indexed by a timer in chunks
+VERTEX_KD_CHUNK_SIZE = 100000
+
+class BT_VertexKDTree:
+	def __init__(self, coords, version):
+		self.version = version
+		self.coords = coords # (N, 3) local space vertex coordinates, released when the tree is ready
+		self.size = len(coords)
+		self.kd_tree = kdtree.KDTree(self.size)
+		self.inserted = 0
+		self.is_ready = False
+
+	def insert_chunk(self, chunk_size):
+		end = min(self.inserted + chunk_size, self.size)
+		kd_tree = self.kd_tree
+		for index, co in enumerate(self.coords[self.inserted:end].tolist(), self.inserted):
+			kd_tree.insert(co, index)
+		self.inserted = end
+
+		if self.inserted == self.size:
+			kd_tree.balance()
+			self.coords = None
+			self.is_ready = True
+
+		return self.is_ready
+
+def get_vertex_kd_tree(obj, obj_eval):
+	# KD-tree of the evaluated mesh vertices, rebuilt only after the object's geometry has changed
+	key = (obj.name, obj.data.name)
+	version = snap_cache_versions.get(obj.name, 0)
+	entry = vertex_kd_cache.get(key)
+
+	if entry is not None and entry.version == version:
+		vertex_kd_cache.move_to_end(key)
+		return entry
+
+	verts = obj_eval.data.vertices
+	coords = np.empty(len(verts)*3, dtype=np.float32)
+	verts.foreach_get('co', coords)
+	entry = BT_VertexKDTree(coords.reshape(-1, 3), version)
+
+	vertex_kd_cache[key] = entry
+	vertex_kd_cache.move_to_end(key)
+	while len(vertex_kd_cache) > 1 and sum(tree.size for tree in vertex_kd_cache.values()) > VERTEX_KD_CACHE_LIMIT:
+		vertex_kd_cache.popitem(last=False)
+
+	if entry.size <= VERTEX_KD_SYNC_LIMIT:
+		entry.insert_chunk(entry.size)
+	else:
+		def build():
+			# stop if the entry was evicted or replaced in the meantime
+			if vertex_kd_cache.get(key) is not entry or entry.insert_chunk(VERTEX_KD_CHUNK_SIZE):
+				return None
+			return 0.0
+
+		bpy.app.timers.register(build)
+
+	return entry
+
 def snap_get_points(self, context):
 	viewport = get_view_3d(self, context)
 	width=viewport.width
 	height=viewport.height
+	depsgraph = context.evaluated_depsgraph_get()
 
 	coords = set()
-	curves = [obj.evaluated_get(context.evaluated_depsgraph_get()) for obj in bpy.data.objects if ((obj.type == 'CURVE') and (obj.name in context.view_layer.objects) and (obj.visible_get() == True ))]
-	empties = [obj for obj in bpy.data.objects if ((obj.type == 'EMPTY') and (obj.name in context.view_layer.objects) and (obj.visible_get() == True ))]
-	
-	for curve in curves:		
-		interpolated_points = mathutils_interpolate_n_bezier_points(curve, curve.data.splines[0].resolution_u+1) if is_bezier(curve) else [curve.matrix_world@Vector(point.co[0:3]) for point in curve.data.splines[0].points]
-	
-		for point in interpolated_points:
-			screen_point = vector_3d_to_screen(self, context, point)
-			if screen_point is None or (screen_point.x > width or screen_point.x < 0) or (screen_point.y > height or  screen_point.y < 0):
-				continue		
-			coords.add(point.freeze())
-	
-	for empty in empties:
-		coords.add(empty.location.copy().freeze())
+	curve_points = []
+
+	for obj in context.view_layer.objects:
+		if not obj.visible_get():
+			continue
+
+		if obj.type == 'CURVE' and len(obj.data.splines):
+			curve_points.append(get_cached_snap_points(obj, depsgraph))
+
+		elif obj.type == 'EMPTY':
+			coords.add(obj.location.copy().freeze())
+
+	if len(curve_points):
+		points = np.concatenate(curve_points)
+		screen_points, in_front = points_to_screen_array(self, context, points)
+		x = screen_points[:, 0]
+		y = screen_points[:, 1]
+		on_screen = in_front & (x >= 0) & (x <= width) & (y >= 0) & (y <= height)
+		coords.update(Vector(point).freeze() for point in points[on_screen].tolist())
 
 	return coords
 
@@ -4575,100 +4409,26 @@ def snap_get_target(self, context, cursor, screen_world_map):
 	return BT_Cursor.get_nearest_target_point_world(self, cursor, screen_world_map)
 
 def reverse_curve(self, curve): 
-	def get_bezier_props(point):
-		return {        
-			'co': point.co.copy(),
-			'handle_left' : point.handle_left.copy(),
-			'handle_left_type' : point.handle_left_type,
-			'handle_right' : point.handle_right.copy(),     
-			'handle_right_type' : point.handle_right_type,
-			'hide' : point.hide,
-			'radius' : point.radius,
-			'select_control_point' : point.select_control_point,
-			'select_left_handle' : point.select_left_handle,
-			'select_right_handle' : point.select_right_handle,
-			'tilt' : point.tilt,
-			'weight_softbody' : point.weight_softbody
-			}
-
-	def get_poly_props(point):
-		return {
-			'co' : point.co.copy(),
-			'hide' : point.hide,
-			'radius' : point.radius,
-			'select' : point.select,
-			'tilt' : point.tilt,
-			'weight' : point.weight,
-			'weight_softbody' : point.weight_softbody
-		}
+	# every spline is read, reversed and written back in bulk
+	# left and right handles swap sides along with their types and selection
+	for spline in curve.data.splines:
+		if spline.type == 'BEZIER':
+			points = spline.bezier_points
+			attributes = {name: values[::-1].copy() for name, values in get_point_attributes(points).items()}
+			for left, right in (('handle_left_type', 'handle_right_type'), ('select_left_handle', 'select_right_handle')):
+				attributes[left], attributes[right] = attributes[right], attributes[left]
+			# handle types go first, they would break the reversed coordinates otherwise
+			set_point_attributes(points, attributes)
+			set_bezier_points_array(spline, geometry.reverse(get_bezier_points_array(spline)))
 
-	spline = curve.data.splines[0]
-	if spline.type == 'BEZIER':
-		points = spline.bezier_points
-		for index, point in enumerate(points):
-			if index < len(points)/2:               
-				p0 = point
-				p1 = points[-(index+1)]
-
-				temp_p0 = get_bezier_props(p0)
-				temp_p1 = get_bezier_props(p1)      
-
-				# handle type must go first because it will break the 
-				# curve if done after points swap
-				p0.handle_right_type =      temp_p1['handle_left_type']
-				p0.handle_left_type =       temp_p1['handle_right_type']
-				# control point goes second
-				p0.co =                     temp_p1['co']           
-				# handle stuff cross swapped
-				p0.handle_right =           temp_p1['handle_left']
-				p0.handle_left =            temp_p1['handle_right']             
-				p0.select_right_handle =    temp_p1['select_left_handle']
-				p0.select_left_handle =     temp_p1['select_right_handle'] 
-				# other stuff               
-				p0.hide =                   temp_p1['hide']
-				p0.radius =                 temp_p1['radius']
-				p0.select_control_point =   temp_p1['select_control_point']             
-				p0.tilt =                   temp_p1['tilt']
-				p0.weight_softbody =        temp_p1['weight_softbody']
-
-				p1.handle_right_type =      temp_p0['handle_left_type']
-				p1.handle_left_type =       temp_p0['handle_right_type']                            
-				p1.co =                     temp_p0['co']               
-				p1.handle_right =           temp_p0['handle_left']
-				p1.handle_left =            temp_p0['handle_right']             
-				p1.select_right_handle =    temp_p0['select_left_handle']
-				p1.select_left_handle =     temp_p0['select_right_handle']
-				p1.hide =                   temp_p0['hide']
-				p1.radius =                 temp_p0['radius']
-				p1.select_control_point =   temp_p0['select_control_point']
-				p1.tilt =                   temp_p0['tilt']
-				p1.weight_softbody =        temp_p0['weight_softbody']
+		else:
+			points = spline.points
+			coords = np.empty(len(points)*4, dtype=np.float32)
+			points.foreach_get('co', coords)
+			points.foreach_set('co', coords.reshape(-1, 4)[::-1].ravel())
+			set_point_attributes(points, {name: values[::-1].copy() for name, values in get_point_attributes(points, POLY_POINT_ATTRIBUTES).items()})
 
-	else:
-		points = spline.points
-		for index, point in enumerate(points):
-			if index < len(points)/2:
-				p0 = point
-				p1 = points[-(index+1)]
-
-				temp_p0 = get_poly_props(p0)
-				temp_p1 = get_poly_props(p1)
-											
-				p0.co =                     temp_p1['co']               
-				p0.hide =                   temp_p1['hide']
-				p0.radius =                 temp_p1['radius']
-				p0.select =                 temp_p1['select']
-				p0.tilt =                   temp_p1['tilt']
-				p0.weight =                 temp_p1['weight']
-				p0.weight_softbody =        temp_p1['weight_softbody']
-
-				p1.co =                     temp_p0['co']           
-				p1.hide =                   temp_p0['hide']
-				p1.radius =                 temp_p0['radius']
-				p1.select =                 temp_p0['select']
-				p1.tilt =                   temp_p0['tilt']
-				p1.weight =                 temp_p0['weight']
-				p1.weight_softbody =        temp_p0['weight_softbody']
+	curve.data.update_tag()
 
 def is_single_view3d(self, context):
 	view3d_areas = [area for area in context.window.screen.areas if area.type == 'VIEW_3D']	
@@ -4818,13 +4578,85 @@ def get_closest_hit_result(self, obj, origin, direction):
 def point_3d_to_2d(self, context, point):
 	return bpy_extras.view3d_utils.location_3d_to_region_2d(context.region, context.region_data, point)
 
-def get_screen_world_map(self, context, points):
-	screen_world_map = dict()
+class BT_ScreenWorldMap(dict):
+	# {screen point : world point} with a 2D KD-tree of the screen points for nearest point lookups
+	# the tree is built once per view and version of the source points, see get_cached_screen_world_map
+	def __init__(self, *args, perspective_matrix=None, region_size=None, source_key=None, **kwargs):
+		dict.__init__(self, *args, **kwargs)
+		self.perspective_matrix = perspective_matrix
+		self.region_size = region_size
+		self.source_key = source_key
+		self.screen_points = []
+		self.kd_tree = None
+
+	def build_index(self):
+		self.screen_points = list(self.keys())
+		self.kd_tree = kdtree.KDTree(len(self.screen_points))
+		for index, point in enumerate(self.screen_points):
+			self.kd_tree.insert((point[0], point[1], 0.0), index)
+		self.kd_tree.balance()
+
+	def find_nearest(self, cursor):
+		if not len(self):
+			return None
+
+		# keys added after the index was built
+		if self.kd_tree is None or len(self.screen_points) != len(self):
+			self.build_index()
+
+		return self.screen_points[self.kd_tree.find((cursor[0], cursor[1], 0.0))[1]]
+
+	def is_valid(self, context, source_key):
+		rv3d = context.region_data
+		if rv3d is None or self.perspective_matrix is None or self.perspective_matrix != rv3d.perspective_matrix:
+			return False
+		return self.region_size == get_region_size(context) and self.source_key == source_key
+
+def get_region_size(context):
+	region = context.region
+	return (region.width, region.height) if region is not None else None
+
+def invalidate_screen_world_map(self):
+	# the source points of self.screen_world_map aren't compared per event, whatever rebuilds or extends them bumps their version
+	self.screen_points_version = getattr(self, 'screen_points_version', 0) + 1
+
+def add_snap_point(self, point):
+	point = point.freeze()
+	if point not in self.snap_points:
+		self.snap_points.add(point)
+		invalidate_screen_world_map(self)
+
+def get_screen_index(self, points):
+	# plain dicts and lists of screen points are indexed once per object, they aren't changed after a lookup
+	if isinstance(points, BT_ScreenWorldMap):
+		return points
+
+	screen_index = getattr(self, 'screen_index', None)
+	if screen_index is None or screen_index.source_key is not points:
+		if isinstance(points, dict):
+			screen_index = BT_ScreenWorldMap(points, source_key=points)
+		else:
+			screen_index = BT_ScreenWorldMap(dict.fromkeys(point.copy().freeze() for point in points), source_key=points)
+		screen_index.build_index()
+		self.screen_index = screen_index
+	return screen_index
+
+def get_cached_screen_world_map(self, context, points):
+	# self.screen_world_map is only rebuilt when the view, the region size or the version of the source points change
+	source_key = getattr(self, 'screen_points_version', 0)
+	screen_world_map = getattr(self, 'screen_world_map', None)
+	if not isinstance(screen_world_map, BT_ScreenWorldMap) or not screen_world_map.is_valid(context, source_key):
+		screen_world_map = get_screen_world_map(self, context, points, source_key=source_key)
+		self.screen_world_map = screen_world_map
+	return screen_world_map
+
+def get_screen_world_map(self, context, points, *, source_key=None):
+	screen_world_map = BT_ScreenWorldMap(perspective_matrix=context.region_data.perspective_matrix.copy(), region_size=get_region_size(context), source_key=source_key)
 	
 	view_3d_area = get_view_3d(self, context)	
 	
 	if view_3d_area is None:
-		return dict()
+		return screen_world_map
 	
 	for point in points:
 		screen_coord = point_3d_to_2d(self, context, point)
@@ -4838,6 +4670,7 @@ def get_screen_world_map(self, context, points):
 
 		screen_world_map[screen_coord.freeze()] = world_coord
 	
+	screen_world_map.build_index()
 	return screen_world_map
 
 def is_close(point_1, point_2):
@@ -4846,6 +4679,26 @@ def is_close(point_1, point_2):
 def is_equal(point_1, point_2, precision):
 	return round(point_1.length, precision) == round(point_2.length, precision)
 
+def get_curve_end_nodes(self, curves):
+	# (C, 2) shared node ids of the curves' world space end points, ends closer than 10^-search_limit meet
+	endpoints = np.array([get_bezier_points_array_world(curve)[[0, -1], 1] for curve in curves])
+	return geometry.endpoint_nodes(endpoints, 10.0**-min(self.search_limit, 8))
+
+def orient_loop_curves(self, curves, sides, directions):
+	# reverses the curves of (curve index, is_reversed) sides to run along the patch
+	# <directions> keeps the state of curves shared by several loops
+	oriented = []
+	for side in sides:
+		if side is None:
+			oriented.append(None)
+			continue
+		index, is_reversed = side
+		if directions.get(index, False) != is_reversed:
+			reverse_curve(self, curves[index])
+			directions[index] = is_reversed
+		oriented.append(curves[index])
+	return oriented
+
 def calculate_average_normal(self, verts):
 	if not len(verts) > 0:
 		return Vector()
@@ -4917,6 +4770,42 @@ def vector_3d_to_screen(self, context, vector):
 	view_3d = get_view_3d(self, context)
 	return bpy_extras.view3d_utils.location_3d_to_region_2d(region, rv3d, vector)
 
+def points_to_screen_array(self, context, points):
+	# batched location_3d_to_region_2d for an (N, 3) array
+	# returns (N, 2) screen points and a mask of the points in front of the view
+	region = context.region
+	prj = np.hstack((points, np.ones((len(points), 1)))) @ matrix_to_array(context.region_data.perspective_matrix).T
+	w = prj[:, 3]
+	in_front = w > 0.0
+	w = np.where(in_front, w, 1.0)
+	screen_points = np.empty((len(points), 2))
+	screen_points[:, 0] = (region.width/2)*(1.0 + prj[:, 0]/w)
+	screen_points[:, 1] = (region.height/2)*(1.0 + prj[:, 1]/w)
+	return screen_points, in_front
+
+def is_in_view_frustum(perspective_matrix, obj):
+	# bounding box test in clip space, the object is culled if all corners are outside of the same plane
+	corners = transform_points_array(obj.matrix_world, np.array(obj.bound_box))
+	x, y, z, w = (np.hstack((corners, np.ones((8, 1)))) @ matrix_to_array(perspective_matrix).T).T
+	return not ((x < -w).all() or (x > w).all() or (y < -w).all() or (y > w).all() or (z < -w).all() or (z > w).all())
+
+SNAP_TARGET_SPACING = 10 # approximate distance between snap targets of a curve on screen, in pixels
+
+def get_snap_lod_points(self, context, segments, max_count):
+	# samples (S, 4, 3) world space segments depending on their projected length
+	# far away curves get few snap targets, close ones up to <max_count> per segment
+	screen_points, in_front = points_to_screen_array(self, context, segments.reshape(-1, 3))
+	lengths = np.linalg.norm(np.diff(screen_points.reshape(-1, 4, 2), axis=1), axis=2).sum(axis=1) # control polygon length
+	counts = np.clip(np.ceil(lengths/SNAP_TARGET_SPACING).astype(int), 1, max_count-1)
+	
+	# projected length is meaningless for segments crossing the view plane
+	counts[~in_front.reshape(-1, 4).all(axis=1)] = max_count-1
+
+	starts = np.cumsum(counts) - counts
+	index = np.repeat(np.arange(len(counts)), counts)
+	params = index + (np.arange(counts.sum()) - starts[index])/counts[index]
+	return evaluate_bezier_segments_at(segments, np.append(params, len(segments)))
+
 def vector_2d_to_world(self, context, vector):
 	region = context.region
 	rv3d = context.region_data
@@ -4940,78 +4829,167 @@ def update_viewport(self, context):
 		if area.type == 'VIEW_3D':
 			area.tag_redraw()
 
+# Overlays
+overlay_shaders = {}
+
+def get_builtin_shader(name):
+	shader = overlay_shaders.get(name)
+	if shader is None:
+		shader = overlay_shaders[name] = gpu.shader.from_builtin(name)
+	return shader
+
+class BT_OverlayLayer:
+	def __init__(self, space):
+		self.space = space # 'POST_PIXEL' or 'POST_VIEW'
+		self.shader = None
+		self.batch = None
+		self.key = None # geometry the batch was built from
+		self.translation = None
+		self.color = (1.0, 1.0, 1.0, 1.0)
+		self.point_size = None
+		self.visible = False
+
+	def set_geometry(self, shader_name, type, key, content, *, indices=None):
+		# the batch is only rebuilt when its geometry changes
+		if self.batch is None or key != self.key:
+			self.shader = get_builtin_shader(shader_name)
+			self.batch = batch_for_shader(self.shader, type, content, indices=indices)
+			self.key = key
+
+	def draw(self):
+		if self.translation is not None:
+			gpu.matrix.push()
+			gpu.matrix.translate(self.translation)
+		if self.point_size is not None:
+			gpu.state.point_size_set(self.point_size)
+
+		self.shader.uniform_float("color", self.color)
+		self.batch.draw(self.shader)
+
+		if self.point_size is not None:
+			gpu.state.point_size_set(1.0)
+		if self.translation is not None:
+			gpu.matrix.pop()
+
+class BT_Overlay:
+	# one POST_PIXEL and one POST_VIEW draw handler shared by the modal tools (only one of them runs at a time)
+	# draw_* functions show cached layers, remove_gpu_draw_handler hides them
+	# handlers are released when the modal tool sets bt_modal_on back to 'NONE'
+	def __init__(self):
+		self.layers = {}
+		self.handlers = {}
+
+	def get_layer(self, name, space):
+		layer = self.layers.get(name)
+		if layer is None:
+			layer = self.layers[name] = BT_OverlayLayer(space)
+		if space not in self.handlers:
+			self.handlers[space] = bpy.types.SpaceView3D.draw_handler_add(self.draw, (space,), 'WINDOW', space)
+		return layer
+
+	def draw(self, space):
+		for layer in self.layers.values():
+			if layer.visible and layer.space == space:
+				layer.draw()
+
+	def release(self):
+		for handler in self.handlers.values():
+			bpy.types.SpaceView3D.draw_handler_remove(handler, 'WINDOW')
+		self.handlers.clear()
+		for layer in self.layers.values():
+			layer.visible = False
+
+bt_overlay = BT_Overlay()
+
+def bt_modal_on_update(self, context):
+	if self.bt_modal_on == 'NONE':
+		bt_overlay.release()
+
 def remove_gpu_draw_handler(self, handler):
-	if handler is not None:
+	if isinstance(handler, BT_OverlayLayer):
+		handler.visible = False
+	elif handler is not None:
 		bpy.types.SpaceView3D.draw_handler_remove(handler, 'WINDOW')
 
 def draw_target(self, context, pos):
-	def draw():
-		shader.uniform_float("color", context.scene.bt_color)#(0.0, 1.0, 0.5, 1.0)
-		batch.draw(shader)
-
-	coords =    [
-				(pos.x - 5, pos.y - 5), (pos.x + 5, pos.y - 5),
-				(pos.x - 5, pos.y + 5), (pos.x + 5, pos.y + 5),
-				(pos.x - 5, pos.y + 5), (pos.x - 5, pos.y - 5),
-				(pos.x + 5, pos.y + 5), (pos.x + 5, pos.y - 5)
-				]
-
-	shader = gpu.shader.from_builtin('UNIFORM_COLOR')
-	batch = batch_for_shader(shader, 'LINES', {"pos": coords})
-
-	handler = bpy.types.SpaceView3D.draw_handler_add(draw, (), 'WINDOW', 'POST_PIXEL')  
+	# fixed size crosshair, its batch is built once and moved by translation
+	layer = bt_overlay.get_layer('target', 'POST_PIXEL')
+	layer.set_geometry('UNIFORM_COLOR', 'LINES', 'crosshair', {"pos": [
+				(-5, -5), (5, -5),
+				(-5, 5), (5, 5),
+				(-5, 5), (-5, -5),
+				(5, 5), (5, -5)
+				]})
+	layer.translation = (pos.x, pos.y)
+	layer.color = tuple(context.scene.bt_color)
+	layer.visible = True
 	update_viewport(self, context)
 
-	return handler
+	return layer
 
 def draw_snap_targets(self, context, points):
-	def draw():
-		shader.uniform_float("color", (0.0, 0.7, 0.7, 1.0))
-		batch.draw(shader)
-
-	shader = gpu.shader.from_builtin('POINT_UNIFORM_COLOR')
-	batch = batch_for_shader(shader, 'POINTS', {"pos": points})
-	gpu.state.point_size_set(10)
-
-	handler = bpy.types.SpaceView3D.draw_handler_add(draw, (), 'WINDOW', 'POST_VIEW')
+	layer = bt_overlay.get_layer('snap_targets', 'POST_VIEW')
+	layer.set_geometry('POINT_UNIFORM_COLOR', 'POINTS', tuple(points), {"pos": points})
+	layer.color = (0.0, 0.7, 0.7, 1.0)
+	layer.point_size = 10
+	layer.visible = True
 	update_viewport(self, context)
 
-	return handler
+	return layer
 
-def draw_2d_polyline(self, context, points, index_buffer):
-	def draw():
-		shader.uniform_float("color", context.scene.bt_color)
-		batch.draw(shader)
+def draw_2d_polyline(self, context, points, index_buffer, *, name='line_2d'):
+	# <name> keeps the polyline layers of one tool apart, e.g. a rubber band line and a curve preview
+	layer = bt_overlay.get_layer(name, 'POST_PIXEL')
+	points = [tuple(point) for point in points]
+	index_buffer = [tuple(indices) for indices in index_buffer]
+	layer.set_geometry('UNIFORM_COLOR', 'LINES', (tuple(points), tuple(index_buffer)), {"pos": points}, indices=index_buffer)
+	layer.color = tuple(context.scene.bt_color)
+	layer.visible = True
+	update_viewport(self, context)
 
-	shader = gpu.shader.from_builtin('UNIFORM_COLOR')
-	batch = batch_for_shader(shader, 'LINES', {"pos": points}, indices=index_buffer)
+	return layer
 
-	handler = bpy.types.SpaceView3D.draw_handler_add(draw, (), 'WINDOW', 'POST_PIXEL')
-	update_viewport(self, context)
+# AUTO and VECTOR handles aren't recalculated when coordinates are written directly. Assigning a handle type
+# runs the RNA update of BezierSplinePoint.handle_left_type/handle_right_type (rna_Curve_update_points), which
+# calls BKE_nurb_handles_calc on the point's spline, so one assignment per spline recalculates all of its handles
+def recalculate_handles(curve):
+	for spline in curve.data.splines:
+		if spline.type != 'BEZIER':
+			continue
+		bezier_points = spline.bezier_points
+		types = {}
+		for side in ('left', 'right'):
+			types[side] = np.empty(len(bezier_points), dtype=np.int32)
+			bezier_points.foreach_get(f'handle_{side}_type', types[side])
+		automatic = geometry.find_automatic_handle(types['left'], types['right'])
+		if automatic is not None:
+			side, index = automatic
+			name = f'handle_{side}_type'
+			point = bezier_points[index]
+			setattr(point, name, getattr(point, name))
 
-	return handler
+# in edit mode curve.data.splines reads and writes the edit nurbs directly, so tagging the
+# edited curve is enough to refresh it; a mode switch rebuilds edit data for every object in the mode
+def sync_curve_data(context, curves=None):
+	if curves is None:
+		curves = (context.object,) if context.object is not None else ()
 
-def update_object_edit(context):
-	if context.object is not None:
-		bpy.ops.object.mode_set(mode = 'OBJECT')
-		bpy.ops.object.mode_set(mode = 'EDIT')
+	for curve in curves:
+		if curve.type == 'CURVE':
+			recalculate_handles(curve)
+			curve.data.update_tag()
 
-def update_edit_object(context):
-	if context.object is not None:
-		bpy.ops.object.mode_set(mode = 'EDIT')
-		bpy.ops.object.mode_set(mode = 'OBJECT')
+	update_viewport(None, context)
 
-def update_edit_object_edit(context):
-	if context.object is not None:
-		bpy.ops.object.mode_set(mode = 'EDIT')
-		bpy.ops.object.mode_set(mode = 'OBJECT')
-		bpy.ops.object.mode_set(mode = 'EDIT')	
+# switch mode only when it actually changes, leaving edit mode flushes the edit data once
+def set_curve_mode(context, mode):
+	if context.object is None:
+		return
 
-def update_object_edit_object(context):
-	if context.object is not None:
-		bpy.ops.object.mode_set(mode = 'OBJECT')
-		bpy.ops.object.mode_set(mode = 'EDIT')
-		bpy.ops.object.mode_set(mode = 'OBJECT')
+	if context.mode == ('EDIT_CURVE' if mode == 'EDIT' else mode):
+		sync_curve_data(context)
+	else:
+		bpy.ops.object.mode_set(mode = mode)
 
 # UI ############################################################################################
 pcoll = None
@@ -5316,6 +5294,10 @@ def register():
 
 	for cls in classes:
 		bpy.utils.register_class(cls)
+
+	bpy.app.handlers.depsgraph_update_post.append(bt_depsgraph_update_post)
+	for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+		handlers.append(bt_clear_snap_cache)
 	
 	bpy.types.Scene.bt_resolution = bpy.props.IntProperty(default=12, min=3, name='', description='Curve\'s smoothness. It is a value stored in the scene and assigned to every new curve. For changing resolution of an active curve go to [Active Spline] settings')
 	bpy.types.Scene.bt_color = bpy.props.FloatVectorProperty(name='Color', subtype='COLOR', 
@@ -5326,7 +5308,7 @@ def register():
 	bpy.types.Scene.bt_pipe_resolution = bpy.props.IntProperty(name='Pipe Resolution', description='Pipe Section Resolution', min=0)
 	bpy.types.Scene.bt_band_width = bpy.props.FloatProperty(name='Band Width', description='Band Width', min=0, step=1)
 
-	bpy.types.WindowManager.bt_modal_on = bpy.props.EnumProperty(items=[
+	bpy.types.WindowManager.bt_modal_on = bpy.props.EnumProperty(update=bt_modal_on_update, items=[
 		('NONE','',''),
 		('BT_LINE','',''),
 		('BT_CURVE','',''),
@@ -5345,6 +5327,14 @@ def unregister():
 	for cls in reversed(classes):
 		bpy.utils.unregister_class(cls)	
 
+	if bt_depsgraph_update_post in bpy.app.handlers.depsgraph_update_post:
+		bpy.app.handlers.depsgraph_update_post.remove(bt_depsgraph_update_post)
+	for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+		if bt_clear_snap_cache in handlers:
+			handlers.remove(bt_clear_snap_cache)
+	bt_clear_snap_cache()
+	bt_overlay.release()
+
 	del bpy.types.Scene.bt_resolution
 
 	bpy.utils.previews.remove(pcoll)
@@ -0,0 +1,976 @@
+# 	MIT License
+#---------------------------------------------------------------------------------------------
+# 	Copyright (c) 2025 Camshaft Software LLC
+#
+#   Permission is hereby granted, free of charge, to any person obtaining a copy
+#   of this software and associated documentation files (the "Software"), to deal
+#   in the Software without restriction, including without limitation the rights
+#   to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#   copies of the Software, and to permit persons to whom the Software is
+#   furnished to do so, subject to the following conditions:
+#
+#   The above copyright notice and this permission notice shall be included in all
+#   copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#   OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE#  SOFTWARE.
+#---------------------------------------------------------------------------------------------
+
+# Headless curve algorithms -------------------------
+# Plain NumPy, no bpy: usable from operators, from blender --background jobs and from worker processes
+#
+# A Bézier curve is an (N, 3, 3) array of [handle_left, co, handle_right] per control point,
+# a segment is a (4, 3) array of [p0, handle_right, handle_left, p3]
+# Meshes are (V, 3) vertex arrays with (F, 4) quad index arrays
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import itertools
+import multiprocessing
+import os
+import sys
+import numpy as np
+
+# Bézier evaluation -------------------------
+
+@lru_cache(maxsize=64)
+def bernstein_matrix(count):
+	# (count, 4) cubic Bernstein basis for t = 0..1, same t distribution as mathutils.geometry.interpolate_bezier
+	t = np.linspace(0.0, 1.0, count)
+	mt = 1.0 - t
+	basis = np.stack((mt*mt*mt, 3.0*mt*mt*t, 3.0*mt*t*t, t*t*t), axis=1)
+	basis.setflags(write=False)
+	return basis
+
+@lru_cache(maxsize=64)
+def bernstein_derivative_matrix(count):
+	t = np.linspace(0.0, 1.0, count)
+	mt = 1.0 - t
+	basis = np.stack((-3.0*mt*mt, 3.0*mt*mt - 6.0*mt*t, 6.0*mt*t - 3.0*t*t, 3.0*t*t), axis=1)
+	basis.setflags(write=False)
+	return basis
+
+def points_to_segments(points):
+	# (N, 3, 3) bezier points to (N-1, 4, 3) segments
+	return np.stack((points[:-1, 1], points[:-1, 2], points[1:, 0], points[1:, 1]), axis=1)
+
+def evaluate_bezier_segments(segments, count):
+	# (S, count, 3) points of every segment at count evenly distributed t values
+	return np.einsum('tk,skd->std', bernstein_matrix(count), segments)
+
+def evaluate_bezier_segments_derivative(segments, count):
+	# (S, count, 3) first derivatives (tangents) of every segment at count evenly distributed t values
+	return np.einsum('tk,skd->std', bernstein_derivative_matrix(count), segments)
+
+def evaluate_bezier_segments_at(segments, params):
+	# points at global spline parameters, integer part is the segment index and fractional part is t
+	params = np.asarray(params, dtype=np.float64)
+	index = np.clip(np.floor(params).astype(int), 0, len(segments)-1)
+	t = params - index
+	mt = 1.0 - t
+	basis = np.stack((mt*mt*mt, 3.0*mt*mt*t, 3.0*mt*t*t, t*t*t), axis=1)
+	return np.einsum('kj,kjd->kd', basis, segments[index])
+
+def evaluate_bezier_segments_derivative_at(segments, params):
+	# first derivatives at global spline parameters
+	params = np.asarray(params, dtype=np.float64)
+	index = np.clip(np.floor(params).astype(int), 0, len(segments)-1)
+	t = params - index
+	mt = 1.0 - t
+	basis = np.stack((-3.0*mt*mt, 3.0*mt*mt - 6.0*mt*t, 6.0*mt*t - 3.0*t*t, 3.0*t*t), axis=1)
+	return np.einsum('kj,kjd->kd', basis, segments[index])
+
+def evaluate_splines(splines, counts):
+	# many splines of (N, 3, 3) points sampled counts[i] times per segment, returns a list of (M, 3) arrays
+	# segments of all splines with the same count are concatenated and evaluated in one batch
+	results = [None]*len(splines)
+	groups = {}
+	for index, (points, count) in enumerate(zip(splines, counts)):
+		if len(points) < 2:
+			results[index] = points[:, 1].copy()
+		else:
+			groups.setdefault(count, []).append(index)
+
+	for count, indices in groups.items():
+		segments = [points_to_segments(splines[index]) for index in indices]
+		samples = evaluate_bezier_segments(np.concatenate(segments), count)
+		for index, spline_samples in zip(indices, np.split(samples, np.cumsum([len(chunk) for chunk in segments])[:-1])):
+			results[index] = join_segment_samples(spline_samples)
+
+	return results
+
+def join_segment_samples(samples):
+	# neighbouring segments share their end/start point, keep it once
+	if not len(samples):
+		return np.empty((0, 3))
+	return np.concatenate((samples[0], samples[1:, 1:].reshape(-1, 3)))
+
+def split_segment(segment, t):
+	# De Casteljau's algorithm, returns the (4, 3) segments on both sides of t
+	p0, p1, p2, p3 = segment
+	p0p1 = p0 + t*(p1 - p0)
+	p1p2 = p1 + t*(p2 - p1)
+	p2p3 = p2 + t*(p3 - p2)
+	handle_left = p0p1 + t*(p1p2 - p0p1)
+	handle_right = p1p2 + t*(p2p3 - p1p2)
+	b = handle_left + t*(handle_right - handle_left)
+	return np.array((p0, p0p1, handle_left, b)), np.array((b, handle_right, p2p3, p3))
+
+def insert_point(points, index, t):
+	# new control point at t of segment <index> without changing the shape of the curve
+	left, right = split_segment(points_to_segments(points)[index], t)
+	points = np.insert(points, index+1, (left[2], left[3], right[1]), axis=0)
+	points[index, 2] = left[1]
+	points[index+2, 0] = right[2]
+	return points
+
+def remove_point(points, index):
+	# removes control point <index>, the neighbouring handles are scaled back by the ratio the point splits
+	# its own handles in (the inverse of insert_point), end points are removed as they are
+	if index == 0 or index == len(points)-1:
+		return np.delete(points, index, axis=0)
+
+	handle_left, co, handle_right = points[index]
+	full_length = np.linalg.norm(handle_left - handle_right)
+	t = np.linalg.norm(handle_left - co)/full_length if full_length > 0 else 0.0
+	if not 0.0 < t < 1.0:
+		raise ValueError("Handles should not be in the control point's position")
+
+	points = np.delete(points, index, axis=0)
+	points[index-1, 2] = points[index-1, 1] + (points[index-1, 2] - points[index-1, 1])/t
+	points[index, 0] = points[index, 1] + (points[index, 0] - points[index, 1])/(1.0 - t)
+	return points
+
+def smooth_points(points, indices):
+	# each inner control point of <indices> is replaced by the midpoints of its two segments
+	# returns the new points and their global parameters on the source curve (for per point data)
+	params = np.arange(len(points), dtype=np.float64)
+	for index in sorted(set(indices), reverse=True):
+		if not 0 < index < len(params)-1:
+			continue
+		for segment in (index, index-1):
+			points = insert_point(points, segment, 0.5)
+			params = np.insert(params, segment+1, (params[segment] + params[segment+1])*0.5)
+		points = remove_point(points, index+1)
+		params = np.delete(params, index+1)
+	return points, params
+
+def merge_points(points, indices):
+	# each pair of control points <index> and <index>+1 is replaced by one point in the middle of their segment
+	# a pair with an end point collapses into that end point, the curve keeps its ends and at least 2 points
+	# returns the new points and their global parameters on the source curve
+	params = np.arange(len(points), dtype=np.float64)
+	for index in sorted(set(indices), reverse=True):
+		if not 0 <= index < len(points)-1 or len(points) < 3:
+			continue
+		if index == 0 or index == len(points)-2:
+			removed = index+1 if index == 0 else index
+			points = remove_point(points, removed)
+			params = np.delete(params, removed)
+			continue
+		points = insert_point(points, index, 0.5)
+		params = np.insert(params, index+1, params[index] + 0.5)
+		for removed in (index+2, index):
+			points = remove_point(points, removed)
+			params = np.delete(params, removed)
+	return points, params
+
+def reverse(points):
+	# reversed point order, handles swap sides
+	return points[::-1, ::-1].copy()
+
+# Handle types -------------------------
+# (N,) int arrays of Blender's handle type enum values, as read by foreach_get
+
+HANDLE_TYPES = {'FREE': 0, 'AUTO': 1, 'VECTOR': 2, 'ALIGNED': 3}
+
+def keep_handle_types(types, mask):
+	# AUTO handles become ALIGNED and VECTOR handles FREE where <mask> is set, so handles written there aren't recalculated
+	types[mask & (types == HANDLE_TYPES['AUTO'])] = HANDLE_TYPES['ALIGNED']
+	types[mask & (types == HANDLE_TYPES['VECTOR'])] = HANDLE_TYPES['FREE']
+	return types
+
+def find_automatic_handle(left_types, right_types):
+	# (side, index) of the first AUTO or VECTOR handle of a spline, left handles first, None if it has none
+	for side, types in (('left', left_types), ('right', right_types)):
+		automatic = np.flatnonzero((types == HANDLE_TYPES['AUTO']) | (types == HANDLE_TYPES['VECTOR']))
+		if len(automatic):
+			return side, int(automatic[0])
+	return None
+
+# Arc length -------------------------
+# {(control points hash, resolution) : (params, cumulative lengths)}
+arc_length_cache = dict()
+ARC_LENGTH_CACHE_SIZE = 256
+
+def build_arc_length_table(segments, resolution):
+	# cumulative chord length of the spline sampled <resolution> times per segment
+	t = np.linspace(0.0, 1.0, resolution)
+	params = np.concatenate(([0.0], (np.arange(len(segments))[:, None] + t[1:]).ravel()))
+	points = join_segment_samples(evaluate_bezier_segments(segments, resolution))
+	lengths = np.concatenate(([0.0], np.cumsum(np.linalg.norm(np.diff(points, axis=0), axis=1))))
+	return (params, lengths)
+
+def get_arc_length_table(segments, resolution):
+	key = (hash(segments.tobytes()), resolution)
+	table = arc_length_cache.get(key)
+	if table is None:
+		table = build_arc_length_table(segments, resolution)
+		if len(arc_length_cache) >= ARC_LENGTH_CACHE_SIZE:
+			del arc_length_cache[next(iter(arc_length_cache))]
+		arc_length_cache[key] = table
+	return table
+
+def arc_length_to_params(table, distances):
+	# inverse arc length: binary search in the table, then linear interpolation of the spline parameter
+	params, lengths = table
+	index = np.clip(np.searchsorted(lengths, distances), 1, len(lengths)-1)
+	l0 = lengths[index-1]
+	span = lengths[index] - l0
+	f = np.divide(distances - l0, span, out=np.zeros_like(span), where=span > 0)
+	return params[index-1] + f*(params[index] - params[index-1])
+
+def sample_fractions(count):
+	# <count> is a number of spans (count+1 evenly spaced arc length fractions) or an array of fractions 0..1
+	if np.ndim(count) == 0:
+		return np.linspace(0.0, 1.0, int(count)+1)
+	return np.asarray(count, dtype=np.float64)
+
+def get_precision_arc_length_table(segments, precision):
+	# about precision*100 table samples per spline
+	return get_arc_length_table(segments, max(2, -(-precision*100//len(segments))))
+
+def space_interpolate(points, precision, count):
+	# count+1 points evenly spaced by arc length including both ends, or points at arc length fractions
+	segments = points_to_segments(points)
+	if not len(segments):
+		return points[:1, 1].copy()
+
+	table = get_precision_arc_length_table(segments, precision)
+	distances = sample_fractions(count)*table[1][-1]
+	return evaluate_bezier_segments_at(segments, arc_length_to_params(table, distances))
+
+def space_interpolate_derivatives(points, precision, count):
+	# space_interpolate and the first derivatives by the arc length parameter u = 0..1
+	# the curve is arc length parameterized, so each derivative is the unit tangent scaled by the curve length
+	segments = points_to_segments(points)
+	if not len(segments):
+		return points[:1, 1].copy(), np.zeros((1, 3))
+
+	table = get_precision_arc_length_table(segments, precision)
+	params = arc_length_to_params(table, sample_fractions(count)*table[1][-1])
+	samples = evaluate_bezier_segments_at(segments, params)
+	tangents = normalize_tangents(samples, evaluate_bezier_segments_derivative_at(segments, params))
+	return samples, tangents*table[1][-1]
+
+def length(points, *, resolution=64):
+	segments = points_to_segments(points)
+	if not len(segments):
+		return 0.0
+	return get_arc_length_table(segments, resolution)[1][-1]
+
+# Adaptive sampling -------------------------
+# Segments are halved until they are flat enough, so samples gather in bends and flat spans stay coarse
+
+def segment_flatness(segments):
+	# upper bound of the distance between (S, 4, 3) segments and their chords:
+	# a segment stays inside the hull of its control points, so its handles are the farthest it can get
+	p0 = segments[:, 0]
+	chords = segments[:, 3] - p0
+	offsets = segments[:, 1:3] - p0[:, None]
+	lengths = np.einsum('ij,ij->i', chords, chords)
+	t = np.einsum('ikj,ij->ik', offsets, chords)/np.where(lengths > 0.0, lengths, 1.0)[:, None]
+	distances = offsets - np.clip(t, 0.0, 1.0)[..., None]*chords[:, None]
+	return np.sqrt(np.einsum('ikj,ikj->ik', distances, distances).max(axis=1))
+
+def flat_params(points, tolerance, *, max_depth=12):
+	# sorted global spline parameters that split the curve into pieces deviating less than <tolerance> from their chords
+	# all pieces of one subdivision level are tested and split at once
+	segments = points_to_segments(points)
+	params = [np.arange(len(segments)+1, dtype=np.float64)]
+	starts = np.arange(len(segments), dtype=np.float64)
+	widths = np.ones(len(segments))
+	for _ in range(max_depth):
+		split = segment_flatness(segments) > tolerance
+		if not split.any():
+			break
+		segments, starts, widths = segments[split], starts[split], widths[split]*0.5
+		params.append(starts + widths)
+		left, right = split_segment(segments.transpose(1, 0, 2), 0.5)
+		segments = np.concatenate((left, right), axis=1).transpose(1, 0, 2)
+		starts = np.concatenate((starts, starts + widths))
+		widths = np.concatenate((widths, widths))
+	return np.unique(np.concatenate(params))
+
+def adaptive_samples(points, tolerance, *, max_depth=12):
+	# curve points at flat_params, both ends included
+	segments = points_to_segments(points)
+	if not len(segments):
+		return points[:1, 1].copy()
+	return evaluate_bezier_segments_at(segments, flat_params(points, tolerance, max_depth=max_depth))
+
+def adaptive_fractions(curves, tolerance, *, precision=10, max_depth=12, min_gap=1e-6):
+	# flat_params of all <curves> as arc length fractions merged into one sorted array,
+	# so curves sampled together (loft rows, patch sides) keep a shared number of samples
+	fractions = [np.array((0.0, 1.0))]
+	for points in curves:
+		segments = points_to_segments(points)
+		if not len(segments):
+			continue
+		params, lengths = get_precision_arc_length_table(segments, precision)
+		if lengths[-1] > 0.0:
+			fractions.append(np.interp(flat_params(points, tolerance, max_depth=max_depth), params, lengths)/lengths[-1])
+	return merge_fractions(fractions, min_gap=min_gap)
+
+def merge_fractions(fractions, *, min_gap=1e-6):
+	# sorted union of arrays of fractions, fractions too close to the previous one are dropped, the last one is always 1
+	fractions = np.unique(np.concatenate(fractions))
+	fractions = fractions[np.concatenate(((True,), np.diff(fractions) > min_gap))]
+	fractions[-1] = 1.0
+	return fractions
+
+# Rotation minimizing frames -------------------------
+
+def normalize_tangents(points, tangents):
+	# zero length tangents (handles in control point positions) fall back to the chord direction
+	lengths = np.linalg.norm(tangents, axis=1)
+	if len(points) > 1:
+		chords = np.gradient(points, axis=0)
+		tangents = np.where((lengths > 0.0)[:, None], tangents, chords)
+		lengths = np.linalg.norm(tangents, axis=1)
+	return tangents/np.where(lengths > 0.0, lengths, 1.0)[:, None]
+
+def calculate_rmfs(points, tangents, binormal):
+	# Batched double reflection method for (N, 3) arrays of sample points and unit tangents
+	# binormal is the frame's r at points[0], returns (N, 3) arrays of binormals r and normals s
+	t0 = tangents[0]
+	r0 = binormal - t0*np.dot(binormal, t0)
+	r0 = r0/np.linalg.norm(r0)
+
+	if len(points) < 2:
+		return r0[None], np.cross(t0, r0)[None]
+
+	# reflections only depend on points and tangents, so every step is a fixed
+	# 3x3 map and the frames are prefix products of those maps
+	def reflection(v):
+		c = np.einsum('ij,ij->i', v, v)
+		c = np.where(c > 0.0, c, np.inf) # no reflection for coincident points
+		return np.eye(3) - (2.0/c)[:, None, None]*np.einsum('ni,nj->nij', v, v)
+
+	v1 = points[1:] - points[:-1]
+	h1 = reflection(v1)
+	t_left = np.einsum('nij,nj->ni', h1, tangents[:-1])
+	steps = reflection(tangents[1:] - t_left) @ h1
+
+	# log-depth scan: steps[i] = step_i @ ... @ step_0
+	shift = 1
+	while shift < len(steps):
+		steps[shift:] = steps[shift:] @ steps[:-shift]
+		shift *= 2
+
+	binormals = np.concatenate((r0[None], steps @ r0))
+	normals = np.cross(tangents, binormals)
+	return binormals, normals
+
+def rmfs(points, count, *, binormal=None):
+	# rotation minimizing frames along a Bézier curve, <count> samples per segment
+	# returns (N, 3) arrays of sample points, tangents, binormals and normals
+	segments = points_to_segments(points)
+	samples = join_segment_samples(evaluate_bezier_segments(segments, count))
+	tangents = normalize_tangents(samples, join_segment_samples(evaluate_bezier_segments_derivative(segments, count)))
+
+	if binormal is None:
+		axis = np.array((0.0, 0.0, 1.0)) if abs(tangents[0][2]) < 0.9 else np.array((1.0, 0.0, 0.0))
+		binormal = np.cross(axis, tangents[0])
+
+	binormals, normals = calculate_rmfs(samples, tangents, np.asarray(binormal, dtype=np.float64))
+	return samples, tangents, binormals, normals
+
+# Offset -------------------------
+
+OFFSET_MAX_SUBDIVISIONS = 6
+
+def fit_offset_handles(p0, v1, v2, p3, targets):
+	# Least squares fit of handle scales a, b so that the cubic (p0, p0 + a*v1, p3 + b*v2, p3)
+	# passes closest to the targets sampled at evenly distributed t
+	basis = bernstein_matrix(len(targets))
+	base = np.outer(basis[:, 0] + basis[:, 1], p0) + np.outer(basis[:, 2] + basis[:, 3], p3)
+	system = np.stack((np.outer(basis[:, 1], v1).ravel(), np.outer(basis[:, 2], v2).ravel()), axis=1)
+	(a, b), *_ = np.linalg.lstsq(system, (targets - base).ravel(), rcond=None)
+	return a, b
+
+def offset_segment(segment, frame, distance, precision, tolerance, depth, frames):
+	# segment is (p0, handle_right, handle_left, p3) of the source curve and frame is (point, tangent, binormal, normal) at p0
+	# returns the offset segments and the frame at p3, offset target frames are appended to <frames>
+	samples = evaluate_bezier_segments(segment[None], precision+1)[0]
+	tangents = normalize_tangents(samples, evaluate_bezier_segments_derivative(segment[None], precision+1)[0])
+	tangents[0] = frame[1]
+	binormals, normals = calculate_rmfs(samples, tangents, frame[2])
+	targets = samples + distance*normals
+
+	# offset handles keep the source handle directions, only their lengths are fitted
+	v1 = segment[1] - segment[0]
+	v2 = segment[2] - segment[3]
+	a, b = fit_offset_handles(targets[0], v1, v2, targets[-1], targets)
+	fitted = np.array((targets[0], targets[0] + a*v1, targets[-1] + b*v2, targets[-1]))
+	error = np.linalg.norm(evaluate_bezier_segments(fitted[None], precision+1)[0] - targets, axis=1).max()
+
+	if tolerance is not None and error > tolerance and depth < OFFSET_MAX_SUBDIVISIONS:
+		left, right = split_segment(segment, 0.5)
+		left, frame_split = offset_segment(left, frame, distance, precision, tolerance, depth+1, frames)
+		right, frame_end = offset_segment(right, frame_split, distance, precision, tolerance, depth+1, frames)
+		return left + right, frame_end
+
+	frames.append(np.stack((targets, tangents, binormals, normals), axis=1)[1:])
+	return [fitted], (samples[-1], tangents[-1], binormals[-1], normals[-1])
+
+def offset(points, distance, binormal, *, precision=100, tolerance=None, cyclic=False):
+	# offset curve along rotation minimizing frames, <binormal> orients the frame at the first point
+	# with a tolerance, segments deviating more than it are split (adaptive mode)
+	# a cyclic curve is offset through its closing segment as well
+	# returns the (M, 3, 3) offset bezier points and (K, 4, 3) frames [position, tangent, binormal, normal] of the offset targets
+	if cyclic:
+		points = np.concatenate((points, points[:1]))
+	tangent = points[0, 2] - points[0, 1]
+	tangent = tangent/np.linalg.norm(tangent)
+	binormal = np.asarray(binormal, dtype=np.float64)
+	binormal = binormal - tangent*np.dot(binormal, tangent)
+	binormal = binormal/np.linalg.norm(binormal)
+	normal = np.cross(tangent, binormal)
+
+	frame = (points[0, 1], tangent, binormal, normal)
+	frames = [np.array(((points[0, 1] + distance*normal, tangent, binormal, normal),))]
+
+	# the frame is carried over from segment to segment
+	offset_segments = []
+	for segment in points_to_segments(points):
+		segments, frame = offset_segment(segment, frame, distance, precision, tolerance, 0, frames)
+		offset_segments.extend(segments)
+
+	# pack offset segments back into bezier points, end handles keep the source directions
+	offset_segments = np.array(offset_segments)
+	result = np.empty((len(offset_segments)+1, 3, 3))
+	result[:-1, 1] = offset_segments[:, 0]
+	result[-1, 1] = offset_segments[-1, 3]
+	result[:-1, 2] = offset_segments[:, 1]
+	result[1:, 0] = offset_segments[:, 2]
+	result[0, 0] = result[0, 1] + points[0, 0] - points[0, 1]
+	result[-1, 2] = result[-1, 1] + points[-1, 2] - points[-1, 1]
+
+	# the closing segment ends at the first point, its left handle goes there
+	if cyclic:
+		result[0, 0] = result[0, 1] + result[-1, 0] - result[-1, 1]
+		return result[:-1], np.concatenate(frames)[:-1]
+	return result, np.concatenate(frames)
+
+# Blends -------------------------
+
+def point_curve(point):
+	# 2 point curve collapsed into <point>, the missing side of a 3-sided patch
+	return np.broadcast_to(np.asarray(point, dtype=np.float64), (2, 3, 3)).copy()
+
+def blend(points1, points2, count):
+	# <count> curves linearly interpolated between two curves with equal number of points, ends excluded
+	return blend_at(points1, points2, np.arange(1, count+1)/(count+1))
+
+def blend_at(points1, points2, t):
+	# curves linearly interpolated between two curves at each factor of <t>
+	return points1[None] + np.asarray(t)[:, None, None, None]*(points2 - points1)[None]
+
+def blend_1_profile_2_rails(rail1, rail2, profile, count, *, precision=10):
+	# blends between the rails, their first points are moved onto the profile
+	targets = space_interpolate(profile, precision, count+1)[1:-1]
+	blends = blend(rail1, rail2, len(targets))
+	blends[:, 0] += (targets - blends[:, 0, 1])[:, None]
+	return blends
+
+def blend_2_profiles_2_rails(rail1, rail2, profile1, profile2, count, *, precision=10):
+	# blends between the profiles, moved to start on rail1 and end on rail2
+	# <count> may also be arc length fractions of the rails, see sample_fractions
+	starts = space_interpolate(rail1, precision, count)[1:-1]
+	ends = space_interpolate(rail2, precision, count)[1:-1]
+	blends = blend_at(profile1, profile2, sample_fractions(count)[1:-1])
+	blends += (starts - blends[:, 0, 1])[:, None, None]
+	blends[:, -1] += (ends - blends[:, -1, 1])[:, None]
+	return blends
+
+# Curve networks -------------------------
+# Curves are edges between the nodes their end points snap to, patches are the closed loops of 3 or 4 curves
+
+NEIGHBOUR_CELLS = tuple(itertools.product((-1, 0, 1), repeat=3))
+
+def cluster_points(points, tolerance):
+	# (N, 3) points to the index of the first point of their cluster, points closer than <tolerance> to it join it
+	# points are hashed into a grid of tolerance sized cells, so each one is only compared to the 27 cells around it
+	points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+	cells = np.floor(points/tolerance).astype(np.int64).tolist()
+	points = points.tolist()
+	limit = tolerance*tolerance
+	grid = {}
+	clusters = []
+
+	for index, ((x, y, z), point) in enumerate(zip(cells, points)):
+		cluster = None
+		for dx, dy, dz in NEIGHBOUR_CELLS:
+			for other in grid.get((x+dx, y+dy, z+dz), ()):
+				if sum((a - b)*(a - b) for a, b in zip(points[other], point)) <= limit:
+					cluster = other
+					break
+			if cluster is not None:
+				break
+
+		if cluster is None:
+			cluster = index
+			grid.setdefault((x, y, z), []).append(index)
+		clusters.append(cluster)
+
+	return np.array(clusters, dtype=np.int64)
+
+def endpoint_nodes(endpoints, tolerance):
+	# (C, 2, 3) curve start/end points to (C, 2) node ids, ends closer than <tolerance> share a node
+	clusters = cluster_points(endpoints, tolerance)
+	return np.unique(clusters, return_inverse=True)[1].astype(np.int64).reshape(-1, 2)
+
+def curve_loops(nodes, *, sides=(3, 4)):
+	# closed loops of <sides> curves in the graph of (C, 2) curve end nodes
+	# each loop is a list of (curve index, is_reversed) walked head to tail, starting with its lowest curve index
+	# quads split by a diagonal curve are left to the two triangles
+	nodes = np.asarray(nodes).tolist()
+	links = {}
+	for curve, (start, end) in enumerate(nodes):
+		if start != end:
+			links.setdefault(start, []).append((curve, end, False))
+			links.setdefault(end, []).append((curve, start, True))
+
+	def is_linked(node, other):
+		return any(target == other for _, target, _ in links[node])
+
+	loops = []
+	found = set()
+	for first, (start, end) in enumerate(nodes):
+		if start == end:
+			continue
+		# iterative depth first search over curves with higher indices than the first one
+		stack = [([(first, False)], [start, end])]
+		while stack:
+			loop, path = stack.pop()
+			for curve, target, is_reversed in links[path[-1]]:
+				if curve <= first or any(curve == other for other, _ in loop):
+					continue
+				if target == start:
+					if len(loop)+1 in sides:
+						key = frozenset(other for other, _ in loop) | {curve}
+						if key not in found and not (len(loop) == 3 and (is_linked(path[0], path[2]) or is_linked(path[1], path[3]))):
+							found.add(key)
+							loops.append(loop + [(curve, is_reversed)])
+				elif target not in path and len(loop)+1 < max(sides):
+					stack.append((loop + [(curve, is_reversed)], path + [target]))
+
+	return loops
+
+def loop_sides(loop, first=None):
+	# patch sides of a loop as (curve index, is_reversed) pairs (horizon_1, horizon_2, vertical_1, vertical_2):
+	# horizon_1 runs from the start of vertical_1 to the start of vertical_2 and horizon_2 from their ends
+	# horizon_2 is None for 3-sided loops, the verticals meet in one point there
+	# <first> is the curve to use as horizon_1, it keeps its direction
+	index = 0 if first is None else [curve for curve, _ in loop].index(first)
+	loop = loop[index:] + loop[:index]
+	if loop[0][1]:
+		loop = [(curve, not is_reversed) for curve, is_reversed in loop[:1] + loop[:0:-1]]
+
+	horizon_1, vertical_2 = loop[0], loop[1]
+	if len(loop) == 3:
+		return horizon_1, None, (loop[2][0], not loop[2][1]), vertical_2
+	return horizon_1, (loop[2][0], not loop[2][1]), (loop[3][0], not loop[3][1]), vertical_2
+
+# Meshes -------------------------
+
+def edge_chains(edges, vertex_count):
+	# all chains and loops of an (E, 2) edge index array in one O(V+E) pass
+	# chains run between vertices that don't have exactly 2 edges (ends and junctions),
+	# the rest are closed loops. Closed chains repeat their first vertex at the end
+	# returns a list of vertex index lists
+	edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+	edges = edges[edges[:, 0] != edges[:, 1]]
+	count = len(edges)
+
+	# adjacency in CSR layout: neighbours of vertex v are in slots starts[v]..starts[v+1]
+	ends = np.concatenate((edges[:, 0], edges[:, 1]))
+	order = np.argsort(ends, kind='stable')
+	degree = np.bincount(ends, minlength=vertex_count)
+	starts = np.concatenate(([0], np.cumsum(degree))).tolist()
+	neighbours = np.concatenate((edges[:, 1], edges[:, 0]))[order].tolist()
+	neighbour_edges = np.concatenate((np.arange(count), np.arange(count)))[order].tolist()
+	visited = bytearray(count)
+
+	def walk(vert, slot):
+		chain = [vert]
+		while not visited[neighbour_edges[slot]]:
+			edge = neighbour_edges[slot]
+			visited[edge] = 1
+			vert = neighbours[slot]
+			chain.append(vert)
+			if degree[vert] != 2:
+				break
+			slot = starts[vert] if neighbour_edges[starts[vert]] != edge else starts[vert]+1
+		return chain
+
+	chains = []
+	for vert in np.flatnonzero((degree != 2) & (degree > 0)).tolist():
+		for slot in range(starts[vert], starts[vert+1]):
+			if not visited[neighbour_edges[slot]]:
+				chains.append(walk(vert, slot))
+
+	# whatever is left consists of loops
+	for vert in np.flatnonzero(degree == 2).tolist():
+		if not visited[neighbour_edges[starts[vert]]]:
+			chains.append(walk(vert, starts[vert]))
+
+	return chains
+
+def grid_face_indices(rows, cols):
+	# (rows-1)*(cols-1) quads of a rows x cols vertex grid as an (F, 4) index array
+	index = np.arange(rows*cols, dtype=np.int32).reshape(rows, cols)
+	faces = np.stack((index[:-1, :-1], index[:-1, 1:], index[1:, 1:], index[1:, :-1]), axis=-1)
+	return faces.reshape(-1, 4)
+
+def weld_grid_boundary(grid, distance):
+	# maps every vertex of a (rows, cols, 3) grid to its weld target
+	# each curve is sampled once, so only boundary vertices can coincide: closed seams,
+	# poles where a curve degenerates to a point, touching curve ends
+	rows, cols = grid.shape[:2]
+	verts = grid.reshape(-1, 3)
+	targets = np.arange(len(verts))
+	index = targets.reshape(rows, cols)
+	boundary = np.unique(np.concatenate((index[0], index[-1], index[:, 0], index[:, -1])))
+	targets[boundary] = boundary[cluster_points(verts[boundary], distance)]
+	return targets
+
+def grid_to_quads(grid, *, merge_distance=0.0):
+	# (rows, cols, 3) grid of samples to (V, 3) verts and (F, 4) quads, welds boundary vertices closer than merge_distance
+	rows, cols = grid.shape[:2]
+	verts = grid.reshape(-1, 3)
+	faces = grid_face_indices(rows, cols)
+
+	if merge_distance > 0:
+		faces = weld_grid_boundary(grid, merge_distance)[faces]
+		used, faces = np.unique(faces, return_inverse=True)
+		faces = faces.reshape(-1, 4).astype(np.int32)
+		verts = verts[used]
+
+	return verts, faces
+
+def is_facing_away(verts, faces, direction):
+	# whether quads sharing one winding face away from <direction> on the whole
+	corners = verts[faces]
+	normal_sum = np.cross(corners[:, 2] - corners[:, 0], corners[:, 3] - corners[:, 1]).sum(axis=0)
+	return np.dot(normal_sum, direction) <= 0
+
+def needs_flip(verts, faces, direction, *, flip=False):
+	# quads share one winding, the whole mesh is turned to face <direction> at once
+	# returns whether the faces (and their normals) have to be reversed
+	if direction is not None:
+		flip = flip != is_facing_away(verts, faces, direction)
+	return flip
+
+def weld_vertices(verts, faces, distance):
+	# welds vertices closer than <distance> anywhere in the mesh, returns the used verts and remapped quads
+	faces = cluster_points(verts, distance)[faces]
+	used, faces = np.unique(faces, return_inverse=True)
+	return verts[used], faces.reshape(-1, 4).astype(np.int32)
+
+def quads_to_polygons(faces):
+	# flat loop indices and loop totals, welded corners turn quads into triangles
+	# faces with less than 3 distinct corners are dropped
+	keep = faces != np.roll(faces, -1, axis=1)
+	totals = keep.sum(axis=1)
+	distinct = 1 + (np.diff(np.sort(faces, axis=1), axis=1) != 0).sum(axis=1)
+	valid = (totals >= 3) & (totals == distinct)
+	return faces[keep & valid[:, None]].astype(np.int32), totals[valid].astype(np.int32)
+
+def loft_grid(curves, count, *, precision=10):
+	# each curve is sampled once into a row of a shared (len(curves), count+1, 3) vertex grid
+	return np.stack([space_interpolate(points, precision, count) for points in curves])
+
+def loft(curves, count, *, precision=10, merge_distance=0.0):
+	# returns (V, 3) verts and (F, 4) quads
+	return grid_to_quads(loft_grid(curves, count, precision=precision), merge_distance=merge_distance)
+
+def patch_grid(rail1, rail2, profile1, profile2, count_u, count_v, *, precision=10):
+	# blends between the profiles fitted to the rails, lofted together with the profiles
+	# (count_v+1, count_u+1, 3) grid, rows run along the profiles
+	blends = blend_2_profiles_2_rails(rail1, rail2, profile1, profile2, count_v, precision=precision)
+	return loft_grid([profile1, *blends, profile2], count_u, precision=precision)
+
+def patch(rail1, rail2, profile1, profile2, count_u, count_v, *, precision=10, merge_distance=0.0):
+	return grid_to_quads(patch_grid(rail1, rail2, profile1, profile2, count_u, count_v, precision=precision), merge_distance=merge_distance)
+
+def hermite_blend(t):
+	# cubic blending function from 0 to 1 with zero slope at both ends, and its derivative
+	return t*t*(3.0 - 2.0*t), 6.0*t*(1.0 - t)
+
+def coons_grid(rail1, rail2, profile1, profile2, count_u, count_v, *, precision=10):
+	# bicubically blended Coons patch: every boundary shapes the interior, not only the profiles
+	# same layout as patch_grid, returns the (count_v+1, count_u+1, 3) grid and its unit normals
+	# normals are the cross product of the analytic partial derivatives, zero where they degenerate (3-sided poles)
+	p1, dp1 = space_interpolate_derivatives(profile1, precision, count_u)
+	p2, dp2 = space_interpolate_derivatives(profile2, precision, count_u)
+	r1, dr1 = space_interpolate_derivatives(rail1, precision, count_v)
+	r2, dr2 = space_interpolate_derivatives(rail2, precision, count_v)
+
+	fu, dfu = hermite_blend(sample_fractions(count_u))
+	fv, dfv = hermite_blend(sample_fractions(count_v))
+	c00, c01, c10, c11 = p1[0], p1[-1], p2[0], p2[-1]
+	bottom = (1.0 - fu)[:, None]*c00 + fu[:, None]*c01
+	top = (1.0 - fu)[:, None]*c10 + fu[:, None]*c11
+
+	def outer_sum(rows, cols):
+		# sum of outer products of (count_v+1, 3) row and (count_u+1, 3) column terms, scalar terms are broadcast
+		# as one (3, K) @ (K, count_u+1) matrix product per coordinate instead of K full size grids
+		rows = np.stack([np.broadcast_to(np.asarray(term, dtype=np.float64).reshape(len(term), -1), (len(term), 3)) for term in rows], axis=-1)
+		cols = np.stack([np.broadcast_to(np.asarray(term, dtype=np.float64).reshape(len(term), -1), (len(term), 3)) for term in cols], axis=0)
+		return rows.transpose(1, 0, 2) @ cols.transpose(2, 0, 1)
+
+	# profiles blended along v + rails blended along u - bilinear blend of the corners, per coordinate
+	grid = outer_sum((1.0 - fv, fv, r1, r2), (p1 - bottom, p2 - top, 1.0 - fu, fu))
+	du = outer_sum((1.0 - fv, fv, r2 - r1), (dp1 - dfu[:, None]*(c01 - c00), dp2 - dfu[:, None]*(c11 - c10), dfu))
+	dv = outer_sum((dfv, dr1, dr2), (p2 - p1 - (top - bottom), 1.0 - fu, fu))
+
+	normals = np.stack((du[1]*dv[2] - du[2]*dv[1], du[2]*dv[0] - du[0]*dv[2], du[0]*dv[1] - du[1]*dv[0]), axis=-1)
+	lengths = np.sqrt(np.einsum('ijk,ijk->ij', normals, normals))[..., None]
+	normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 1e-12)
+	return np.moveaxis(grid, 0, -1), normals
+
+def coons(rail1, rail2, profile1, profile2, count_u, count_v, *, precision=10, merge_distance=0.0):
+	# returns (V, 3) verts, (F, 4) quads and (V, 3) vertex normals, welded vertices keep the normal of the first one
+	grid, normals = coons_grid(rail1, rail2, profile1, profile2, count_u, count_v, precision=precision)
+	faces = grid_face_indices(*grid.shape[:2])
+	if merge_distance > 0:
+		faces = weld_grid_boundary(grid, merge_distance)[faces]
+	used, faces = np.unique(faces, return_inverse=True)
+	return grid.reshape(-1, 3)[used], faces.reshape(-1, 4).astype(np.int32), normals.reshape(-1, 3)[used]
+
+def patch_loop(rail1, rail2, profile1, profile2, count_u, count_v, *, precision=10, surface='BLEND', tolerance=None, merge_distance=0.0):
+	# one patch of a 3 or 4-sided loop, <rail2> is None for 3 sides: it collapses into the point where the profiles meet
+	# with a <tolerance>, the counts are replaced by the adaptive_fractions of the opposite sides
+	# returns (V, 3) verts, (F, 4) quads and (V, 3) vertex normals of 'COONS' surfaces, None for 'BLEND'
+	if rail2 is None:
+		rail2 = point_curve(profile2[-1, 1])
+
+	if tolerance is not None:
+		count_u = adaptive_fractions((profile1, profile2), tolerance, precision=precision)
+		count_v = adaptive_fractions((rail1, rail2), tolerance, precision=precision)
+
+	if surface == 'COONS':
+		return coons(rail1, rail2, profile1, profile2, count_u, count_v, precision=precision, merge_distance=merge_distance)
+	return (*patch(rail1, rail2, profile1, profile2, count_u, count_v, precision=precision, merge_distance=merge_distance), None)
+
+def network_families(loops, curve_count):
+	# splits the curves of 4-sided loops into two families: opposite sides share a family, neighbouring sides don't
+	# returns a (C,) array of 0 (profiles, sampled count_u times) and 1 (rails, sampled count_v times)
+	links = [[] for _ in range(curve_count)]
+	for loop in loops:
+		if len(loop) == 4:
+			curves = [curve for curve, _ in loop]
+			for index, curve in enumerate(curves):
+				links[curve].append((curves[(index+1)%4], 1))
+				links[curve].append((curves[(index+2)%4], 0))
+
+	families = np.full(curve_count, -1)
+	for root in range(curve_count):
+		if families[root] >= 0:
+			continue
+		families[root] = 0
+		stack = [root]
+		while stack:
+			curve = stack.pop()
+			for other, is_neighbour in links[curve]:
+				if families[other] < 0:
+					families[other] = families[curve] ^ is_neighbour
+					stack.append(other)
+	return families
+
+def network_orientations(loops):
+	# walking direction per loop so that loops sharing a curve walk it in opposite directions (consistent face winding)
+	users = {}
+	for index, loop in enumerate(loops):
+		for curve, is_reversed in loop:
+			users.setdefault(curve, []).append((index, is_reversed))
+
+	orientations = [None]*len(loops)
+	for root in range(len(loops)):
+		if orientations[root] is not None:
+			continue
+		orientations[root] = False
+		stack = [root]
+		while stack:
+			index = stack.pop()
+			for curve, is_reversed in loops[index]:
+				for other, other_is_reversed in users[curve]:
+					if orientations[other] is None:
+						orientations[other] = not (orientations[index] ^ is_reversed ^ other_is_reversed)
+						stack.append(other)
+	return orientations
+
+def network_cell_sides(loop, families, counts):
+	# patch sides of a loop with both pairs of opposite sides in one family each, the profiles must have equal point counts
+	for first, _ in loop:
+		sides = loop_sides(loop, first)
+		horizon_1, horizon_2, vertical_1, vertical_2 = sides
+		if horizon_2 is not None and families[horizon_1[0]] != families[horizon_2[0]]:
+			continue
+		if families[vertical_1[0]] == families[vertical_2[0]] and counts[vertical_1[0]] == counts[vertical_2[0]]:
+			return sides
+	return None
+
+def network_fractions(curves, tolerance, *, precision=10):
+	# adaptive_fractions mirrored around 0.5, cells walk shared curves in both directions
+	fractions = adaptive_fractions(curves, tolerance, precision=precision)
+	return merge_fractions((fractions, 1.0 - fractions))
+
+def patch_network(curves, nodes, loops, count_u, count_v, *, precision=10, surface='BLEND', tolerance=None):
+	# every loop of a curve network as a cell of one mesh, cells share the vertices of their common curves
+	# each curve is sampled once, so there are no seams to weld
+	# <surface> is 'BLEND' (patch_grid) or 'COONS' (coons_grid)
+	# with a <tolerance>, each family is sampled at the adaptive_fractions of all its curves instead of count_u/count_v
+	# returns (V, 3) verts, (F, 4) quads and the number of skipped loops
+	nodes = np.asarray(nodes)
+	families = network_families(loops, len(curves))
+	orientations = network_orientations(loops)
+	if tolerance is not None:
+		used = {curve for loop in loops for curve, _ in loop}
+		count_u, count_v = (network_fractions([curves[curve] for curve in used if families[curve] == family], tolerance, precision=precision) for family in (0, 1))
+	samples_count = [count_u if family == 0 else count_v for family in families]
+
+	# shared vertices: curve ends, then the inner samples of the curves
+	verts = [np.empty((nodes.max()+1, 3))]
+	verts[0][nodes[:, 0]] = [points[0, 1] for points in curves]
+	verts[0][nodes[:, 1]] = [points[-1, 1] for points in curves]
+	offset = len(verts[0])
+	curve_ids = {}
+	for curve in sorted({curve for loop in loops for curve, _ in loop}):
+		inner = space_interpolate(curves[curve], precision, samples_count[curve])[1:-1]
+		curve_ids[curve] = np.concatenate(([nodes[curve, 0]], np.arange(offset, offset+len(inner)), [nodes[curve, 1]]))
+		verts.append(inner)
+		offset += len(inner)
+
+	def side_ids(side):
+		curve, is_reversed = side
+		return curve_ids[curve][::-1] if is_reversed else curve_ids[curve]
+
+	faces = []
+	skipped = 0
+	for loop, orientation in zip(loops, orientations):
+		sides = network_cell_sides(loop, families, [len(points) for points in curves])
+		if sides is None:
+			skipped += 1
+			continue
+
+		horizon_1, horizon_2, vertical_1, vertical_2 = sides
+		points = [None if side is None else (reverse(curves[side[0]]) if side[1] else curves[side[0]]) for side in sides]
+		if horizon_2 is None:
+			points[1] = point_curve(points[3][-1, 1])
+		if surface == 'COONS':
+			grid = coons_grid(*points, samples_count[vertical_1[0]], samples_count[horizon_1[0]], precision=precision)[0]
+		else:
+			grid = patch_grid(*points, samples_count[vertical_1[0]], samples_count[horizon_1[0]], precision=precision)
+
+		# the grid border is taken from the shared curve samples, only the inside is new
+		rows, cols = grid.shape[:2]
+		ids = np.empty((rows, cols), dtype=np.int64)
+		ids[1:-1, 1:-1] = np.arange(offset, offset+(rows-2)*(cols-2)).reshape(rows-2, cols-2)
+		ids[0] = side_ids(vertical_1)
+		ids[-1] = side_ids(vertical_2)
+		ids[:, 0] = side_ids(horizon_1)
+		ids[:, -1] = ids[-1, -1] if horizon_2 is None else side_ids(horizon_2)
+		verts.append(grid[1:-1, 1:-1].reshape(-1, 3))
+		offset += (rows-2)*(cols-2)
+
+		cell_faces = ids.ravel()[grid_face_indices(rows, cols)]
+		# loop_sides walks against the loop when the first curve is reversed in it
+		if orientation != dict(loop)[horizon_1[0]]:
+			cell_faces = cell_faces[:, ::-1]
+		faces.append(cell_faces)
+
+	if not len(faces):
+		return np.empty((0, 3)), np.empty((0, 4), dtype=np.int32), skipped
+
+	used, faces = np.unique(np.concatenate(faces), return_inverse=True)
+	return np.concatenate(verts)[used], faces.reshape(-1, 4).astype(np.int32), skipped
+
+# Batch -------------------------
+# Worker processes load this file as a top level module by its path, they never import the add-on package
+# (it needs bpy) and don't depend on the name the add-on is installed under
+
+STANDALONE_NAME = 'camso_curve_geometry'
+STANDALONE_IMPORT = """
+import importlib.util, sys
+if name not in sys.modules:
+	spec = importlib.util.spec_from_file_location(name, path)
+	module = importlib.util.module_from_spec(spec)
+	sys.modules[name] = module
+	spec.loader.exec_module(module)
+"""
+
+def import_standalone():
+	# this module under STANDALONE_NAME, functions of it are pickled by a name the workers can resolve
+	variables = {'name': STANDALONE_NAME, 'path': os.path.abspath(__file__)}
+	exec(STANDALONE_IMPORT, dict(variables))
+	return variables
+
+def build_mesh_data(description):
+	# worker entry point of the batch runner, <description> is a dict of arrays and parameters:
+	# {'type': 'LOFT', 'curves': [points, ...], 'count': int}
+	# {'type': 'PATCH', 'rails': (points, points or None), 'profiles': (points, points), 'count_u': int, 'count_v': int}
+	# {'type': 'NETWORK', 'curves': [points, ...], 'count_u': int, 'count_v': int}
+	# optional:
+	# 'precision'
+	# 'merge_distance': vertices closer than it are welded
+	# 'tolerance': adaptive sampling, largest distance between the curves and the mesh edges, replaces the counts
+	# 'endpoint_tolerance' of NETWORK: curve ends closer than it meet, 1e-5 by default
+	# 'surface' of PATCH and NETWORK: 'BLEND' or 'COONS'
+	# 'direction': faces are turned towards it, 'flip_normals'
+	# returns (V, 3) verts, flat loop vertex indices, loop totals and (V, 3) vertex normals of COONS patches or None
+	precision = description.get('precision', 10)
+	merge_distance = description.get('merge_distance', 0.0)
+	tolerance = description.get('tolerance')
+	surface = description.get('surface', 'BLEND')
+	normals = None
+
+	if description['type'] == 'LOFT':
+		curves, count = description['curves'], description['count']
+		if tolerance is not None:
+			count = adaptive_fractions(curves, tolerance, precision=precision)
+		verts, faces = loft(curves, count, precision=precision, merge_distance=merge_distance)
+	elif description['type'] == 'PATCH':
+		verts, faces, normals = patch_loop(*description['rails'], *description['profiles'], description['count_u'], description['count_v'], precision=precision, surface=surface, tolerance=tolerance, merge_distance=merge_distance)
+	elif description['type'] == 'NETWORK':
+		curves = description['curves']
+		nodes = endpoint_nodes([points[[0, -1], 1] for points in curves], description.get('endpoint_tolerance', 1e-5))
+		verts, faces, _ = patch_network(curves, nodes, curve_loops(nodes), description['count_u'], description['count_v'], precision=precision, surface=surface, tolerance=tolerance)
+		if merge_distance > 0 and len(faces):
+			verts, faces = weld_vertices(verts, faces, merge_distance)
+	else:
+		raise ValueError("Unknown batch mesh type: " + str(description['type']))
+
+	if needs_flip(verts, faces, description.get('direction'), flip=description.get('flip_normals', False)):
+		faces = faces[:, ::-1]
+		normals = None if normals is None else -normals
+	return (verts, *quads_to_polygons(faces), normals)
+
+def build_mesh_data_batch(descriptions, *, max_workers=None):
+	# build_mesh_data of every description in a pool of worker processes, results are in order
+	# workers are spawned, forking would copy the whole host process (Blender) into each of them
+	if not len(descriptions):
+		return []
+
+	variables = import_standalone()
+	module = sys.modules[STANDALONE_NAME]
+	max_workers = min(max_workers or os.cpu_count() or 1, len(descriptions))
+	chunksize = max(1, len(descriptions)//(max_workers*4))
+	with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'), initializer=exec, initargs=(STANDALONE_IMPORT, variables)) as executor:
+		return list(executor.map(module.build_mesh_data, descriptions, chunksize=chunksize))
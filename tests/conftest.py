@@ -0,0 +1,5 @@
+# geometry.py is plain NumPy and is imported on its own, the add-on's __init__ needs bpy
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'CamsoCurveToolkit'))
@@ -0,0 +1,418 @@
+import numpy as np
+import pytest
+
+import geometry
+
+def arc_points():
+	# half of a unit circle, one cubic segment per quarter
+	k = 0.5523
+	return np.array((
+		((1.0, -k, 0.0), (1.0, 0.0, 0.0), (1.0, k, 0.0)),
+		((k, 1.0, 0.0), (0.0, 1.0, 0.0), (-k, 1.0, 0.0)),
+		((-1.0, k, 0.0), (-1.0, 0.0, 0.0), (-1.0, -k, 0.0)),
+	))
+
+def sample(points, count=33):
+	return geometry.evaluate_splines([points], [count])[0]
+
+def curve_distance(points, samples):
+	# largest distance of <samples> to a dense sampling of <points>
+	dense = sample(points, 2001)
+	return np.linalg.norm(samples[:, None] - dense[None], axis=2).min(axis=1).max()
+
+def circle_points():
+	# unit circle of 4 points, closed by a cyclic spline
+	points = arc_points()
+	return np.concatenate((points, -points[1:2]))
+
+# evaluate_splines -------------------------
+
+def test_evaluate_splines_batch_matches_single_splines():
+	splines = [arc_points(), arc_points()[:2] * 2.0, geometry.insert_point(arc_points(), 1, 0.5)]
+	counts = [9, 17, 9]
+	results = geometry.evaluate_splines(splines, counts)
+	for points, count, result in zip(splines, counts, results):
+		expected = geometry.join_segment_samples(geometry.evaluate_bezier_segments(geometry.points_to_segments(points), count))
+		assert result.shape == ((len(points) - 1)*(count - 1) + 1, 3)
+		assert np.allclose(result, expected)
+
+def test_evaluate_splines_single_point_spline():
+	single = arc_points()[:1]
+	results = geometry.evaluate_splines([single, arc_points()], [5, 5])
+	assert np.allclose(results[0], single[:, 1])
+	assert len(results[1]) == 2*4 + 1
+
+# space_interpolate -------------------------
+
+def test_space_interpolate_spaces_evenly_by_arc_length():
+	# uneven segments, the quarter circle is split at 0.2
+	points = geometry.insert_point(arc_points(), 0, 0.2)
+	result = geometry.space_interpolate(points, 10, 20)
+	assert len(result) == 21
+	assert np.allclose(result[[0, -1]], points[[0, -1], 1])
+	# points of the (nearly) unit circle are as far apart along it as their angles
+	angles = np.unwrap(np.arctan2(result[:, 1], result[:, 0]))
+	assert np.allclose(np.diff(angles), np.pi/20, atol=2e-3)
+
+def test_arc_length_table_is_reused_until_points_change():
+	geometry.arc_length_cache.clear()
+	points = arc_points()
+	segments = geometry.points_to_segments(points)
+	table = geometry.get_precision_arc_length_table(segments, 10)
+	first = geometry.space_interpolate(points, 10, 8)
+	assert np.allclose(geometry.space_interpolate(points, 10, 8), first)
+	assert len(geometry.arc_length_cache) == 1
+	assert geometry.get_precision_arc_length_table(segments, 10) is table
+
+	# a moved control point gets a table of its own
+	moved = points.copy()
+	moved[1] *= 2.0
+	result = geometry.space_interpolate(moved, 10, 8)
+	assert len(geometry.arc_length_cache) == 2
+	assert geometry.get_precision_arc_length_table(geometry.points_to_segments(moved), 10) is not table
+	assert geometry.length(moved) > geometry.length(points)
+	assert np.allclose(result[[0, -1]], moved[[0, -1], 1])
+	assert not np.allclose(result, first)
+
+# insert_point -------------------------
+
+def test_insert_point_keeps_shape():
+	points = arc_points()
+	inserted = geometry.insert_point(points, 0, 0.3)
+	assert len(inserted) == len(points) + 1
+	expected = geometry.evaluate_bezier_segments_at(geometry.points_to_segments(points), [0.3])[0]
+	assert np.allclose(inserted[1, 1], expected)
+	assert curve_distance(points, sample(inserted)) < 1e-3
+
+def test_remove_point_reverts_insert_point():
+	points = arc_points()
+	restored = geometry.remove_point(geometry.insert_point(points, 1, 0.4), 2)
+	assert np.allclose(restored, points)
+
+# smooth_points / merge_points -------------------------
+
+def five_points():
+	# half of a unit circle with control points every 45 degrees
+	points = arc_points()
+	points = geometry.insert_point(points, 1, 0.5)
+	return geometry.insert_point(points, 0, 0.5)
+
+def on_source(points, result, params):
+	expected = geometry.evaluate_bezier_segments_at(geometry.points_to_segments(points), params)
+	return np.allclose(result[:, 1], expected)
+
+def test_smooth_points_replaces_several_points():
+	points = five_points()
+	result, params = geometry.smooth_points(points, [0, 1, 3, 4])
+	# end points are kept, every inner point is replaced by two segment midpoints
+	assert len(result) == len(points) + 2
+	assert np.allclose(params, (0.0, 0.5, 1.5, 2.0, 2.5, 3.5, 4.0))
+	assert on_source(points, result, params)
+	assert np.allclose(result[[0, -1], 1], points[[0, -1], 1])
+
+def test_merge_points_interior_pair():
+	points = five_points()
+	result, params = geometry.merge_points(points, [1])
+	assert np.allclose(params, (0.0, 1.5, 3.0, 4.0))
+	assert on_source(points, result, params)
+	assert np.allclose(result[[0, -1], 1], points[[0, -1], 1])
+
+@pytest.mark.parametrize('index, expected', ((0, (0.0, 2.0, 3.0, 4.0)), (3, (0.0, 1.0, 2.0, 4.0))))
+def test_merge_points_end_pair_keeps_end_point(index, expected):
+	points = five_points()
+	result, params = geometry.merge_points(points, [index])
+	assert np.allclose(params, expected)
+	assert np.allclose(result[[0, -1], 1], points[[0, -1], 1])
+	assert on_source(points, result, params)
+
+def test_merge_points_keeps_two_points():
+	points = arc_points()[:2]
+	result, params = geometry.merge_points(points, [0])
+	assert np.allclose(result, points)
+
+# handle types -------------------------
+
+def handle_types(*names):
+	return np.array([geometry.HANDLE_TYPES[name] for name in names], dtype=np.int32)
+
+def test_keep_handle_types_only_changes_masked_automatic_handles():
+	types = handle_types('AUTO', 'VECTOR', 'FREE', 'ALIGNED', 'AUTO')
+	mask = np.array((True, True, True, True, False))
+	assert np.array_equal(geometry.keep_handle_types(types, mask), handle_types('ALIGNED', 'FREE', 'FREE', 'ALIGNED', 'AUTO'))
+
+def test_find_automatic_handle_prefers_left_handles():
+	left = handle_types('FREE', 'FREE', 'VECTOR')
+	right = handle_types('AUTO', 'FREE', 'FREE')
+	assert geometry.find_automatic_handle(left, right) == ('left', 2)
+
+def test_find_automatic_handle_right_handles_only():
+	left = handle_types('FREE', 'ALIGNED', 'FREE')
+	right = handle_types('FREE', 'FREE', 'AUTO')
+	assert geometry.find_automatic_handle(left, right) == ('right', 2)
+
+def test_find_automatic_handle_none():
+	types = handle_types('FREE', 'ALIGNED')
+	assert geometry.find_automatic_handle(types, types) is None
+
+# offset -------------------------
+
+def test_offset_straight_line():
+	points = np.array((
+		((-1.0, 0.0, 0.0), (0.0, 0.0, 0.0), (1.0, 0.0, 0.0)),
+		((2.0, 0.0, 0.0), (3.0, 0.0, 0.0), (4.0, 0.0, 0.0)),
+	))
+	result, frames = geometry.offset(points, 0.5, (0.0, 0.0, 1.0), precision=10)
+	# normal is tangent x binormal = -Y
+	assert np.allclose(result[..., 1], -0.5)
+	assert np.allclose(result[..., [0, 2]], points[..., [0, 2]])
+	assert np.allclose(frames[:, 0, 1], -0.5)
+
+def test_offset_arc_keeps_distance():
+	points = arc_points()
+	result, frames = geometry.offset(points, 0.25, (0.0, 0.0, 1.0), precision=20)
+	radii = np.linalg.norm(sample(result, 65)[:, :2], axis=1)
+	direction = np.sign(radii.mean() - 1.0)
+	assert np.allclose(radii, 1.0 + direction*0.25, atol=5e-3)
+
+def test_offset_adaptive_splits_within_tolerance():
+	points = arc_points()
+	result, frames = geometry.offset(points, 1.0, (0.0, 0.0, 1.0), precision=20, tolerance=1e-4)
+	assert len(result) >= len(points)
+	radii = np.linalg.norm(sample(result, 65)[:, :2], axis=1)
+	assert np.ptp(radii) < 1e-3
+
+def test_offset_cyclic_closes_circle():
+	points = circle_points()
+	result, frames = geometry.offset(points, 0.25, (0.0, 0.0, 1.0), precision=20, cyclic=True)
+	assert len(result) == len(points)
+	assert len(frames) == 4*20
+	closed = np.concatenate((result, result[:1]))
+	radii = np.linalg.norm(sample(closed, 65)[:, :2], axis=1)
+	direction = np.sign(radii.mean() - 1.0)
+	assert np.allclose(radii, 1.0 + direction*0.25, atol=5e-3)
+
+# weld_grid_boundary -------------------------
+
+def cylinder_grid(rows, cols):
+	angles = np.linspace(0.0, 2*np.pi, cols)
+	heights = np.linspace(0.0, 1.0, rows)
+	return np.stack([np.stack((np.cos(angles), np.sin(angles), np.full(cols, height)), axis=1) for height in heights])
+
+def test_weld_grid_boundary_closes_seam():
+	grid = cylinder_grid(5, 9)
+	targets = geometry.weld_grid_boundary(grid, 1e-6).reshape(5, 9)
+	assert np.array_equal(targets[:, -1], targets[:, 0])
+	assert np.array_equal(targets[:, :-1], np.arange(45).reshape(5, 9)[:, :-1])
+
+def test_weld_grid_boundary_collapses_pole():
+	grid = cylinder_grid(4, 6)
+	grid[0] = (0.0, 0.0, 0.0)
+	targets = geometry.weld_grid_boundary(grid, 1e-6).reshape(4, 6)
+	assert np.all(targets[0] == 0)
+	# interior vertices are never welded
+	assert np.array_equal(targets[1:-1, 1:-1], np.arange(24).reshape(4, 6)[1:-1, 1:-1])
+
+def test_weld_grid_boundary_large_grid():
+	# boundary lookup is hashed, a 1000 x 1000 grid doesn't build a dense distance matrix
+	grid = cylinder_grid(1000, 1000)
+	targets = geometry.weld_grid_boundary(grid, 1e-6)
+	assert np.count_nonzero(targets != np.arange(len(targets))) == 1000
+
+def test_grid_to_quads_drops_welded_vertices():
+	verts, faces = geometry.grid_to_quads(cylinder_grid(3, 5), merge_distance=1e-6)
+	assert len(verts) == 3*4
+	assert faces.max() == len(verts) - 1
+
+# batch -------------------------
+
+def line_points(start, end):
+	start, end = np.asarray(start, dtype=np.float64), np.asarray(end, dtype=np.float64)
+	step = (end - start)/3
+	return np.array(((start - step, start, start + step), (end - step, end, end + step)))
+
+def square_descriptions():
+	a, b, c, d = (0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)
+	rails = (line_points(a, b), line_points(d, c))
+	profiles = (line_points(a, d), line_points(b, c))
+	return [
+		{'type': 'LOFT', 'curves': list(rails), 'count': 4},
+		{'type': 'PATCH', 'rails': rails, 'profiles': profiles, 'count_u': 3, 'count_v': 5, 'surface': 'COONS', 'direction': (0, 0, 1)},
+		{'type': 'PATCH', 'rails': (rails[0], None), 'profiles': (profiles[0], line_points(b, d)), 'count_u': 3, 'count_v': 3, 'merge_distance': 1e-6},
+		{'type': 'NETWORK', 'curves': [rails[0], profiles[1], rails[1], profiles[0]], 'count_u': 2, 'count_v': 2, 'endpoint_tolerance': 1e-4, 'merge_distance': 1e-6},
+	]
+
+def test_build_mesh_data_types():
+	loft, coons, triangle, network = [geometry.build_mesh_data(description) for description in square_descriptions()]
+	assert len(loft[0]) == 2*5 and len(loft[2]) == 4
+	verts, loops, totals, normals = coons
+	assert len(verts) == 4*6 and np.all(totals == 4)
+	# faces turned towards the direction flip the normals with them
+	assert np.allclose(normals[:, 2], 1.0)
+	# the collapsed side of a 3-sided patch welds into triangles
+	assert np.any(triangle[2] == 3)
+	assert triangle[3] is None
+	assert len(network[0]) == 3*3 and len(network[2]) == 4
+
+def test_build_mesh_data_rejects_unknown_type():
+	with pytest.raises(ValueError):
+		geometry.build_mesh_data({'type': 'SWEEP'})
+
+def test_build_mesh_data_batch_matches_serial():
+	descriptions = square_descriptions()*2
+	results = geometry.build_mesh_data_batch(descriptions, max_workers=2)
+	for description, result in zip(descriptions, results):
+		expected = geometry.build_mesh_data(description)
+		for value, expected_value in zip(result, expected):
+			assert (value is None and expected_value is None) or np.allclose(value, expected_value)
+
+# edge_chains -------------------------
+
+def test_edge_chains_open_chain():
+	chains = geometry.edge_chains([(2, 3), (0, 1), (1, 2)], 4)
+	assert len(chains) == 1
+	assert chains[0] in ([0, 1, 2, 3], [3, 2, 1, 0])
+
+def test_edge_chains_closed_loop_repeats_first_vertex():
+	chains = geometry.edge_chains([(0, 1), (1, 2), (2, 3), (3, 0)], 4)
+	assert len(chains) == 1
+	chain = chains[0]
+	assert len(chain) == 5 and chain[0] == chain[-1] and sorted(chain[:-1]) == [0, 1, 2, 3]
+
+def test_edge_chains_split_at_junctions():
+	# Y shape: 3 branches meeting in vertex 0, vertex 5 is unused, the zero length edge is ignored
+	chains = geometry.edge_chains([(0, 1), (1, 2), (0, 3), (0, 4), (4, 4)], 6)
+	assert sorted(sorted(chain) for chain in chains) == [[0, 1, 2], [0, 3], [0, 4]]
+	assert all(chain[0] == 0 for chain in chains)
+
+def test_edge_chains_long_chain_is_iterative():
+	count = 100000
+	edges = np.stack((np.arange(count-1), np.arange(1, count)), axis=1)
+	chains = geometry.edge_chains(edges, count)
+	assert len(chains) == 1 and len(chains[0]) == count
+
+# curve_loops -------------------------
+
+def assert_closed(loop, nodes):
+	# every curve ends where the next one starts
+	ends = [(nodes[curve][1], nodes[curve][0]) if is_reversed else tuple(nodes[curve]) for curve, is_reversed in loop]
+	for (_, end), (start, _) in zip(ends, ends[1:] + ends[:1]):
+		assert end == start
+
+def test_endpoint_nodes_share_close_ends():
+	endpoints = np.array((((0, 0, 0), (1, 0, 0)), ((1, 0, 1e-7), (1, 1, 0)), ((1, 1, 0), (0, 0, 1e-3))))
+	nodes = geometry.endpoint_nodes(endpoints, 1e-5)
+	assert nodes.tolist() == [[0, 1], [1, 2], [2, 3]]
+
+def test_curve_loops_square():
+	nodes = [(0, 1), (2, 1), (2, 3), (0, 3)]
+	loops = geometry.curve_loops(nodes)
+	assert len(loops) == 1
+	assert sorted(curve for curve, _ in loops[0]) == [0, 1, 2, 3]
+	assert loops[0][0] == (0, False)
+	assert_closed(loops[0], nodes)
+
+def test_curve_loops_grid_of_two_cells():
+	# 0 - 1 - 2
+	# |   |   |
+	# 3 - 4 - 5
+	nodes = [(0, 1), (1, 2), (3, 4), (4, 5), (0, 3), (1, 4), (2, 5)]
+	loops = geometry.curve_loops(nodes)
+	assert sorted(sorted(curve for curve, _ in loop) for loop in loops) == [[0, 2, 4, 5], [1, 3, 5, 6]]
+	for loop in loops:
+		assert_closed(loop, nodes)
+
+def test_curve_loops_diagonal_leaves_triangles():
+	nodes = [(0, 1), (1, 2), (2, 3), (3, 0), (0, 2)]
+	loops = geometry.curve_loops(nodes)
+	assert sorted(sorted(curve for curve, _ in loop) for loop in loops) == [[0, 1, 4], [2, 3, 4]]
+
+def test_curve_loops_skip_closed_curves():
+	assert geometry.curve_loops([(0, 0), (0, 1), (1, 2), (2, 0)]) == [[(1, False), (2, False), (3, False)]]
+
+# patch_network -------------------------
+
+def grid_network(reversed_curves=()):
+	# 2 x 2 cells of straight curves in the XY plane, some of them reversed
+	corners = {(x, y): (float(x), float(y), 0.0) for x in range(3) for y in range(3)}
+	pairs = [((x, y), (x+1, y)) for y in range(3) for x in range(2)] + [((x, y), (x, y+1)) for x in range(3) for y in range(2)]
+	curves = []
+	for index, (start, end) in enumerate(pairs):
+		if index in reversed_curves:
+			start, end = end, start
+		curves.append(line_points(corners[start], corners[end]))
+	return curves
+
+def quad_normals(verts, faces):
+	corners = verts[faces]
+	return np.cross(corners[:, 2] - corners[:, 0], corners[:, 3] - corners[:, 1])
+
+def assert_consistent_winding(faces):
+	# every directed edge is used once, shared edges run in opposite directions in their two faces
+	edges = np.stack((faces, np.roll(faces, -1, axis=1)), axis=-1).reshape(-1, 2)
+	assert len({tuple(edge) for edge in edges.tolist()}) == len(edges)
+
+@pytest.mark.parametrize('surface', ('BLEND', 'COONS'))
+@pytest.mark.parametrize('reversed_curves', ((), (1, 4, 7, 9, 10)))
+def test_patch_network_winding(surface, reversed_curves):
+	curves = grid_network(reversed_curves)
+	nodes = geometry.endpoint_nodes([points[[0, -1], 1] for points in curves], 1e-5)
+	loops = geometry.curve_loops(nodes)
+	assert len(loops) == 4
+
+	verts, faces, skipped = geometry.patch_network(curves, nodes, loops, 3, 2, surface=surface)
+	assert skipped == 0
+	assert len(faces) == 4*3*2
+	# shared boundary samples are not duplicated
+	assert len(np.unique(np.round(verts, 9), axis=0)) == len(verts) == (2*3+1)*(2*2+1)
+	assert_consistent_winding(faces)
+	normals = quad_normals(verts, faces)
+	assert np.all(np.sign(normals[:, 2]) == np.sign(normals[0, 2]))
+
+def test_patch_network_adaptive_shares_samples():
+	curves = grid_network((3, 8))
+	nodes = geometry.endpoint_nodes([points[[0, -1], 1] for points in curves], 1e-5)
+	verts, faces, skipped = geometry.patch_network(curves, nodes, geometry.curve_loops(nodes), 3, 3, tolerance=1e-3)
+	assert len(np.unique(np.round(verts, 9), axis=0)) == len(verts)
+	assert_consistent_winding(faces)
+
+# coons -------------------------
+
+def saddle_sides():
+	# rails run from profile1 to profile2, profiles from rail1 to rail2
+	a, b, c, d = (0.0, 0.0, 0.0), (2.0, 0.0, 1.0), (2.0, 2.0, 0.0), (0.0, 2.0, 1.0)
+	rail1, rail2 = line_points(a, b), line_points(d, c)
+	profile1, profile2 = line_points(a, d), line_points(b, c)
+	# bend the profiles by their inner handles, the corners stay shared with the rails
+	profile1[0, 2, 0] -= 0.5
+	profile1[1, 0, 0] -= 0.5
+	profile2[0, 2, 0] += 0.5
+	profile2[1, 0, 0] += 0.5
+	return rail1, rail2, profile1, profile2
+
+def test_coons_grid_matches_boundaries():
+	rail1, rail2, profile1, profile2 = saddle_sides()
+	grid, normals = geometry.coons_grid(rail1, rail2, profile1, profile2, 6, 4)
+	assert grid.shape == (5, 7, 3)
+	assert np.allclose(grid[0], geometry.space_interpolate(profile1, 10, 6))
+	assert np.allclose(grid[-1], geometry.space_interpolate(profile2, 10, 6))
+	assert np.allclose(grid[:, 0], geometry.space_interpolate(rail1, 10, 4))
+	assert np.allclose(grid[:, -1], geometry.space_interpolate(rail2, 10, 4))
+
+def test_coons_normals_match_faces():
+	rail1, rail2, profile1, profile2 = saddle_sides()
+	verts, faces, normals = geometry.coons(rail1, rail2, profile1, profile2, 16, 16)
+	assert np.allclose(np.linalg.norm(normals, axis=1), 1.0)
+	assert_consistent_winding(faces)
+	# analytic vertex normals agree with the normals of the faces around them
+	face_normals = quad_normals(verts, faces)
+	face_normals /= np.linalg.norm(face_normals, axis=1)[:, None]
+	corner_normals = normals[faces]
+	assert np.all(np.einsum('fd,fcd->fc', face_normals, corner_normals) > 0.95)
+
+def test_coons_three_sided_pole():
+	rail1, _, profile1, profile2 = saddle_sides()
+	profile2 = line_points(rail1[-1, 1], profile1[-1, 1])
+	verts, faces, normals = geometry.coons(rail1, geometry.point_curve(profile1[-1, 1]), profile1, profile2, 4, 4, merge_distance=1e-6)
+	# the collapsed rail is welded into a single vertex
+	assert np.count_nonzero(np.all(np.isclose(verts, profile1[-1, 1]), axis=1)) == 1
+	assert len(geometry.quads_to_polygons(faces)[1]) == 16